@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend that loads the signed-in user together with their
+    UserProfile in one query, so role checks, the navbar and views that read
+    request.user.profile do not each go back to the database.
+    """
+
+    def _user_queryset(self):
+        return UserModel._default_manager.select_related('profile')
+
+    def get_user(self, user_id):
+        try:
+            user = self._user_queryset().get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        try:
+            user = await self._user_queryset().aget(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,4 @@
+def role(request):
+    """Expose the request's role as `user_role`, so templates never query the profile."""
+    from .roles import get_role
+    return {'user_role': get_role(request)}
@@ -0,0 +1,59 @@
+"""
+Role Resolution
+A user's role lives on their UserProfile. RoleMiddleware resolves it once per
+request (the profile arrives with the user, see backends.ProfileModelBackend)
+and exposes it as request.role; templates get it as `user_role`. Views are
+guarded with role_required instead of reading the profile themselves.
+"""
+from functools import wraps
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from .models import ROLE_CHOICES, UserProfile
+
+ROLE_LABELS = dict(ROLE_CHOICES)
+
+
+def user_role(user):
+    """The user's role, or '' for anonymous users and accounts without a profile."""
+    if user is None or not user.is_authenticated:
+        return ''
+    try:
+        return user.profile.role
+    except UserProfile.DoesNotExist:
+        return ''
+
+
+def get_role(request):
+    """request.role when RoleMiddleware is installed, otherwise resolved on the spot."""
+    role = getattr(request, 'role', None)
+    return user_role(getattr(request, 'user', None)) if role is None else role
+
+
+def role_required(*roles):
+    """
+    Restrict a view to signed-in users holding one of `roles`. Superusers
+    always pass. Everyone else is sent back to the vacancy list with a message.
+    """
+    def decorator(func):
+        @login_required
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if not request.user.is_superuser and get_role(request) not in roles:
+                labels = ' or '.join(ROLE_LABELS.get(role, role) for role in roles)
+                messages.error(request, f'Access denied. {labels} role required.')
+                return redirect('recruitment:job_list')
+            return func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RoleMiddleware(MiddlewareMixin):
+    """Sets request.role, resolved lazily on first use. Place after AuthenticationMiddleware."""
+
+    def process_request(self, request):
+        request.role = SimpleLazyObject(lambda: user_role(request.user))
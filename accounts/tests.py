@@ -1,3 +1,27 @@
+from django.contrib.auth import SESSION_KEY, get_user
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .models import ROLE_APPLICANT
+
+
+class RegistrationTests(TestCase):
+    def test_register_creates_applicant_and_logs_in(self):
+        response = self.client.post(reverse('accounts:register'), {
+            'username': 'kila',
+            'first_name': 'Kila',
+            'last_name': 'Ano',
+            'email': 'kila.ano@example.com',
+            'password': 'Correctional#2026',
+            'confirm_password': 'Correctional#2026',
+            'province': '',
+            'gender': '',
+        })
+
+        self.assertRedirects(response, reverse('recruitment:job_list'), fetch_redirect_response=False)
+        user = User.objects.get(username='kila')
+        self.assertEqual(user.profile.role, ROLE_APPLICANT)
+        self.assertEqual(self.client.session[SESSION_KEY], str(user.pk))
+        self.assertEqual(get_user(self.client).pk, user.pk)
+        self.assertEqual(self.client.session['_auth_user_backend'], 'accounts.backends.ProfileModelBackend')
@@ -24,7 +24,7 @@ def register_view(request):
                 province=form.cleaned_data.get('province', ''),
                 gender=form.cleaned_data.get('gender', ''),
             )
-            login(request, user)
+            login(request, user, backend='accounts.backends.ProfileModelBackend')
             messages.success(request, f"Welcome, {user.first_name}! Your account has been created.")
             return redirect('recruitment:job_list')
     else:
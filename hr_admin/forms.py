@@ -38,6 +38,20 @@ class ApplicationFilterForm(forms.Form):
     search = forms.CharField(required=False, widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Search by name or email'}))
 
 
+class ApplicationExportForm(forms.Form):
+    FORMAT_CHOICES = [('csv', 'CSV'), ('xlsx', 'Excel (XLSX)'), ('parquet', 'Parquet (compressed, columnar)')]
+
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, initial='csv', widget=forms.Select(attrs={'class': 'form-select'}))
+    vacancy = forms.ModelChoiceField(queryset=Vacancy.objects.all(), required=False,
+                                     empty_label='All Vacancies', widget=forms.Select(attrs={'class': 'form-select'}))
+    date_from = forms.DateField(required=False, label='Submitted from',
+                                widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    date_to = forms.DateField(required=False, label='Submitted to',
+                              widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    since = forms.DateTimeField(required=False, label='Changed since',
+                                widget=forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'form-control'}))
+
+
 class BulkMessageForm(forms.Form):
     vacancy = forms.ModelChoiceField(
         queryset=Vacancy.objects.all(), required=False,
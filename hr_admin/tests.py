@@ -1,3 +1,68 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import ROLE_HR_ADMIN, ROLE_PANEL
+from recruitment.models import BulkMessage, Interview, InterviewScore
+from recruitment.query_inspector import inspect_queries
+from recruitment.tests import MediaTestCase, make_application, make_document, make_user, make_vacancy
+from recruitment.transitions import transition
+
+STATUSES = ['submitted', 'under_review', 'shortlisted', 'rejected', 'interview_scheduled', 'shortlisted']
+
+
+class HRPageQueryTests(MediaTestCase):
+    """Every HR page, with enough rows that an N+1 loop would pass the repeat threshold."""
+
+    def setUp(self):
+        super().setUp()
+        self.hr = make_user('hr', ROLE_HR_ADMIN)
+        panel = [make_user(f'panel{n}', ROLE_PANEL) for n in range(2)]
+        self.vacancies = [make_vacancy(f'PNGCS-{n:03}', title=f'Officer {n}') for n in range(3)]
+        self.applications = []
+        for n, status in enumerate(STATUSES * 2):
+            application = make_application(self.vacancies[n % 3], make_user(f'applicant{n}'), total_score=40 + n)
+            make_document(application, f'certificate {n}'.encode(), 'certificate.pdf')
+            make_document(application, b'shared national id', 'id.pdf', 'national_id')
+            if status != 'submitted':
+                transition(application, status, by=self.hr)
+            self.applications.append(application)
+        for application in self.applications[:6]:
+            interview = Interview.objects.create(
+                application=application, scheduled_date=timezone.now() + timedelta(days=3), venue='Bomana',
+            )
+            interview.panel_members.set(panel)
+            for member in panel:
+                InterviewScore.objects.create(interview=interview, panel_member=member, communication_score=15,
+                                              knowledge_score=20, attitude_score=20, experience_score=15)
+        for n in range(6):
+            BulkMessage.objects.create(vacancy=self.vacancies[n % 3], subject=f'Update {n}', message='Hello',
+                                       sent_by=self.hr, recipient_count=4, status='completed')
+        self.client.force_login(self.hr)
+
+    def pages(self):
+        application, vacancy = self.applications[2], self.vacancies[0]
+        document = application.documents.first()
+        return [
+            reverse('hr_admin:dashboard'),
+            reverse('hr_admin:vacancy_list'),
+            reverse('hr_admin:vacancy_create'),
+            reverse('hr_admin:vacancy_edit', args=[vacancy.pk]),
+            reverse('hr_admin:shortlist', args=[vacancy.pk]),
+            reverse('hr_admin:application_list'),
+            reverse('hr_admin:application_list') + '?status=shortlisted',
+            reverse('hr_admin:application_detail', args=[application.pk]),
+            reverse('hr_admin:application_summary', args=[application.pk]),
+            reverse('hr_admin:interview_schedule', args=[application.pk]),
+            reverse('hr_admin:document_ocr', args=[document.pk]),
+            reverse('hr_admin:bulk_message'),
+            reverse('hr_admin:reports'),
+            reverse('hr_admin:diagnostics'),
+        ]
+
+    def test_hr_pages_do_not_repeat_queries(self):
+        for url in self.pages():
+            with self.subTest(url=url), inspect_queries(label=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
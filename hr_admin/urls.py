@@ -13,6 +13,7 @@ urlpatterns = [
     path('vacancies/<int:vacancy_pk>/shortlist/', views.shortlist_view, name='shortlist'),
     path('vacancies/<int:vacancy_pk>/export/', views.export_shortlist, name='export_shortlist'),
     path('applications/', views.application_list, name='application_list'),
+    path('applications/bulk-status/', views.application_bulk_status, name='application_bulk_status'),
     path('applications/<int:pk>/', views.application_detail, name='application_detail'),
     path('applications/<int:pk>/summary/', views.application_summary, name='application_summary'),
     path('applications/<int:application_pk>/interview/', views.interview_schedule, name='interview_schedule'),
@@ -20,4 +21,6 @@ urlpatterns = [
     path('vacancies/<int:vacancy_pk>/bulk-ocr/', views.bulk_ocr_vacancy, name='bulk_ocr_vacancy'),
     path('bulk-message/', views.bulk_message, name='bulk_message'),
     path('reports/', views.reports, name='reports'),
+    path('reports/export/', views.export_applications, name='export_applications'),
+    path('diagnostics/', views.diagnostics, name='diagnostics'),
 ]
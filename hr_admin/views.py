@@ -1,37 +1,35 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count, Avg
+from django.db import transaction
+from django.db.models import Q, Count, Avg, Value
+from django.db.models.functions import Concat
 from django.utils import timezone
-from django.http import HttpResponse
 from django.contrib.auth.models import User
 from recruitment.models import (
     Vacancy, Application, Document, Interview, InterviewScore,
     Notification, BulkMessage, CATEGORIES, QUALIFICATION_LEVELS, APPLICATION_STATUS
 )
+from recruitment.exports import (
+    APPLICATION_EXPORT_COLUMNS, Column, application_export_queryset, export_response, iter_rows, parquet_available,
+)
+from recruitment.query_inspector import allow_repeated_queries
+from recruitment.redirects import safe_next_url
+from recruitment.reporting import keep_source, reporting_view
+from recruitment.transitions import (
+    InvalidTransition, bulk_transition, can_transition, funnel, time_in_stage, transition,
+)
 from accounts.models import PROVINCES, ROLE_HR_ADMIN
-from .forms import VacancyForm, ApplicationFilterForm, BulkMessageForm, InterviewScheduleForm
+from accounts.roles import role_required
+from .forms import VacancyForm, ApplicationFilterForm, ApplicationExportForm, BulkMessageForm, InterviewScheduleForm
 import json
 from datetime import date
 
 
-def hr_required(func):
-    """Decorator to restrict access to HR admins only."""
-    @login_required
-    def wrapper(request, *args, **kwargs):
-        try:
-            if request.user.profile.role not in [ROLE_HR_ADMIN, 'hr_admin'] and not request.user.is_superuser:
-                messages.error(request, 'Access denied. HR Administrator role required.')
-                return redirect('recruitment:job_list')
-        except Exception:
-            messages.error(request, 'Access denied.')
-            return redirect('recruitment:job_list')
-        return func(request, *args, **kwargs)
-    wrapper.__name__ = func.__name__
-    return wrapper
+hr_required = role_required(ROLE_HR_ADMIN)
 
 
 @hr_required
+@reporting_view
 def dashboard(request):
     vacancies = Vacancy.objects.all()
     applications = Application.objects.all()
@@ -171,9 +169,46 @@ def application_list(request):
     })
 
 
+@hr_required
+def application_bulk_status(request):
+    """Move the selected applications to one status: one UPDATE, one batched history insert."""
+    next_url = safe_next_url(request, request.POST.get('next'), 'hr_admin:application_list')
+    if request.method != 'POST':
+        return redirect(next_url)
+
+    ids = [pk for pk in request.POST.getlist('selected_ids') if pk.isdigit()]
+    new_status = request.POST.get('status')
+    if not ids or new_status not in dict(APPLICATION_STATUS):
+        messages.error(request, 'Select at least one application and a status.')
+        return redirect(next_url)
+
+    changed = bulk_transition(Application.objects.filter(pk__in=ids), new_status, by=request.user)
+    status_display = dict(APPLICATION_STATUS)[new_status]
+    from recruitment.notifications import create_notifications
+    create_notifications([
+        Notification(
+            user_id=applicant_id,
+            title='Application Status Update',
+            message=f'Your application for {vacancy_title} has been updated to: {status_display}.',
+            notification_type='status_update',
+        )
+        for applicant_id, vacancy_title in Application.objects.filter(pk__in=changed).values_list(
+            'applicant_id', 'vacancy__title'
+        )
+    ])
+
+    skipped = len(ids) - len(changed)
+    if changed:
+        messages.success(request, f'{len(changed)} application(s) moved to {status_display}.')
+    if skipped:
+        messages.warning(request, f'{skipped} application(s) skipped: already {status_display} '
+                                  f'or not eligible for that status.')
+    return redirect(next_url)
+
+
 @hr_required
 def application_detail(request, pk):
-    application = get_object_or_404(Application, pk=pk)
+    application = get_object_or_404(Application.objects.select_related('vacancy', 'summary_blob'), pk=pk)
     documents = application.documents.all()
     interviews = application.interviews.select_related().prefetch_related('panel_members', 'panel_scores').all()
 
@@ -182,20 +217,30 @@ def application_detail(request, pk):
         if action == 'update_status':
             new_status = request.POST.get('status')
             if new_status in dict(APPLICATION_STATUS):
-                old_status = application.status
-                application.status = new_status
-                application.hr_notes = request.POST.get('hr_notes', application.hr_notes)
-                application.save()
-
-                # Notify applicant
+                hr_notes = request.POST.get('hr_notes', application.hr_notes)
+                notes_changed = hr_notes != application.hr_notes
+                application.hr_notes = hr_notes
                 status_display = dict(APPLICATION_STATUS).get(new_status, new_status)
-                Notification.objects.create(
-                    user=application.applicant,
-                    title=f'Application Status Update',
-                    message=f'Your application for {application.vacancy.title} has been updated to: {status_display}.',
-                    notification_type='status_update',
-                )
-                messages.success(request, f'Status updated to {status_display}.')
+                try:
+                    with transaction.atomic():
+                        changed = transition(application, new_status, by=request.user,
+                                             update_fields=['hr_notes'] if notes_changed else ())
+                        if changed:
+                            # Notify applicant
+                            Notification.objects.create(
+                                user=application.applicant,
+                                title=f'Application Status Update',
+                                message=f'Your application for {application.vacancy.title} has been updated to: {status_display}.',
+                                notification_type='status_update',
+                            )
+                except InvalidTransition as e:
+                    messages.error(request, str(e))
+                    return redirect('hr_admin:application_detail', pk=pk)
+
+                if changed:
+                    messages.success(request, f'Status updated to {status_display}.')
+                else:
+                    messages.info(request, f'Status is already {status_display}.' + (' Notes saved.' if notes_changed else ''))
 
         elif action == 'rescore':
             score = application.compute_score()
@@ -221,8 +266,7 @@ def application_detail(request, pk):
             else:
                 messages.warning(request, f'OCR found no readable text in "{doc.filename}".')
             # Refresh application summary
-            application.ai_summary = generate_application_summary(application)
-            application.save(update_fields=['ai_summary'])
+            application.set_summary(generate_application_summary(application))
 
         elif action == 'ocr_all':
             from recruitment.ocr_service import run_ocr_on_application_force
@@ -232,9 +276,7 @@ def application_detail(request, pk):
 
         elif action == 'regenerate_summary':
             from recruitment.ocr_service import generate_application_summary
-            summary = generate_application_summary(application)
-            application.ai_summary = summary
-            application.save(update_fields=['ai_summary'])
+            application.set_summary(generate_application_summary(application))
             messages.success(request, 'Application summary regenerated.')
 
         return redirect('hr_admin:application_detail', pk=pk)
@@ -248,6 +290,7 @@ def application_detail(request, pk):
 
 
 @hr_required
+@allow_repeated_queries
 def run_auto_screening(request, vacancy_pk):
     vacancy = get_object_or_404(Vacancy, pk=vacancy_pk)
     applications = vacancy.applications.all()
@@ -270,22 +313,25 @@ def shortlist_view(request, vacancy_pk):
 
     if request.method == 'POST' and request.POST.get('action') == 'shortlist':
         ids = request.POST.getlist('selected_ids')
-        Application.objects.filter(id__in=ids, vacancy=vacancy).update(status='shortlisted')
-        # Notify rejected
-        Application.objects.filter(vacancy=vacancy).exclude(id__in=ids).exclude(
-            status__in=['shortlisted', 'interview_scheduled', 'interviewed', 'selected', 'withdrawn']
-        ).update(status='rejected')
-
-        count = len(ids)
-        # Notify shortlisted applicants
-        for app in Application.objects.filter(id__in=ids):
-            Notification.objects.create(
-                user=app.applicant,
-                title='Congratulations - You Have Been Shortlisted!',
-                message=f'We are pleased to inform you that your application for {vacancy.title} '
-                        f'has been shortlisted. Further details regarding the interview will be provided shortly.',
-                notification_type='success',
-            )
+        shortlisted = bulk_transition(
+            Application.objects.filter(id__in=ids, vacancy=vacancy), 'shortlisted', by=request.user,
+        )
+        # Reject the rest of the unprogressed pool
+        bulk_transition(
+            Application.objects.filter(vacancy=vacancy, status__in=['submitted', 'under_review']).exclude(id__in=ids),
+            'rejected', by=request.user, note='Not shortlisted',
+        )
+
+        count = len(shortlisted)
+        # Notify newly shortlisted applicants (one shared message body, a receipt per applicant)
+        from recruitment.notifications import create_broadcast
+        create_broadcast(
+            title='Congratulations - You Have Been Shortlisted!',
+            message=f'We are pleased to inform you that your application for {vacancy.title} '
+                    f'has been shortlisted. Further details regarding the interview will be provided shortly.',
+            user_ids=Application.objects.filter(id__in=shortlisted).values_list('applicant_id', flat=True),
+            notification_type='success',
+        )
 
         messages.success(request, f'{count} applicants shortlisted and notified.')
         return redirect('hr_admin:shortlist', vacancy_pk=vacancy_pk)
@@ -311,38 +357,25 @@ def bulk_message(request):
             subject = form.cleaned_data['subject']
             message_body = form.cleaned_data['message']
 
-            applications = Application.objects.select_related('applicant')
-            if vacancy:
-                applications = applications.filter(vacancy=vacancy)
-            if status_filter:
-                applications = applications.filter(status=status_filter)
-
-            count = 0
-            for app in applications:
-                Notification.objects.create(
-                    user=app.applicant,
-                    title=subject,
-                    message=message_body,
-                    notification_type='info',
-                )
-                count += 1
-
-            BulkMessage.objects.create(
+            from recruitment.bulk_messaging import queue_bulk_message
+            bulk = queue_bulk_message(
                 vacancy=vacancy,
+                recipient_status=status_filter,
                 subject=subject,
                 message=message_body,
-                recipient_status=status_filter or '',
                 sent_by=request.user,
-                recipient_count=count,
             )
 
-            messages.success(request, f'Message sent to {count} applicants.')
+            messages.success(request, f'Message queued for delivery to {bulk.recipient_count} applicants.')
             return redirect('hr_admin:bulk_message')
     else:
         form = BulkMessageForm()
 
-    recent = BulkMessage.objects.order_by('-sent_at')[:10]
-    return render(request, 'hr_admin/bulk_message.html', {'form': form, 'recent': recent})
+    recent = BulkMessage.objects.select_related('vacancy').order_by('-sent_at')[:10]
+    return render(request, 'hr_admin/bulk_message.html', {
+        'form': form,
+        'message_history': recent,
+    })
 
 
 @hr_required
@@ -353,20 +386,24 @@ def interview_schedule(request, application_pk):
         if form.is_valid():
             interview = form.save(commit=False)
             interview.application = application
-            interview.save()
-            form.save_m2m()
-
-            application.status = 'interview_scheduled'
-            application.save()
-
-            Notification.objects.create(
-                user=application.applicant,
-                title='Interview Scheduled',
-                message=f'Your interview for {application.vacancy.title} has been scheduled for '
-                        f'{interview.scheduled_date.strftime("%A, %d %B %Y at %I:%M %p")} '
-                        f'at {interview.venue}. Please arrive 15 minutes early.',
-                notification_type='interview',
-            )
+            with transaction.atomic():
+                interview.save()
+                form.save_m2m()
+
+                if can_transition(application.status, 'interview_scheduled'):
+                    transition(application, 'interview_scheduled', by=request.user)
+                elif application.status != 'interview_scheduled':
+                    messages.warning(request, f'Application is {application.get_status_display()}; '
+                                              f'its status was left unchanged.')
+
+                Notification.objects.create(
+                    user=application.applicant,
+                    title='Interview Scheduled',
+                    message=f'Your interview for {application.vacancy.title} has been scheduled for '
+                            f'{interview.scheduled_date.strftime("%A, %d %B %Y at %I:%M %p")} '
+                            f'at {interview.venue}. Please arrive 15 minutes early.',
+                    notification_type='interview',
+                )
 
             messages.success(request, 'Interview scheduled and applicant notified.')
             return redirect('hr_admin:application_detail', pk=application_pk)
@@ -380,6 +417,7 @@ def interview_schedule(request, application_pk):
 
 
 @hr_required
+@reporting_view
 def reports(request):
     applications = Application.objects.all()
     vacancy_filter = request.GET.get('vacancy', '')
@@ -406,60 +444,68 @@ def reports(request):
         'province_labels': province_labels,
         'province_counts': province_counts,
         'total_applications': applications.count(),
+        'funnel': funnel(vacancy_filter or None),
+        'stage_durations': time_in_stage(vacancy_filter or None),
+        'export_form': ApplicationExportForm(initial={'vacancy': vacancy_filter or None}),
     })
 
 
+SHORTLIST_EXPORT_COLUMNS = [
+    Column('Full Name', 'full_name_export', width=25),
+    Column('Gender', 'gender'),
+    Column('Province', 'province', width=20),
+    Column('Qualification', 'highest_qualification', display=dict(QUALIFICATION_LEVELS), width=18),
+    Column('Institution', 'institution'),
+    Column('Grade', 'grade_result'),
+    Column('Experience (yrs)', 'years_experience'),
+    Column('Phone', 'phone'),
+    Column('Email', 'email'),
+    Column('Score', 'total_score', display=lambda score: score or 0),
+    Column('Status', 'status', display=dict(APPLICATION_STATUS)),
+]
+
+
 @hr_required
+@reporting_view
 def export_shortlist(request, vacancy_pk):
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment
-
+    """Shortlisted applicants as XLSX (default) or ?format=csv, streamed from a chunked values_list()."""
     vacancy = get_object_or_404(Vacancy, pk=vacancy_pk)
     applications = vacancy.applications.filter(
         status__in=['shortlisted', 'interview_scheduled', 'interviewed', 'selected']
+    ).annotate(
+        full_name_export=Concat('first_name', Value(' '), 'last_name'),
     ).order_by('-total_score')
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'Shortlist'
-
-    header_fill = PatternFill(start_color='003087', end_color='003087', fill_type='solid')
-    header_font = Font(color='FFFFFF', bold=True)
-
-    headers = ['#', 'Full Name', 'Gender', 'Province', 'Qualification', 'Institution',
-               'Grade', 'Experience (yrs)', 'Phone', 'Email', 'Score', 'Status']
-    for col, h in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=h)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center')
-
-    for i, app in enumerate(applications, 1):
-        ws.append([
-            i,
-            app.full_name(),
-            app.gender,
-            app.province,
-            app.get_highest_qualification_display(),
-            app.institution,
-            app.grade_result,
-            app.years_experience,
-            app.phone,
-            app.email,
-            app.total_score or 0,
-            app.get_status_display(),
-        ])
-
-    ws.column_dimensions['B'].width = 25
-    ws.column_dimensions['D'].width = 20
-    ws.column_dimensions['E'].width = 18
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    rows = keep_source(iter_rows(applications, SHORTLIST_EXPORT_COLUMNS))
+    export_format = 'csv' if request.GET.get('format') == 'csv' else 'xlsx'
+    return export_response(
+        export_format, SHORTLIST_EXPORT_COLUMNS, rows, f'shortlist_{vacancy.reference_number}',
+        title='Shortlist', number_rows=True,
     )
-    response['Content-Disposition'] = f'attachment; filename="shortlist_{vacancy.reference_number}.xlsx"'
-    wb.save(response)
-    return response
+
+
+@hr_required
+@reporting_view
+def export_applications(request):
+    """Every application matching the filters, streamed as CSV, XLSX or Parquet (see recruitment/exports.py)."""
+    form = ApplicationExportForm(request.GET)
+    if not form.is_valid():
+        messages.error(request, 'Invalid export filters.')
+        return redirect('hr_admin:reports')
+    export_format = form.cleaned_data['format']
+    if export_format == 'parquet' and not parquet_available():
+        messages.error(request, 'Parquet exports are not available on this server.')
+        return redirect('hr_admin:reports')
+
+    applications = application_export_queryset(
+        vacancy=form.cleaned_data['vacancy'],
+        date_from=form.cleaned_data['date_from'],
+        date_to=form.cleaned_data['date_to'],
+        since=form.cleaned_data['since'],
+    )
+    rows = keep_source(iter_rows(applications, APPLICATION_EXPORT_COLUMNS))
+    basename = f"applications_{timezone.localtime().strftime('%Y%m%d_%H%M')}"
+    return export_response(export_format, APPLICATION_EXPORT_COLUMNS, rows, basename, title='Applications')
 
 
 # ---------- OCR & Summary Views ----------
@@ -467,14 +513,13 @@ def export_shortlist(request, vacancy_pk):
 @hr_required
 def application_summary(request, pk):
     """Full printable summary of an application including all OCR text."""
-    application = get_object_or_404(Application, pk=pk)
-    documents = application.documents.all()
+    application = get_object_or_404(Application.objects.select_related('vacancy', 'summary_blob'), pk=pk)
+    documents = application.documents.select_related('text_blob')
 
     # If no summary exists, generate one now
     if not application.ai_summary:
         from recruitment.ocr_service import generate_application_summary
-        application.ai_summary = generate_application_summary(application)
-        application.save(update_fields=['ai_summary'])
+        application.set_summary(generate_application_summary(application))
 
     return render(request, 'hr_admin/application_summary.html', {
         'application': application,
@@ -485,22 +530,21 @@ def application_summary(request, pk):
 @hr_required
 def document_ocr_view(request, doc_pk):
     """View full OCR-extracted text for a single document."""
-    doc = get_object_or_404(Document, pk=doc_pk)
+    doc = get_object_or_404(Document.objects.select_related('text_blob', 'application'), pk=doc_pk)
 
     if request.method == 'POST' and request.POST.get('action') == 're_ocr':
         from recruitment.ocr_service import run_ocr_on_document, generate_application_summary
         run_ocr_on_document(doc)
         doc.refresh_from_db()
-        app = doc.application
-        app.ai_summary = generate_application_summary(app)
-        app.save(update_fields=['ai_summary'])
-        messages.success(request, f'OCR re-run complete: {len(doc.ocr_text.split())} words extracted.')
+        doc.application.set_summary(generate_application_summary(doc.application))
+        messages.success(request, f'OCR re-run complete: {doc.ocr_word_count} words extracted.')
         return redirect('hr_admin:document_ocr', doc_pk=doc_pk)
 
     return render(request, 'hr_admin/document_ocr.html', {'doc': doc})
 
 
 @hr_required
+@allow_repeated_queries
 def bulk_ocr_vacancy(request, vacancy_pk):
     """Run OCR on all documents for all applications under a vacancy."""
     from recruitment.ocr_service import run_ocr_on_application
@@ -516,3 +560,21 @@ def bulk_ocr_vacancy(request, vacancy_pk):
         f'All summaries have been updated.'
     )
     return redirect('hr_admin:application_list')
+
+
+@hr_required
+def diagnostics(request):
+    """Slow requests caught by the profiling middleware in this worker process."""
+    from recruitment import profiling
+    if request.method == 'POST':
+        profiling.clear()
+        messages.success(request, 'Slow request log cleared.')
+        return redirect('hr_admin:diagnostics')
+
+    return render(request, 'hr_admin/diagnostics.html', {
+        'slow_requests': profiling.slow_requests(),
+        'counters': profiling.counters(),
+        'profiling_enabled': profiling.enabled(),
+        'sample_rate_percent': round(profiling.sample_rate() * 100, 1),
+        'slow_ms': profiling.slow_ms(),
+    })
@@ -0,0 +1,69 @@
+"""
+Panel Work Queue Queries
+Loads a panel member's interviews with everything the dashboard and scoring
+page display, so neither template triggers follow-up queries per row.
+"""
+from django.db.models import BooleanField, Case, Exists, OuterRef, Prefetch, Value, When
+from django.utils import timezone
+
+from recruitment.models import Document, Interview, InterviewScore
+
+QUEUE_STATUSES = ['scheduled', 'completed']
+
+
+def work_queue(user):
+    """
+    All interviews assigned to `user`, oldest first, with application and
+    vacancy joined in and two annotations:
+      has_my_score — the user has already submitted a score
+      is_past      — the scheduled date has passed
+    Evaluates as a single SELECT.
+    """
+    my_score = InterviewScore.objects.filter(interview=OuterRef('pk'), panel_member=user)
+    return (
+        Interview.objects
+        .filter(panel_members=user, status__in=QUEUE_STATUSES)
+        .select_related('application__vacancy')
+        .annotate(
+            has_my_score=Exists(my_score),
+            is_past=Case(
+                When(scheduled_date__lt=timezone.now(), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+        .order_by('scheduled_date')
+    )
+
+
+def split_work_queue(interviews):
+    """Partition an evaluated work queue into (pending, scored) lists."""
+    pending, scored = [], []
+    for interview in interviews:
+        (scored if interview.has_my_score else pending).append(interview)
+    return pending, scored
+
+
+def scoring_queryset(user):
+    """
+    Interviews `user` may score, prepared for the scoring page: application
+    and vacancy joined, documents and the user's own score prefetched
+    (exposed as `application.prefetched_documents` and `interview.my_scores`).
+    """
+    return (
+        Interview.objects
+        .filter(panel_members=user)
+        .select_related('application__vacancy', 'application__summary_blob')
+        .prefetch_related(
+            Prefetch(
+                'application__documents',
+                queryset=Document.objects.order_by('uploaded_at'),
+                to_attr='prefetched_documents',
+            ),
+            Prefetch(
+                'panel_scores',
+                queryset=InterviewScore.objects.filter(panel_member=user),
+                to_attr='my_scores',
+            ),
+        )
+    )
@@ -1,50 +1,33 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from recruitment.models import Interview, InterviewScore, Application
+from django.db import transaction
+from recruitment.transitions import can_transition, transition
 from accounts.models import ROLE_PANEL
+from accounts.roles import role_required
 from .forms import InterviewScoreForm
+from .queries import work_queue, split_work_queue, scoring_queryset
 
 
-def panel_required(func):
-    @login_required
-    def wrapper(request, *args, **kwargs):
-        try:
-            if request.user.profile.role not in [ROLE_PANEL, 'panel_member'] and not request.user.is_superuser:
-                messages.error(request, 'Access denied. Panel Member role required.')
-                return redirect('recruitment:job_list')
-        except Exception:
-            messages.error(request, 'Access denied.')
-            return redirect('recruitment:job_list')
-        return func(request, *args, **kwargs)
-    wrapper.__name__ = func.__name__
-    return wrapper
+panel_required = role_required(ROLE_PANEL)
 
 
 @panel_required
 def dashboard(request):
-    interviews = Interview.objects.filter(
-        panel_members=request.user,
-        status__in=['scheduled', 'completed']
-    ).select_related('application__vacancy').order_by('scheduled_date')
-
-    scored_ids = InterviewScore.objects.filter(
-        panel_member=request.user
-    ).values_list('interview_id', flat=True)
+    interviews = list(work_queue(request.user))
+    pending, scored = split_work_queue(interviews)
 
     return render(request, 'panel/dashboard.html', {
         'interviews': interviews,
-        'scored_ids': list(scored_ids),
+        'pending': pending,
+        'scored': scored,
     })
 
 
 @panel_required
 def application_view(request, interview_pk):
-    interview = get_object_or_404(Interview, pk=interview_pk, panel_members=request.user)
+    interview = get_object_or_404(scoring_queryset(request.user), pk=interview_pk)
     application = interview.application
-    existing_score = InterviewScore.objects.filter(
-        interview=interview, panel_member=request.user
-    ).first()
+    existing_score = interview.my_scores[0] if interview.my_scores else None
 
     if request.method == 'POST' and not existing_score:
         form = InterviewScoreForm(request.POST)
@@ -52,13 +35,15 @@ def application_view(request, interview_pk):
             score_obj = form.save(commit=False)
             score_obj.interview = interview
             score_obj.panel_member = request.user
-            score_obj.save()
+            with transaction.atomic():
+                score_obj.save()
 
-            interview.status = 'completed'
-            interview.save()
+                interview.status = 'completed'
+                interview.save(update_fields=['status'])
 
-            application.status = 'interviewed'
-            application.save()
+                # Later panel members find the application already interviewed
+                if can_transition(application.status, 'interviewed'):
+                    transition(application, 'interviewed', by=request.user)
 
             messages.success(request, 'Interview score submitted successfully.')
             return redirect('panel:dashboard')
@@ -70,5 +55,5 @@ def application_view(request, interview_pk):
         'application': application,
         'form': form,
         'existing_score': existing_score,
-        'documents': application.documents.all(),
+        'documents': application.prefetched_documents,
     })
@@ -3,6 +3,11 @@ ASGI config for pngcs project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the site through this module (e.g. ``uvicorn pngcs.asgi:application``)
+to enable live updates: the /events/ server-sent event stream holds one
+connection per open page, which ASGI handles without tying up a worker
+thread. Under WSGI the stream is disabled and pages simply don't update live.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
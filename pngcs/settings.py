@@ -46,11 +46,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "recruitment.profiling.ProfilingMiddleware",
+    "recruitment.query_inspector.QueryInspectorMiddleware",
+    "recruitment.bandwidth.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.roles.RoleMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -67,6 +71,8 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "accounts.context_processors.role",
+                "recruitment.context_processors.notifications",
             ],
         },
     },
@@ -78,13 +84,51 @@ WSGI_APPLICATION = "pngcs.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite is tuned for concurrent use: WAL lets readers run alongside the
+# single writer, busy_timeout makes writers queue for the lock instead of
+# failing with "database is locked", and IMMEDIATE transactions take the write
+# lock up front so a read-then-write transaction can never deadlock on upgrade.
+# That also queues read-only atomic() blocks behind writers; it is acceptable
+# because reads outside atomic() (page views, the reporting snapshot) never
+# take the lock and this app's atomic() blocks all write and are short.
+# Run `manage.py sqlite_maintenance` nightly to keep statistics and free pages
+# in order (once with --enable-incremental-vacuum to turn on auto_vacuum).
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA busy_timeout=20000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA temp_store=MEMORY",
+]
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "OPTIONS": {
+            "init_command": ";".join(SQLITE_PRAGMAS),
+            "transaction_mode": "IMMEDIATE",
+        },
+    },
+    # Read-only copy for HR reports and exports, refreshed from 'default' with
+    # SQLite's online backup (see recruitment/reporting.py)
+    "reporting": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "reporting.sqlite3",
+        "OPTIONS": {
+            "init_command": "PRAGMA query_only=ON;PRAGMA mmap_size=268435456;PRAGMA cache_size=-32000",
+        },
+        "TEST": {"MIRROR": "default"},
+    },
 }
 
+DATABASE_ROUTERS = ['recruitment.reporting.ReportingRouter']
+
+# Reporting pages fall back to the live database (and queue a refresh) once
+# the snapshot is older than this many seconds
+RECRUITMENT_REPORTING_MAX_AGE = 15 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -127,6 +171,78 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Application drafts: chunked uploads collect here until complete (never
+# served), and `purge_drafts` removes drafts untouched for this many days.
+RECRUITMENT_PARTIAL_UPLOAD_DIR = MEDIA_ROOT / 'partial-uploads'
+RECRUITMENT_DRAFT_MAX_AGE_DAYS = 30
+
+# Hand document transfers to the front-end server after the access check:
+# None (Django streams the file), 'x-accel-redirect' (nginx) or 'x-sendfile'.
+# For nginx, RECRUITMENT_SENDFILE_PREFIX must be an `internal` location
+# aliased to MEDIA_ROOT.
+RECRUITMENT_SENDFILE = None
+RECRUITMENT_SENDFILE_PREFIX = '/protected-media/'
+
+# Caches hold the public vacancy pages and per-user unread counters. The
+# default local-memory cache is per process; when running several workers,
+# set CACHE_DIR (e.g. BASE_DIR / 'cache') to share a file-based cache so they
+# agree on the vacancy version and counters.
+CACHE_DIR = None
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pngcs",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    } if CACHE_DIR is None else {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": CACHE_DIR,
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+
+# OCR text and application summaries are zlib-compressed in their side tables
+RECRUITMENT_COMPRESS_TEXT = True
+
+# Background jobs (bulk message fan-out, document OCR) run on a small in-process thread pool.
+# Set RECRUITMENT_JOBS_EAGER = True to run them inline instead.
+RECRUITMENT_JOBS_EAGER = False
+RECRUITMENT_JOB_WORKERS = 2
+
+# Request profiling: every response gets a Server-Timing total; for HR and
+# staff a sampled share also gets SQL, template and view time (every request,
+# for everyone, when DEBUG is on).
+# Requests slower than RECRUITMENT_PROFILING_SLOW_MS are kept, per process,
+# for the HR diagnostics page.
+RECRUITMENT_PROFILING = True
+RECRUITMENT_PROFILING_SAMPLE_RATE = 0.05
+RECRUITMENT_PROFILING_SLOW_MS = 1000
+RECRUITMENT_PROFILING_BUFFER_SIZE = 200
+RECRUITMENT_SERVER_TIMING = True
+
+# Repeated query detection (N+1 loops, duplicate lookups) per request:
+# 'log' warns, 'raise' fails the request, None disables it. TEST_RUNNER
+# switches it to 'raise' so regressions fail the suite instead of reaching
+# production.
+RECRUITMENT_QUERY_INSPECTOR = 'log' if DEBUG else None
+RECRUITMENT_QUERY_REPEAT_THRESHOLD = 5
+RECRUITMENT_QUERY_DUPLICATE_THRESHOLD = 3
+
+TEST_RUNNER = 'pngcs.test_runner.TestRunner'
+
+# Compress HTML and JSON responses: brotli when the client accepts it and the
+# optional `brotli` package is installed, gzip otherwise. Leave this off if
+# the front-end server already compresses.
+RECRUITMENT_COMPRESSION = True
+RECRUITMENT_BROTLI = True
+RECRUITMENT_BROTLI_QUALITY = 5
+
+# Live page updates are pushed over server-sent events, which need the ASGI
+# app (e.g. `uvicorn pngcs.asgi:application`). LocalBroker only reaches pages
+# served by the same process; point this at a shared broker when running
+# several workers.
+RECRUITMENT_EVENT_BROKER = 'recruitment.events.LocalBroker'
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = 'bootstrap5'
 CRISPY_TEMPLATE_PACK = 'bootstrap5'
 
@@ -136,12 +252,32 @@ LOGOUT_REDIRECT_URL = '/'
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@pngcs.gov.pg'
+# For real delivery switch to 'django.core.mail.backends.smtp.EmailBackend'. To test
+# against a local stand-in, run `python -m aiosmtpd -n -l localhost:1025`.
+EMAIL_HOST = 'localhost'
+EMAIL_PORT = 1025
+EMAIL_TIMEOUT = 30
+
+# Outbound notification email queue (drained by `manage.py send_queued_emails`)
+RECRUITMENT_EMAIL_NOTIFICATIONS = True
+RECRUITMENT_EMAIL_BATCH_SIZE = 100
+RECRUITMENT_EMAIL_RATE_LIMIT = 5        # messages per second, 0 = unlimited
+RECRUITMENT_EMAIL_MAX_ATTEMPTS = 5
+RECRUITMENT_EMAIL_RETRY_BASE = 60       # seconds; doubles on each failed attempt
+RECRUITMENT_EMAIL_MAX_BACKOFF = 3600
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
      'OPTIONS': {'min_length': 6}},
 ]
 
+# Signed-in users are loaded together with their profile. ModelBackend stays
+# listed so sessions started before the switch remain valid.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
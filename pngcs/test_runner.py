@@ -0,0 +1,19 @@
+"""
+Test Runner
+DiscoverRunner with the settings the test suite always runs under:
+repeated query detection raises, so an N+1 loop fails the test that
+renders the page instead of reaching production.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._query_inspector = getattr(settings, 'RECRUITMENT_QUERY_INSPECTOR', None)
+        settings.RECRUITMENT_QUERY_INSPECTOR = 'raise'
+
+    def teardown_test_environment(self, **kwargs):
+        settings.RECRUITMENT_QUERY_INSPECTOR = self._query_inspector
+        super().teardown_test_environment(**kwargs)
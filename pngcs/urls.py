@@ -19,7 +19,6 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.shortcuts import redirect
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,4 +26,8 @@ urlpatterns = [
     path('', include('recruitment.urls', namespace='recruitment')),
     path('hr/', include('hr_admin.urls', namespace='hr_admin')),
     path('panel/', include('panel.urls', namespace='panel')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# Documents are never served from MEDIA_URL: recruitment:document_download
+# checks access first. Only profile photos are exposed, in development.
+urlpatterns += static(settings.MEDIA_URL + 'profiles/', document_root=settings.MEDIA_ROOT / 'profiles')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Vacancy, Application, Document, Interview, InterviewScore, Notification, BulkMessage
+from .models import Vacancy, Application, Document, Interview, InterviewScore, Notification, BulkMessage, OutboundEmail, Broadcast, ApplicationStatusChange, ApplicationDraft, DraftUpload
 
 
 @admin.register(Vacancy)
@@ -21,3 +21,44 @@ admin.site.register(Interview)
 admin.site.register(InterviewScore)
 admin.site.register(Notification)
 admin.site.register(BulkMessage)
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ['title', 'notification_type', 'created_at']
+    search_fields = ['title']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['to_email', 'subject']
+
+
+@admin.register(ApplicationStatusChange)
+class ApplicationStatusChangeAdmin(admin.ModelAdmin):
+    list_display = ['application', 'from_status', 'to_status', 'changed_at', 'changed_by']
+    list_filter = ['to_status', 'from_status']
+    raw_id_fields = ['application']
+
+    # The history is append-only
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class DraftUploadInline(admin.TabularInline):
+    model = DraftUpload
+    extra = 0
+    fields = ['filename', 'doc_type', 'size', 'received', 'file']
+    readonly_fields = fields
+
+
+@admin.register(ApplicationDraft)
+class ApplicationDraftAdmin(admin.ModelAdmin):
+    list_display = ['applicant', 'vacancy', 'version', 'application', 'updated_at']
+    raw_id_fields = ['applicant', 'vacancy', 'application']
+    inlines = [DraftUploadInline]
@@ -7,3 +7,6 @@ class RecruitmentConfig(AppConfig):
 
     def ready(self):
         import recruitment.signals  # noqa: F401 — register signal handlers
+        from recruitment import profiling, query_inspector
+        profiling.install()
+        query_inspector.install()
@@ -0,0 +1,202 @@
+"""
+Low-Bandwidth Delivery
+Keeps the bytes sent to applicants on slow mobile links down:
+
+- conditional_page() gives job_list, job_detail and the applicant dashboard
+  an ETag and Last-Modified worked out from a few cheap lookups (vacancy and
+  application updated_at, the latest notification) before the page is built.
+  A repeat visit to an unchanged page is answered 304 Not Modified without
+  rendering anything.
+- A low-bandwidth variant of those pages (templates under `lite/`) uses no
+  web fonts, stylesheets or scripts from CDNs. It is chosen with ?lite=1
+  (remembered in a cookie, ?lite=0 switches back) or by a Save-Data: on header.
+- CompressionMiddleware compresses HTML and JSON responses, with brotli when
+  the client accepts it and the `brotli` package is installed, gzip otherwise.
+"""
+import hashlib
+import os
+import re
+from datetime import datetime, time as dt_time
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import http_date, quote_etag
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are gzipped
+    brotli = None
+
+LITE_COOKIE = 'lite'
+LITE_COOKIE_AGE = 365 * 24 * 60 * 60
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------- Low-Bandwidth Variant ----------
+
+def low_bandwidth(request):
+    """Whether to serve the low-bandwidth variant: ?lite=, then the lite cookie, then Save-Data."""
+    choice = getattr(request, 'low_bandwidth', None)
+    if choice is None:
+        choice = request.GET.get('lite', request.COOKIES.get(LITE_COOKIE))
+        if choice in ('0', '1'):
+            choice = choice == '1'
+        else:
+            choice = request.headers.get('Save-Data', '').lower() == 'on'
+        request.low_bandwidth = choice
+    return choice
+
+
+def page_template(request, name):
+    """`recruitment/job_list.html` becomes `lite/job_list.html` in low-bandwidth mode."""
+    return f'lite/{os.path.basename(name)}' if low_bandwidth(request) else name
+
+
+def _remember_choice(request, response):
+    choice = request.GET.get('lite')
+    if choice == '1':
+        response.set_cookie(LITE_COOKIE, '1', max_age=LITE_COOKIE_AGE, samesite='Lax')
+    elif choice == '0':
+        response.delete_cookie(LITE_COOKIE, samesite='Lax')
+
+
+# ---------- Conditional Requests ----------
+
+@lru_cache(maxsize=None)
+def _templates_version():
+    """Newest template file time, so a deploy that changes the pages changes every ETag."""
+    newest = 0
+    for config in settings.TEMPLATES:
+        for directory in config.get('DIRS', []):
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return newest
+
+
+def _viewer_parts(request):
+    """What every page also depends on: the variant, the day, and who is looking."""
+    parts = [_templates_version(), low_bandwidth(request), timezone.localdate().isoformat()]
+    user = request.user
+    if user.is_authenticated:
+        from accounts.roles import get_role
+        from recruitment.notifications import get_unread_count
+        parts += [user.pk, user.get_username(), user.get_full_name(), user.email, str(get_role(request)),
+                  get_unread_count(user)]
+    return parts
+
+
+def _start_of_day():
+    return timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+
+
+def _has_pending_messages(request):
+    # A flash message makes the page one-off; iterating would consume it, len() does not
+    return bool(len(get_messages(request)))
+
+
+def conditional_page(validators):
+    """
+    Answer GETs with 304 Not Modified when the page has not changed.
+    `validators(request, *args, **kwargs)` returns (parts, last_modified)
+    describing the data the page shows, or None to skip the check (e.g. for
+    a page that will 404). The ETag hashes those parts with the variant, the
+    day and the viewer. It is weak because it stands for the data shown, not
+    the bytes, so the 200 and the 304 carry the same ETag whether or not the
+    page is compressed. Last-Modified is never earlier than today's start,
+    since open and closed vacancies change at midnight.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            low_bandwidth(request)
+            request.low_bandwidth_available = True
+            etag = last_modified = response = None
+            if request.method in ('GET', 'HEAD') and not _has_pending_messages(request):
+                found = validators(request, *args, **kwargs)
+                if found is not None:
+                    parts, changed_at = found
+                    digest = hashlib.md5(repr(list(parts) + _viewer_parts(request)).encode()).hexdigest()
+                    etag = f'W/{quote_etag(digest)}'
+                    last_modified = int(max(filter(None, [changed_at, _start_of_day()])).timestamp())
+                    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if etag and response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+            # Revalidate on every visit: a 304 costs a few hundred bytes
+            if request.user.is_authenticated:
+                patch_cache_control(response, no_cache=True, private=True)
+            else:
+                patch_cache_control(response, no_cache=True)
+            vary = ['Cookie', 'Save-Data']
+            if _setting('RECRUITMENT_COMPRESSION', True):
+                # The 200 is compressed; CompressionMiddleware skips the empty 304, whose
+                # headers caches copy onto the stored page
+                vary.append('Accept-Encoding')
+            patch_vary_headers(response, vary)
+            _remember_choice(request, response)
+            return response
+        return wrapper
+    return decorator
+
+
+# ---------- Compression ----------
+
+COMPRESSIBLE_TYPES = {'text/html', 'application/json', 'text/plain', 'text/css', 'text/javascript', 'application/javascript'}
+MIN_COMPRESS_SIZE = 200  # bytes; smaller bodies grow when compressed
+_ACCEPTS_BR = re.compile(r'\bbr\b')
+_ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+def _compress(request, content):
+    """(encoding, body) for the best encoding the client accepts, or (None, content)."""
+    accepted = request.headers.get('Accept-Encoding', '')
+    if brotli is not None and _setting('RECRUITMENT_BROTLI', True) and _ACCEPTS_BR.search(accepted):
+        return 'br', brotli.compress(content, quality=_setting('RECRUITMENT_BROTLI_QUALITY', 5))
+    if _ACCEPTS_GZIP.search(accepted):
+        # Random bytes in the gzip header, as GZipMiddleware adds against BREACH
+        return 'gzip', compress_string(content, max_random_bytes=100)
+    return None, content
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses HTML, JSON and other text responses. Streamed responses
+    (documents, exports, the event stream) are left alone. Place near the top
+    of MIDDLEWARE so it sees the final body. Settings: RECRUITMENT_COMPRESSION
+    (on/off), RECRUITMENT_BROTLI (prefer brotli), RECRUITMENT_BROTLI_QUALITY.
+    """
+
+    def process_response(self, request, response):
+        if not _setting('RECRUITMENT_COMPRESSION', True):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if (
+            response.streaming
+            or content_type not in COMPRESSIBLE_TYPES
+            or response.has_header('Content-Encoding')
+            or len(response.content) < MIN_COMPRESS_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding, body = _compress(request, response.content)
+        if encoding is None or len(body) >= len(response.content):
+            return response
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        # The bytes differ from the uncompressed page, so a strong ETag no longer holds
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,279 @@
+"""
+Benchmarks
+Times the portal's hot paths: screening scores, application summaries, OCR
+keyword extraction and text extraction routing on fixture files, and the
+busiest applicant and HR pages rendered through the test client.
+
+Each benchmark is called `warmup` times untimed, then `repeat` times timed.
+Results hold throughput, latency percentiles and the SQL query count of one
+call, and are plain dicts so they can be saved as JSON and compared against a
+stored baseline. Run them with `manage.py benchmark`.
+"""
+import logging
+import os
+import platform
+import tempfile
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.utils import timezone
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Benchmark:
+    """
+    A named callable to time. `setup(context)` runs once before timing and
+    returns the argument passed to every `func` call; `context` is shared by
+    all benchmarks in a run (users, fixture files, the test client).
+    """
+
+    def __init__(self, name, func, setup=None, group='python'):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.group = group
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(int(round(p / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the queries run inside the block on every database alias, so pages
+    served from the 'reporting' snapshot are counted too. Unlike
+    CaptureQueriesContext this does not open a connection to unused aliases.
+    """
+    counts = Counter()
+
+    def counter(alias):
+        def wrapper(execute, sql, params, many, context):
+            counts[alias] += 1
+            return execute(sql, params, many, context)
+        return wrapper
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(counter(alias)))
+        yield counts
+
+
+def run_benchmark(benchmark, context, repeat=50, warmup=3):
+    """Time one benchmark and return its result dict (latencies in milliseconds)."""
+    argument = benchmark.setup(context) if benchmark.setup else None
+    for _ in range(warmup):
+        benchmark.func(argument)
+
+    samples = []
+    with count_queries() as queries:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            call_started = time.perf_counter()
+            benchmark.func(argument)
+            samples.append((time.perf_counter() - call_started) * 1000)
+        total = time.perf_counter() - started
+    samples.sort()
+
+    result = {
+        'group': benchmark.group,
+        'calls': repeat,
+        'ops_per_sec': round(repeat / total, 2) if total else None,
+        'mean_ms': round(sum(samples) / len(samples), 4),
+        'min_ms': round(samples[0], 4),
+        'max_ms': round(samples[-1], 4),
+        'queries': round(sum(queries.values()) / repeat, 2),
+    }
+    for p in PERCENTILES:
+        result[f'p{p}_ms'] = round(percentile(samples, p), 4)
+    return result
+
+
+def environment():
+    """What the numbers were measured on, saved alongside them."""
+    import django
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'database': connections['default'].vendor,
+        'measured_at': timezone.now().isoformat(timespec='seconds'),
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare a run with a baseline run. A benchmark regresses when its median
+    grew by more than `tolerance` (0.2 = 20%) or it issues more queries.
+    Returns a list of (name, current, previous, change, regressed) rows;
+    `previous` is None for benchmarks missing from the baseline.
+    """
+    rows = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            rows.append((name, current, None, None, False))
+            continue
+        change = current['p50_ms'] / previous['p50_ms'] - 1 if previous['p50_ms'] else 0.0
+        regressed = change > tolerance or current['queries'] > previous['queries']
+        rows.append((name, current, previous, change, regressed))
+    return rows
+
+
+# ---------- Fixtures ----------
+
+FIXTURE_TEXT = (
+    'Curriculum Vitae. Bachelor degree in Accounting and Finance, Grade 12 certificate. '
+    'Five years of administration, procurement and audit experience with strong leadership, '
+    'communication and teamwork skills. Proficient in Microsoft Office, Excel and Word. '
+)
+
+
+def make_fixture_files(directory):
+    """Write a text PDF, a scanned-style JPEG and a DOCX into `directory`; returns {kind: path}."""
+    import random
+    from recruitment.management.commands.generate_load_data import synthetic_image, synthetic_pdf
+
+    files = {}
+    files['pdf'] = os.path.join(directory, 'cv.pdf')
+    with open(files['pdf'], 'wb') as f:
+        f.write(synthetic_pdf(FIXTURE_TEXT[:80], 20 * 1024))
+    files['image'] = os.path.join(directory, 'certificate.jpg')
+    with open(files['image'], 'wb') as f:
+        f.write(synthetic_image(random.Random(1), 'Grade 12 Certificate', 100 * 1024))
+    try:
+        from docx import Document as DocxDocument
+        docx = DocxDocument()
+        for _ in range(20):
+            docx.add_paragraph(FIXTURE_TEXT)
+        files['docx'] = os.path.join(directory, 'reference.docx')
+        docx.save(files['docx'])
+    except ImportError:
+        pass
+    return files
+
+
+# ---------- Benchmarks ----------
+
+def _busiest_application(context):
+    from django.db.models import Count
+    from recruitment.models import Application
+    return (
+        Application.objects.annotate(document_count=Count('documents'))
+        .order_by('-document_count', 'pk').first()
+    )
+
+
+def _get(url_name, user_key=None, data=None, cached=False):
+    """
+    A benchmark function requesting a page as the context's user for
+    `user_key` (None = anonymous). Unless `cached`, the public vacancy cache
+    is invalidated before every call, so anonymous pages time the view rather
+    than a cache_public_page hit.
+    """
+    from django.urls import reverse
+
+    from recruitment.vacancy_cache import bump_vacancy_version
+
+    def setup(context):
+        client = context['client_factory']()
+        if user_key:
+            client.force_login(context[user_key])
+        if not cached:
+            bump_vacancy_version()
+        return client, reverse(url_name), data or {}
+
+    def request(argument):
+        client, url, params = argument
+        if not cached:
+            bump_vacancy_version()
+        response = client.get(url, params)
+        if response.status_code != 200:
+            raise AssertionError(f'{url} returned {response.status_code}')
+
+    return setup, request
+
+
+def _extraction(kind):
+    from recruitment.ocr_service import extract_text_from_document
+
+    def setup(context):
+        return context['files'].get(kind)
+
+    def extract(path):
+        if path:
+            extract_text_from_document(path)
+
+    return setup, extract
+
+
+def default_benchmarks():
+    from recruitment.ocr_service import _extract_keywords, generate_application_summary
+
+    benchmarks = [
+        Benchmark('compute_score', lambda application: application.compute_score(), _busiest_application),
+        Benchmark('generate_application_summary', generate_application_summary, _busiest_application),
+        Benchmark('extract_keywords', _extract_keywords, lambda context: FIXTURE_TEXT * 20),
+    ]
+    for kind in ('pdf', 'image', 'docx'):
+        setup, func = _extraction(kind)
+        benchmarks.append(Benchmark(f'extract_text_{kind}', func, setup, group='ocr'))
+    for name, url_name, user_key, data, cached in (
+        ('view_job_list', 'recruitment:job_list', None, None, False),
+        ('view_job_list_cached', 'recruitment:job_list', None, None, True),
+        ('view_dashboard', 'recruitment:dashboard', 'applicant', None, False),
+        ('view_application_list', 'hr_admin:application_list', 'hr', None, False),
+        ('view_application_list_filtered', 'hr_admin:application_list', 'hr', {'status': 'shortlisted'}, False),
+        ('view_reports', 'hr_admin:reports', 'hr', None, False),
+        ('view_bulk_message', 'hr_admin:bulk_message', 'hr', None, False),
+    ):
+        setup, func = _get(url_name, user_key, data, cached)
+        benchmarks.append(Benchmark(name, func, setup, group='views'))
+    return benchmarks
+
+
+def build_context(directory=None):
+    """Users, fixture files and a client factory for default_benchmarks()."""
+    from django.contrib.auth.models import User
+    from django.db.models import Count
+    from django.test import Client
+
+    from accounts.models import ROLE_APPLICANT, ROLE_HR_ADMIN
+
+    hr = User.objects.filter(profile__role=ROLE_HR_ADMIN).order_by('pk').first()
+    applicant = (
+        User.objects.filter(profile__role=ROLE_APPLICANT).annotate(n=Count('applications'))
+        .order_by('-n', 'pk').first()
+    )
+    if hr is None or applicant is None:
+        raise LookupError('The database needs at least one HR administrator and one applicant.')
+    return {
+        'hr': hr,
+        'applicant': applicant,
+        'files': make_fixture_files(directory or tempfile.mkdtemp(prefix='benchmark-')),
+        'client_factory': Client,
+    }
+
+
+def run_all(benchmarks, context, repeat=50, warmup=3, progress=None):
+    """Run benchmarks in order and return the results document."""
+    # OCR fallbacks log a warning per call when Tesseract is missing
+    ocr_logger = logging.getLogger('recruitment.ocr_service')
+    level = ocr_logger.level
+    ocr_logger.setLevel(logging.ERROR)
+    try:
+        results = {}
+        for benchmark in benchmarks:
+            results[benchmark.name] = run_benchmark(benchmark, context, repeat, warmup)
+            if progress:
+                progress(benchmark.name, results[benchmark.name])
+    finally:
+        ocr_logger.setLevel(level)
+    return {'environment': environment(), 'repeat': repeat, 'benchmarks': results}
@@ -0,0 +1,111 @@
+"""
+Bulk Message Fan-out
+Delivers a BulkMessage as a Broadcast (text stored once) with one slim
+receipt per distinct applicant. Runs as a background job: recipients are
+streamed with iterator(), receipts inserted with chunked bulk_create in short
+transactions, and progress is recorded on the BulkMessage row so an
+interrupted job resumes where it stopped.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import events, jobs
+from .models import Application, Broadcast, BulkMessage
+from .notifications import add_broadcast_recipients
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = 500
+
+
+def bulk_message_recipients(vacancy_id=None, recipient_status=''):
+    """Distinct applicant ids matching the message filters, in ascending order."""
+    applications = Application.objects.all()
+    if vacancy_id:
+        applications = applications.filter(vacancy_id=vacancy_id)
+    if recipient_status:
+        applications = applications.filter(status=recipient_status)
+    return applications.order_by('applicant_id').values_list('applicant_id', flat=True).distinct()
+
+
+def queue_bulk_message(*, vacancy, recipient_status, subject, message, sent_by):
+    """Record a BulkMessage and schedule its delivery. Returns the BulkMessage."""
+    recipient_count = bulk_message_recipients(vacancy.pk if vacancy else None, recipient_status).count()
+    bulk = BulkMessage.objects.create(
+        vacancy=vacancy,
+        subject=subject,
+        message=message,
+        recipient_status=recipient_status or '',
+        sent_by=sent_by,
+        recipient_count=recipient_count,
+        status='queued',
+    )
+    jobs.enqueue(deliver_bulk_message, bulk.pk)
+    return bulk
+
+
+def _deliver_chunk(bulk, broadcast, user_ids):
+    with transaction.atomic():
+        add_broadcast_recipients(broadcast, user_ids)
+        BulkMessage.objects.filter(pk=bulk.pk).update(
+            delivered_count=F('delivered_count') + len(user_ids),
+            last_recipient_id=user_ids[-1],
+        )
+
+
+def _publish_result(bulk, status, message):
+    if bulk.sent_by_id:
+        events.publish(events.user_channel(bulk.sent_by_id), 'job', {
+            'kind': 'bulk_message', 'id': bulk.pk, 'status': status, 'message': message,
+        })
+
+
+def deliver_bulk_message(bulk_pk, resume=False):
+    """
+    Deliver a queued BulkMessage. The queued → sending transition is a
+    conditional UPDATE, so two workers can never deliver the same message.
+    With resume=True a message left in 'sending' (e.g. after a crash) is
+    continued from its last recorded recipient.
+    Returns the number of recipients delivered to by this call.
+    """
+    claimable = ['queued', 'sending'] if resume else ['queued']
+    claimed = BulkMessage.objects.filter(pk=bulk_pk, status__in=claimable).update(
+        status='sending', started_at=timezone.now(),
+    )
+    if not claimed:
+        return 0
+
+    bulk = BulkMessage.objects.get(pk=bulk_pk)
+    broadcast, _ = Broadcast.objects.get_or_create(
+        bulk_message=bulk,
+        defaults={'title': bulk.subject, 'message': bulk.message, 'notification_type': 'info'},
+    )
+    recipients = bulk_message_recipients(bulk.vacancy_id, bulk.recipient_status).filter(
+        applicant_id__gt=bulk.last_recipient_id
+    )
+
+    delivered = 0
+    chunk = []
+    try:
+        for user_id in recipients.iterator(chunk_size=BULK_CHUNK_SIZE):
+            chunk.append(user_id)
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                _deliver_chunk(bulk, broadcast, chunk)
+                delivered += len(chunk)
+                chunk = []
+        if chunk:
+            _deliver_chunk(bulk, broadcast, chunk)
+            delivered += len(chunk)
+    except Exception as e:
+        logger.error(f"Bulk message #{bulk_pk} failed after {delivered} recipients: {e}")
+        BulkMessage.objects.filter(pk=bulk_pk).update(status='failed', error=str(e))
+        _publish_result(bulk, 'failed', f'Bulk message "{bulk.subject}" failed after {delivered} recipients.')
+        raise
+
+    BulkMessage.objects.filter(pk=bulk_pk).update(status='sent', completed_at=timezone.now(), error='')
+    logger.info(f"Bulk message #{bulk_pk} delivered to {delivered} applicants")
+    _publish_result(bulk, 'sent', f'Bulk message "{bulk.subject}" delivered to {bulk.delivered_count + delivered} applicants.')
+    return delivered
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+
+def notifications(request):
+    """Expose the cached unread notification count to every template (navbar badge)."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {'unread_notification_count': 0}
+
+    from recruitment.notifications import get_unread_count
+    return {'unread_notification_count': SimpleLazyObject(lambda: get_unread_count(user))}
@@ -0,0 +1,142 @@
+"""
+Document Downloads
+Uploaded documents are served by views.document_download rather than from
+MEDIA_URL, so every request is checked against the Document it asks for.
+
+Responses carry an ETag and Last-Modified, answer If-None-Match /
+If-Modified-Since with 304, and honour single-range Range requests (with
+If-Range) so an interrupted download of a large scan resumes where it stopped.
+
+With RECRUITMENT_SENDFILE set, Django only does the access check and hands
+the transfer to the front-end server:
+    'x-accel-redirect' — nginx; RECRUITMENT_SENDFILE_PREFIX names an
+                         `internal` location aliased to MEDIA_ROOT
+    'x-sendfile'       — Apache mod_xsendfile, lighttpd
+The front-end server then handles ranges and conditional requests itself.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from accounts.models import ROLE_HR_ADMIN
+from .models import Interview
+
+STREAM_CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def can_view_document(user, role, document):
+    """HR and superusers see every document; applicants their own; panel members those of applicants they interview."""
+    if user.is_superuser or role == ROLE_HR_ADMIN:
+        return True
+    if document.application.applicant_id == user.pk:
+        return True
+    return Interview.objects.filter(application_id=document.application_id, panel_members=user).exists()
+
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable byte range, None to send the whole file, or False if unsatisfiable."""
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match:
+        return None  # multiple or malformed ranges: ignore the header
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _stream_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _sendfile_response(path, content_type):
+    backend = getattr(settings, 'RECRUITMENT_SENDFILE', None)
+    if not backend:
+        return None
+    response = HttpResponse(content_type=content_type)
+    if backend == 'x-accel-redirect':
+        relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        prefix = getattr(settings, 'RECRUITMENT_SENDFILE_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = quote(prefix.rstrip('/') + '/' + relative)
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def serve_file(request, path, filename, attachment=False, max_age=0):
+    """
+    Serve a file on disk with validators, Range support and optional sendfile
+    offload. Browsers revalidate on every use unless `max_age` (seconds) says
+    the file may be reused as is.
+    """
+    stat = os.stat(path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = (
+            _sendfile_response(path, content_type)
+            or _file_response(request, path, content_type, stat.st_size, etag, last_modified)
+        )
+    response.headers.setdefault('ETag', etag)
+    response.headers.setdefault('Last-Modified', http_date(last_modified))
+    response['Content-Disposition'] = content_disposition_header(attachment, filename)
+    if max_age:
+        patch_cache_control(response, private=True, max_age=max_age)
+    else:
+        patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+    return response
+
+
+def _file_response(request, path, content_type, size, etag, last_modified):
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and _if_range_matches(request.headers.get('If-Range'), etag, last_modified):
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(_stream_range(path, start, length), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+    else:
+        # FileResponse lets the server use wsgi.file_wrapper / sendfile()
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _if_range_matches(if_range, etag, last_modified):
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
@@ -0,0 +1,231 @@
+"""
+Application Drafts
+Keeps an application form in progress on the server, so a dropped
+connection costs the applicant nothing they have already sent:
+
+- autosave() merges only the fields that changed since the last save into
+  ApplicationDraft.data; the apply page sends them a few seconds after typing
+  stops and fills the form from the draft when it is opened again.
+- Documents are uploaded in chunks (start_upload(), append_chunk()). Each
+  chunk is written at the offset the client gives, which must match what the
+  server already has, so an interrupted upload resumes where it stopped
+  instead of starting over. A finished upload moves into document storage.
+- The final submission carries the draft token. submit() links the draft to
+  the new application in the same transaction, so a retried submission finds
+  that application instead of creating a duplicate, and attach_uploads()
+  turns finished uploads into Documents without sending the files again.
+
+Partial files live under RECRUITMENT_PARTIAL_UPLOAD_DIR; drafts untouched for
+RECRUITMENT_DRAFT_MAX_AGE_DAYS are removed by `manage.py purge_drafts`.
+"""
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .forms import ApplicationForm
+from .models import DOC_TYPES, ApplicationDraft, Document, DraftUpload
+
+AUTOSAVE_FIELDS = frozenset(ApplicationForm.Meta.fields)
+MAX_FIELD_LENGTH = 10000
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # matches the limit shown on the form
+MAX_UPLOADS = 10
+CHUNK_SIZE = 256 * 1024  # what the apply page sends; small enough to retry cheaply on 3G
+MAX_CHUNK_SIZE = 1024 * 1024
+
+DOC_TYPE_VALUES = {value for value, _ in DOC_TYPES}
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+class OffsetMismatch(InvalidUpload):
+    """The chunk does not start where the stored data ends; `received` says where it does."""
+
+    def __init__(self, received):
+        super().__init__(f'Expected a chunk at offset {received}.')
+        self.received = received
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_draft(user, vacancy):
+    draft, _ = ApplicationDraft.objects.get_or_create(applicant=user, vacancy=vacancy)
+    return draft
+
+
+def form_initial(draft):
+    """Draft values converted for the form's initial data; values that no longer parse are skipped."""
+    initial = {}
+    for name, value in draft.data.items():
+        field = ApplicationForm.base_fields.get(name)
+        if field is None or value in ('', None):
+            continue
+        try:
+            initial[name] = field.to_python(value)
+        except ValidationError:
+            continue
+    return initial
+
+
+def autosave(draft, fields):
+    """Merge changed form fields into the draft. Returns the names that changed."""
+    cleaned = {
+        name: ('' if value is None else str(value))[:MAX_FIELD_LENGTH]
+        for name, value in fields.items() if name in AUTOSAVE_FIELDS
+    }
+    with transaction.atomic():
+        # Re-read inside the write transaction so concurrent saves from two tabs both land
+        current = ApplicationDraft.objects.get(pk=draft.pk)
+        changed = [name for name, value in cleaned.items() if current.data.get(name) != value]
+        if changed:
+            current.data.update({name: cleaned[name] for name in changed})
+            current.version += 1
+            current.save(update_fields=['data', 'version', 'updated_at'])
+    draft.data, draft.version, draft.updated_at = current.data, current.version, current.updated_at
+    return changed
+
+
+# ---------- Resumable Uploads ----------
+
+def partial_path(upload):
+    return os.path.join(_setting('RECRUITMENT_PARTIAL_UPLOAD_DIR', os.path.join(settings.MEDIA_ROOT, 'partial-uploads')),
+                        f'{upload.upload_id}.part')
+
+
+def remove_partial(upload):
+    try:
+        os.remove(partial_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def start_upload(draft, filename, size, doc_type):
+    filename = os.path.basename(str(filename or '')).strip()[:255]
+    if not filename:
+        raise InvalidUpload('The file needs a name.')
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise InvalidUpload('The file size is missing.')
+    if size <= 0 or size > MAX_UPLOAD_SIZE:
+        raise InvalidUpload(f'Files must be between 1 byte and {MAX_UPLOAD_SIZE // (1024 * 1024)}MB.')
+    if doc_type not in DOC_TYPE_VALUES:
+        doc_type = 'other'
+    if draft.uploads.count() >= MAX_UPLOADS:
+        raise InvalidUpload(f'A draft can hold at most {MAX_UPLOADS} documents.')
+    upload = DraftUpload.objects.create(draft=draft, filename=filename, size=size, doc_type=doc_type)
+    ApplicationDraft.objects.filter(pk=draft.pk).update(updated_at=timezone.now())
+    return upload
+
+
+def append_chunk(upload, offset, chunk):
+    """
+    Write `chunk` at `offset` and advance `received`. The offset must equal
+    what the server already has (OffsetMismatch otherwise, e.g. after a
+    chunk whose response was lost). Resending the last chunk of a finished
+    upload is accepted and changes nothing.
+    """
+    if upload.complete:
+        if offset + len(chunk) == upload.size:
+            return upload
+        raise OffsetMismatch(upload.received)
+    if offset != upload.received:
+        raise OffsetMismatch(upload.received)
+    if not chunk or len(chunk) > MAX_CHUNK_SIZE:
+        raise InvalidUpload(f'Chunks must be between 1 byte and {MAX_CHUNK_SIZE // 1024}KB.')
+    if offset + len(chunk) > upload.size:
+        raise InvalidUpload('The chunk runs past the end of the file.')
+
+    path = partial_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    existing = os.path.getsize(path) if os.path.exists(path) else 0
+    if existing < offset:
+        # The partial file was lost (purged or another server); start again
+        DraftUpload.objects.filter(pk=upload.pk).update(received=0)
+        upload.received = 0
+        raise OffsetMismatch(0)
+    with open(path, 'r+b' if existing else 'wb') as fh:
+        fh.seek(offset)
+        fh.write(chunk)
+        fh.truncate()
+
+    received = offset + len(chunk)
+    # Only one of two concurrent copies of the same chunk moves the offset on
+    if not DraftUpload.objects.filter(pk=upload.pk, received=offset).update(received=received):
+        upload.refresh_from_db(fields=['received', 'file'])
+        raise OffsetMismatch(upload.received)
+    upload.received = received
+    if received == upload.size:
+        _finish_upload(upload)
+    return upload
+
+
+def _finish_upload(upload):
+    path = partial_path(upload)
+    with open(path, 'rb') as fh:
+        upload.file.save(upload.filename, File(fh), save=False)
+    upload.save(update_fields=['file'])
+    remove_partial(upload)
+
+
+def upload_state(upload):
+    return {
+        'upload_id': upload.upload_id,
+        'filename': upload.filename,
+        'doc_type': upload.doc_type,
+        'size': upload.size,
+        'received': upload.received,
+        'complete': upload.complete,
+    }
+
+
+# ---------- Submission ----------
+
+def submitted_draft(user, token):
+    """The user's draft with this token if a submission already created its application, else None."""
+    if not token:
+        return None
+    return (ApplicationDraft.objects.filter(token=token, applicant=user, application__isnull=False)
+            .select_related('application').first())
+
+
+def submit(draft, application):
+    """Link the draft to its application; call inside the transaction that saves the application."""
+    draft.application = application
+    draft.data = {}
+    draft.save(update_fields=['application', 'data', 'updated_at'])
+
+
+def attach_uploads(draft, application):
+    """
+    Turn the draft's finished uploads into the application's documents,
+    reusing the stored files. Unfinished uploads are dropped. Safe to repeat:
+    each upload is removed in the transaction that creates its document.
+    """
+    for upload in list(draft.uploads.all()):
+        with transaction.atomic():
+            if upload.complete:
+                Document.objects.create(
+                    application=application,
+                    doc_type=upload.doc_type,
+                    file=upload.file.name,
+                    filename=upload.filename,
+                )
+            upload.delete()
+
+
+def purge_drafts(days=None):
+    """Delete drafts (and their uploads) untouched for `days`. Returns how many went."""
+    if days is None:
+        days = _setting('RECRUITMENT_DRAFT_MAX_AGE_DAYS', 30)
+    stale = ApplicationDraft.objects.filter(updated_at__lt=timezone.now() - timedelta(days=days))
+    _, deleted = stale.delete()
+    return deleted.get(ApplicationDraft._meta.label, 0)
@@ -0,0 +1,209 @@
+"""
+Outbound Email Delivery
+Notifications are copied into the OutboundEmail queue when they are created
+(one INSERT, no SMTP in the request); broadcast emails reference the shared
+Broadcast instead of copying its text. A delivery worker then drains the queue
+in batches over a single reused mail connection, paced by a rate limit, with
+exponential backoff for failed attempts and a status kept per notification.
+
+Run the worker with `manage.py send_queued_emails` (once from cron, or with
+--loop as a long-lived process). Point EMAIL_BACKEND/EMAIL_HOST/EMAIL_PORT at
+a local SMTP stand-in to exercise it end to end.
+"""
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+EMAIL_SIGNATURE = (
+    "\n\n--\nPNGCS Recruitment Portal\n"
+    "Papua New Guinea Correctional Service\n"
+    "This is an automated message. Sign in to the portal to view your notifications."
+)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------- Queueing ----------
+
+def email_notifications_enabled():
+    return _setting('RECRUITMENT_EMAIL_NOTIFICATIONS', True)
+
+
+def build_email(notification, to_email):
+    return OutboundEmail(
+        notification=notification,
+        to_email=to_email,
+        subject=notification.title,
+        body=f"{notification.message}{EMAIL_SIGNATURE}",
+    )
+
+
+def queue_notification_email(notification):
+    """Queue an email copy of a single notification, if its user has an address."""
+    if not email_notifications_enabled():
+        return None
+    to_email = notification.user.email
+    if not to_email:
+        return None
+    email = build_email(notification, to_email)
+    email.save()
+    return email
+
+
+def queue_notification_emails(notifications):
+    """Bulk variant for notifications inserted with bulk_create (signals don't fire)."""
+    if not email_notifications_enabled() or not notifications:
+        return 0
+    addresses = dict(
+        User.objects.filter(pk__in={n.user_id for n in notifications}).exclude(email='').values_list('pk', 'email')
+    )
+    emails = [build_email(n, addresses[n.user_id]) for n in notifications if n.user_id in addresses]
+    OutboundEmail.objects.bulk_create(emails, batch_size=500)
+    return len(emails)
+
+
+def queue_broadcast_emails(broadcast, user_ids):
+    """Queue one email per recipient of a broadcast; the text stays on the Broadcast row."""
+    if not email_notifications_enabled() or not user_ids:
+        return 0
+    addresses = User.objects.filter(pk__in=user_ids).exclude(email='').values_list('email', flat=True)
+    emails = [OutboundEmail(broadcast=broadcast, to_email=address) for address in addresses]
+    OutboundEmail.objects.bulk_create(emails, batch_size=500)
+    return len(emails)
+
+
+def render_email(email):
+    """Return (subject, body) for a queued email, expanding broadcast references."""
+    if email.broadcast_id:
+        return email.broadcast.title, f"{email.broadcast.message}{EMAIL_SIGNATURE}"
+    return email.subject, email.body
+
+
+# ---------- Delivery Worker ----------
+
+class RateLimiter:
+    """Paces calls to at most `per_second` per second (0 disables the limit)."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2×base, 4×base … capped at RECRUITMENT_EMAIL_MAX_BACKOFF."""
+    base = _setting('RECRUITMENT_EMAIL_RETRY_BASE', 60)
+    cap = _setting('RECRUITMENT_EMAIL_MAX_BACKOFF', 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(attempts - 1, 0)))
+
+
+def claim_batch(batch_size):
+    """
+    Claim up to batch_size due emails for this worker. The claim is a
+    conditional UPDATE keyed by a fresh token, so concurrent workers never
+    pick up the same row.
+    """
+    now = timezone.now()
+    due_ids = list(
+        OutboundEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'pk').values_list('pk', flat=True)[:batch_size]
+    )
+    if not due_ids:
+        return []
+    token = uuid.uuid4().hex
+    # next_attempt_at doubles as the claim time so stale claims can be released
+    OutboundEmail.objects.filter(pk__in=due_ids, status='pending').update(
+        status='sending', claim_token=token, next_attempt_at=now,
+    )
+    return list(
+        OutboundEmail.objects.filter(claim_token=token, status='sending').select_related('broadcast').order_by('pk')
+    )
+
+
+def _record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    if email.attempts >= _setting('RECRUITMENT_EMAIL_MAX_ATTEMPTS', 5):
+        email.status = 'failed'
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.claim_token = ''
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'claim_token'])
+
+
+def deliver_batch(batch_size=None, rate_limiter=None, connection=None):
+    """
+    Claim and send one batch over a single mail connection.
+    Returns (sent, failed) counts for the batch.
+    """
+    batch_size = batch_size or _setting('RECRUITMENT_EMAIL_BATCH_SIZE', 100)
+    rate_limiter = rate_limiter or RateLimiter(_setting('RECRUITMENT_EMAIL_RATE_LIMIT', 5))
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning(f"Could not open mail connection, deferring {len(batch)} email(s): {e}")
+        for email in batch:
+            _record_failure(email, e)
+        return 0, len(batch)
+
+    try:
+        for email in batch:
+            rate_limiter.wait()
+            subject, body = render_email(email)
+            message = EmailMessage(
+                subject=subject,
+                body=body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email.to_email],
+                connection=connection,
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                logger.warning(f"Email #{email.pk} to {email.to_email} failed (attempt {email.attempts + 1}): {e}")
+                _record_failure(email, e)
+                failed += 1
+                continue
+            OutboundEmail.objects.filter(pk=email.pk).update(
+                status='sent', sent_at=timezone.now(), attempts=email.attempts + 1, claim_token='', last_error='',
+            )
+            sent += 1
+    finally:
+        connection.close()
+
+    logger.info(f"Email batch delivered: {sent} sent, {failed} failed")
+    return sent, failed
+
+
+def release_stale_claims(older_than=timedelta(minutes=15)):
+    """Return emails stuck in 'sending' (worker died mid-batch) to the queue."""
+    return OutboundEmail.objects.filter(
+        status='sending', next_attempt_at__lt=timezone.now() - older_than,
+    ).update(status='pending', claim_token='')
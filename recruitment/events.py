@@ -0,0 +1,172 @@
+"""
+Live Events
+In-process publish/subscribe that pushes new notifications and background job
+results to open browser tabs over server-sent events (views.event_stream), so
+dashboards update without being reloaded.
+
+Publishers call publish() from ordinary synchronous code; the event reaches
+the broker only once the surrounding transaction commits. The broker is chosen
+with RECRUITMENT_EVENT_BROKER. The default LocalBroker fans events out inside
+one process, which covers a single ASGI worker that also runs the background
+jobs. Deployments with several workers, or that need events from management
+commands, plug in a broker backed by a shared service (e.g. Redis pub/sub)
+that implements BaseBroker.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+HR_CHANNEL = 'hr'
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+_event_ids = itertools.count(1)
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+# ---------- Brokers ----------
+
+class Subscription:
+    """
+    A listener's queue of events. Created inside the event loop that reads
+    it; brokers may deliver to it from any thread.
+    """
+
+    def __init__(self, broker, channels, maxsize=SUBSCRIPTION_QUEUE_SIZE):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def put(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # loop already closed; the subscriber is gone
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping {event['type']} event for slow subscriber on {self.channels}")
+
+    async def get(self, timeout):
+        """Wait for the next event; raises asyncio.TimeoutError after `timeout` seconds."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    """Interface for event brokers. publish() is called from synchronous code."""
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def subscribe(self, channels):
+        """Return a Subscription receiving events published to any of `channels`."""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class LocalBroker(BaseBroker):
+    """Single-process broker: events reach subscribers in this process only."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            path = getattr(settings, 'RECRUITMENT_EVENT_BROKER', 'recruitment.events.LocalBroker')
+            _broker = import_string(path)()
+    return _broker
+
+
+# ---------- Publishing ----------
+
+def make_event(event_type, data=None):
+    return {'id': next(_event_ids), 'type': event_type, 'data': data or {}}
+
+
+def _send(channels, event):
+    broker = get_broker()
+    for channel in channels:
+        try:
+            broker.publish(channel, event)
+        except Exception as e:
+            logger.error(f"Publishing {event['type']} event to {channel} failed: {e}")
+
+
+def publish_many(channels, event_type, data=None):
+    """Publish one event to several channels after the current transaction commits."""
+    channels = list(channels)
+    if channels:
+        event = make_event(event_type, data)
+        transaction.on_commit(lambda: _send(channels, event))
+
+
+def publish(channel, event_type, data=None):
+    publish_many([channel], event_type, data)
+
+
+def publish_to_users(user_ids, event_type, data=None):
+    publish_many((user_channel(uid) for uid in user_ids), event_type, data)
+
+
+def notification_data(notification):
+    return {
+        'title': notification.title,
+        'message': notification.message[:200],
+        'notification_type': notification.notification_type,
+    }
+
+
+# ---------- Server-Sent Events ----------
+
+def format_sse(event):
+    """Encode an event in text/event-stream framing."""
+    payload = json.dumps(event['data'], cls=DjangoJSONEncoder)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
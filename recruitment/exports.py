@@ -0,0 +1,296 @@
+"""
+Streaming Exports
+Tabular CSV, XLSX and Parquet exports fed by a chunked values_list()
+iterator, so rows are read from the database a chunk at a time and no model
+instances are built. Choice fields are mapped to their labels with plain dict
+lookups.
+
+CSV is streamed to the client as rows are produced. XLSX uses openpyxl's
+write-only mode, which spools rows to a temporary file instead of keeping the
+sheet in memory; the finished workbook is then streamed from that file.
+Parquet (zstd-compressed, columnar) is written one row group per chunk and
+needs the optional pyarrow package.
+
+The full application data export (every application with scores, documents
+and interview results) is described by APPLICATION_EXPORT_COLUMNS and
+application_export_queryset(); it backs `manage.py export_applications` and
+the HR reports download.
+"""
+import csv
+import datetime
+import tempfile
+from itertools import islice
+
+from django.db.models import Avg, Count, Exists, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .models import (
+    APPLICATION_STATUS, GENDER_CHOICES, QUALIFICATION_LEVELS, Application, Document, Interview, InterviewScore,
+)
+
+ITERATOR_CHUNK_SIZE = 2000
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PARQUET_CONTENT_TYPE = 'application/vnd.apache.parquet'
+HEADER_FILL = '003087'
+
+EXPORT_FORMATS = ['csv', 'xlsx', 'parquet']
+
+
+class Column:
+    """
+    One export column: its header, the values_list() field it reads, and an
+    optional `display` mapping (e.g. dict(CHOICES)) or callable applied to
+    the raw value. `width` sets the XLSX column width and `kind` the Parquet
+    type: 'string', 'int', 'float', 'bool', 'date' or 'timestamp'.
+    """
+
+    def __init__(self, header, field, display=None, width=None, kind='string'):
+        self.header = header
+        self.field = field
+        self.display = display
+        self.width = width
+        self.kind = kind
+
+    def convert(self, value):
+        if self.display is None:
+            return value
+        if callable(self.display):
+            return self.display(value)
+        return self.display.get(value, value)
+
+
+def iter_rows(queryset, columns, chunk_size=ITERATOR_CHUNK_SIZE):
+    """Yield one converted tuple per row of `queryset`, reading it in chunks."""
+    fields = [column.field for column in columns]
+    for values in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        yield tuple(column.convert(value) for column, value in zip(columns, values))
+
+
+def numbered(rows, start=1):
+    """Prefix each row with its position, for exports with a '#' column."""
+    for i, row in enumerate(rows, start):
+        yield (i, *row)
+
+
+# ---------- CSV ----------
+
+class _Echo:
+    """File-like object whose write() hands the CSV line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(headers, rows):
+    # The byte order mark makes Excel open the file as UTF-8
+    yield '\ufeff'
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def csv_response(headers, rows, filename):
+    response = StreamingHttpResponse(iter_csv(headers, rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ---------- XLSX ----------
+
+def write_xlsx(headers, rows, fileobj, title='Sheet1', widths=None):
+    """Write a single-sheet workbook in write-only mode to `fileobj`."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    for index, width in enumerate(widths or (), 1):
+        if width:
+            sheet.column_dimensions[get_column_letter(index)].width = width
+
+    fill = PatternFill(start_color=HEADER_FILL, end_color=HEADER_FILL, fill_type='solid')
+    font = Font(color='FFFFFF', bold=True)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(sheet, value=header)
+        cell.fill, cell.font, cell.alignment = fill, font, Alignment(horizontal='center')
+        header_cells.append(cell)
+    sheet.append(header_cells)
+    for row in rows:
+        sheet.append([_excel_value(value) for value in row])
+    workbook.save(fileobj)
+
+
+def _excel_value(value):
+    # Excel has no time zones; show aware datetimes in local time
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+def xlsx_response(headers, rows, filename, title='Sheet1', widths=None):
+    spool = tempfile.TemporaryFile()
+    write_xlsx(headers, rows, spool, title, widths)
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+# ---------- Parquet ----------
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _arrow_type(kind):
+    import pyarrow as pa
+    return {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }.get(kind, pa.string())
+
+
+def write_parquet(columns, rows, fileobj, chunk_size=ITERATOR_CHUNK_SIZE * 10):
+    """Write rows as a zstd-compressed Parquet file, one row group per `chunk_size` rows."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column.header, _arrow_type(column.kind)) for column in columns])
+    rows = iter(rows)
+    with pq.ParquetWriter(fileobj, schema, compression='zstd') as writer:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            arrays = [
+                pa.array([row[i] for row in chunk], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+
+
+def parquet_response(columns, rows, filename):
+    spool = tempfile.TemporaryFile()
+    write_parquet(columns, rows, spool)
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=filename, content_type=PARQUET_CONTENT_TYPE)
+
+
+def export_response(export_format, columns, rows, basename, title='Sheet1', number_rows=False):
+    """Stream `rows` (from iter_rows) as 'csv', 'xlsx' or 'parquet'."""
+    if export_format == 'parquet':
+        return parquet_response(columns, rows, f'{basename}.parquet')
+    headers = [column.header for column in columns]
+    widths = [column.width for column in columns]
+    if number_rows:
+        headers, widths, rows = ['#', *headers], [None, *widths], numbered(rows)
+    if export_format == 'csv':
+        return csv_response(headers, rows, f'{basename}.csv')
+    return xlsx_response(headers, rows, f'{basename}.xlsx', title, widths)
+
+
+def write_export(export_format, columns, rows, fileobj, title='Sheet1'):
+    """Write rows to an open file: text for 'csv', binary for 'xlsx' and 'parquet'."""
+    if export_format == 'parquet':
+        write_parquet(columns, rows, fileobj)
+    elif export_format == 'xlsx':
+        write_xlsx([c.header for c in columns], rows, fileobj, title, [c.width for c in columns])
+    else:
+        for line in iter_csv([c.header for c in columns], rows):
+            fileobj.write(line)
+
+
+# ---------- Application Data ----------
+
+INTERVIEW_STATUS = dict(Interview._meta.get_field('status').choices)
+
+APPLICATION_EXPORT_COLUMNS = [
+    Column('Application ID', 'pk', kind='int'),
+    Column('Vacancy Reference', 'vacancy__reference_number', width=16),
+    Column('Vacancy', 'vacancy__title', width=30),
+    Column('Department', 'vacancy__department', width=20),
+    Column('Applicant ID', 'applicant_id', kind='int'),
+    Column('Full Name', 'export_full_name', width=25),
+    Column('Email', 'email', width=25),
+    Column('Phone', 'phone'),
+    Column('Gender', 'gender', display=dict(GENDER_CHOICES)),
+    Column('Date of Birth', 'date_of_birth', kind='date'),
+    Column('Province', 'province', width=20),
+    Column('Qualification', 'highest_qualification', display=dict(QUALIFICATION_LEVELS), width=18),
+    Column('Institution', 'institution', width=20),
+    Column('Year Completed', 'year_completed', kind='int'),
+    Column('Grade', 'grade_result'),
+    Column('Experience (yrs)', 'years_experience', kind='int'),
+    Column('Status', 'status', display=dict(APPLICATION_STATUS), width=18),
+    Column('Status Changed', 'status_changed_at', kind='timestamp', width=18),
+    Column('Screening Score', 'total_score', kind='float'),
+    Column('Submitted', 'submitted_at', kind='timestamp', width=18),
+    Column('Last Updated', 'updated_at', kind='timestamp', width=18),
+    Column('Documents', 'export_document_count', kind='int'),
+    Column('Verified Documents', 'export_verified_count', kind='int'),
+    Column('Interviews', 'export_interview_count', kind='int'),
+    Column('Last Interview', 'export_last_interview_at', kind='timestamp', width=18),
+    Column('Last Interview Status', 'export_last_interview_status', display=INTERVIEW_STATUS),
+    Column('Panel Scores', 'export_panel_score_count', kind='int'),
+    Column('Average Panel Score', 'export_panel_score_avg', kind='float'),
+]
+
+
+def _per_application(queryset, aggregate, lookup='application'):
+    """A correlated subquery computing `aggregate` over queryset rows belonging to the outer application."""
+    return Subquery(
+        queryset.filter(**{lookup: OuterRef('pk')}).order_by().values(lookup)
+        .annotate(value=aggregate).values('value')[:1]
+    )
+
+
+def application_export_queryset(vacancy=None, date_from=None, date_to=None, since=None):
+    """
+    Applications with everything the data export needs, in primary key order.
+    date_from/date_to filter on the submission date; `since` keeps only
+    applications changed at or after that moment (the application itself,
+    its status, a new document or a new panel score), for incremental exports.
+    """
+    applications = Application.objects.all()
+    if vacancy:
+        applications = applications.filter(vacancy=vacancy)
+    if date_from:
+        applications = applications.filter(submitted_at__date__gte=date_from)
+    if date_to:
+        applications = applications.filter(submitted_at__date__lte=date_to)
+    if since:
+        applications = applications.filter(
+            Q(updated_at__gte=since) | Q(status_changed_at__gte=since)
+            | Exists(Document.objects.filter(application=OuterRef('pk'), uploaded_at__gte=since))
+            | Exists(InterviewScore.objects.filter(interview__application=OuterRef('pk'), submitted_at__gte=since))
+        )
+
+    scores = InterviewScore.objects.all()
+    return applications.annotate(
+        export_full_name=Concat('first_name', Value(' '), 'last_name'),
+        export_document_count=Coalesce(_per_application(Document.objects.all(), Count('pk')), 0,
+                                       output_field=IntegerField()),
+        export_verified_count=Coalesce(_per_application(Document.objects.filter(verified=True), Count('pk')), 0,
+                                       output_field=IntegerField()),
+        export_interview_count=Coalesce(_per_application(Interview.objects.all(), Count('pk')), 0,
+                                        output_field=IntegerField()),
+        export_last_interview_at=_per_application(Interview.objects.all(), Max('scheduled_date')),
+        export_last_interview_status=Subquery(
+            Interview.objects.filter(application=OuterRef('pk')).order_by('-scheduled_date').values('status')[:1]
+        ),
+        export_panel_score_count=Coalesce(_per_application(scores, Count('pk'), 'interview__application'), 0,
+                                          output_field=IntegerField()),
+        export_panel_score_avg=_per_application(scores, Avg('score'), 'interview__application'),
+    ).order_by('pk')
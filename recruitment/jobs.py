@@ -0,0 +1,48 @@
+"""
+Background Jobs
+Small in-process runner for work that must not hold up a request, such as
+bulk message fan-out and document OCR. Jobs are handed to a thread pool once the surrounding
+transaction commits. Durable progress lives on the job's own model row, so
+anything interrupted by a restart is picked up by the matching management
+command (e.g. `manage.py process_bulk_messages`).
+
+Set RECRUITMENT_JOBS_EAGER = True to run jobs inline instead (tests, scripts).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, 'RECRUITMENT_JOB_WORKERS', 2)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pngcs-job')
+    return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Background job {func.__name__} failed")
+    finally:
+        close_old_connections()
+
+
+def enqueue(func, *args, **kwargs):
+    """Run func(*args, **kwargs) in the background after the current transaction commits."""
+    if getattr(settings, 'RECRUITMENT_JOBS_EAGER', False):
+        transaction.on_commit(lambda: func(*args, **kwargs))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run, func, args, kwargs))
@@ -0,0 +1,398 @@
+"""
+Load Testing
+Drives a running portal over HTTP the way an intake day does: visitors
+browsing vacancies, applicants registering and applying with document
+uploads, and HR staff screening, shortlisting and messaging.
+
+Each virtual user has its own cookie jar and walks one flow at a time,
+pausing between pages for an exponentially distributed think time. Flows
+start either at a fixed arrival rate (open model: new visitors keep coming
+whether or not the server keeps up) or back to back on every worker (closed
+model). Redirects are not followed, so every request is measured under its
+own endpoint. Run it with `manage.py load_test`.
+
+In the open model an arrival that finds every worker busy waits in a queue.
+That wait is added to the latency of the flow's first request, so an
+overloaded server shows up as slow instead of being hidden by the load
+generator (coordinated omission). Arrivals still queued when the run ends, or
+queued for longer than the request timeout, are recorded as failures under
+NOT_STARTED.
+"""
+import http.cookiejar
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.urls import reverse
+
+from recruitment.benchmarks import percentile
+
+JOB_LINK_RE = re.compile(r'/jobs/(\d+)/')
+APPLICATION_ID_RE = re.compile(r'name="selected_ids" value="(\d+)"')
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+FLOWS = ('browse', 'apply', 'hr')
+DEFAULT_MIX = {'browse': 70, 'apply': 25, 'hr': 5}
+NOT_STARTED = 'arrival not started'
+
+
+class FlowError(Exception):
+    """A flow cannot continue, e.g. a page it needs failed or had nothing to follow."""
+
+
+# ---------- Measurements ----------
+
+class Stats:
+    """Latency samples and outcomes per endpoint, shared by all virtual users."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.flows = {}
+        self.started = time.monotonic()
+        self.finished = None
+
+    def record(self, endpoint, elapsed, status, ok, sent=0, received=0):
+        with self.lock:
+            entry = self.endpoints.setdefault(endpoint, {
+                'samples': [], 'errors': 0, 'statuses': {}, 'bytes_sent': 0, 'bytes_received': 0,
+            })
+            entry['samples'].append(elapsed * 1000)
+            entry['statuses'][str(status)] = entry['statuses'].get(str(status), 0) + 1
+            entry['bytes_sent'] += sent
+            entry['bytes_received'] += received
+            if not ok:
+                entry['errors'] += 1
+
+    def flow_finished(self, name, ok):
+        with self.lock:
+            entry = self.flows.setdefault(name, {'completed': 0, 'failed': 0})
+            entry['completed' if ok else 'failed'] += 1
+
+    def report(self):
+        """A JSON-serialisable summary: per endpoint count, error rate, throughput and percentiles."""
+        duration = (self.finished or time.monotonic()) - self.started
+        endpoints = {}
+        with self.lock:
+            for name, entry in sorted(self.endpoints.items()):
+                samples = sorted(entry['samples'])
+                count = len(samples)
+                endpoints[name] = {
+                    'requests': count,
+                    'errors': entry['errors'],
+                    'error_rate': round(entry['errors'] / count, 4) if count else 0.0,
+                    'throughput': round(count / duration, 2) if duration else 0.0,
+                    'mean_ms': round(sum(samples) / count, 2) if count else 0.0,
+                    'p50_ms': round(percentile(samples, 50), 2),
+                    'p95_ms': round(percentile(samples, 95), 2),
+                    'p99_ms': round(percentile(samples, 99), 2),
+                    'max_ms': round(samples[-1], 2) if samples else 0.0,
+                    'statuses': entry['statuses'],
+                    'kb_received': round(entry['bytes_received'] / 1024, 1),
+                }
+            flows = {name: dict(entry) for name, entry in self.flows.items()}
+        total = sum(e['requests'] for e in endpoints.values())
+        errors = sum(e['errors'] for e in endpoints.values())
+        return {
+            'duration_s': round(duration, 1),
+            'requests': total,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0.0,
+            'throughput': round(total / duration, 2) if duration else 0.0,
+            'flows': flows,
+            'endpoints': endpoints,
+        }
+
+
+# ---------- HTTP ----------
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def multipart(fields, files):
+    """Encode form fields ([(name, value)]) and files ([(name, filename, bytes)]) as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, filename, content in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class VirtualUser:
+    """One browser: a cookie jar, the last CSRF token seen, and a think time between pages."""
+
+    def __init__(self, base_url, stats, rng, think_time=1.0, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think_time
+        self.timeout = timeout
+        self.csrf_token = ''
+        self.waited = 0.0  # queueing delay before the flow started, charged to its first request
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect,
+        )
+
+    def think(self):
+        if self.think_time:
+            time.sleep(self.rng.expovariate(1 / self.think_time))
+
+    def request(self, endpoint, path, data=None, files=None, expect=(200,)):
+        """
+        Send one request and record it under `endpoint`. `data` (a dict or
+        list of pairs) makes it a POST with the current CSRF token. Returns
+        the body text; raises FlowError if the status is not in `expect`.
+        """
+        headers = {'User-Agent': 'pngcs-load-test'}
+        body = None
+        if data is not None:
+            fields = list(data.items()) if isinstance(data, dict) else list(data)
+            fields.append(('csrfmiddlewaretoken', self.csrf_token))
+            if files:
+                body, headers['Content-Type'] = multipart(fields, files)
+            else:
+                body = urllib.parse.urlencode(fields).encode()
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['Referer'] = self.base_url + path
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers)
+
+        started = time.perf_counter() - self.waited
+        self.waited = 0.0
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, content = e.code, e.read()
+        except OSError as e:
+            self.stats.record(endpoint, time.perf_counter() - started, 'error', False, len(body or b''))
+            raise FlowError(f'{endpoint}: {e}')
+        elapsed = time.perf_counter() - started
+
+        ok = status in expect
+        self.stats.record(endpoint, elapsed, status, ok, len(body or b''), len(content))
+        text = content.decode('utf-8', 'replace')
+        token = CSRF_RE.search(text)
+        if token:
+            self.csrf_token = token.group(1)
+        if not ok:
+            raise FlowError(f'{endpoint} returned {status}')
+        return text
+
+
+# ---------- Flows ----------
+
+def browse(user, context):
+    """A visitor reads the job list and a few vacancies."""
+    page = user.request('GET job_list', reverse('recruitment:job_list'))
+    vacancy_ids = JOB_LINK_RE.findall(page)
+    for _ in range(user.rng.randint(1, 3)):
+        if not vacancy_ids:
+            break
+        user.think()
+        user.request('GET job_detail', reverse('recruitment:job_detail', args=[user.rng.choice(vacancy_ids)]))
+
+
+def apply(user, context):
+    """A new applicant registers, applies for a vacancy with documents and checks the dashboard."""
+    page = user.request('GET job_list', reverse('recruitment:job_list'))
+    vacancy_ids = JOB_LINK_RE.findall(page)
+    if not vacancy_ids:
+        raise FlowError('No open vacancies to apply for.')
+    vacancy_id = user.rng.choice(vacancy_ids)
+    user.think()
+    user.request('GET job_detail', reverse('recruitment:job_detail', args=[vacancy_id]))
+
+    user.think()
+    register_url = reverse('accounts:register')
+    user.request('GET register', register_url)
+    name = f'lt-{context["run_id"]}-{uuid.uuid4().hex[:10]}'
+    user.think()
+    user.request('POST register', register_url, {
+        'username': name, 'first_name': 'Load', 'last_name': 'Tester', 'email': f'{name}@load.example',
+        'password': 'LoadTest!2468', 'confirm_password': 'LoadTest!2468',
+        'phone': '+675 7000 0000', 'province': 'Morobe', 'gender': 'Female',
+    }, expect=(302,))
+
+    apply_url = reverse('recruitment:apply', args=[vacancy_id])
+    user.request('GET apply', apply_url)
+    user.think()
+    uploads = [
+        ('documents', f'document{i}.pdf', context['upload']) for i in range(context['uploads_per_application'])
+    ]
+    fields = [
+        ('first_name', 'Load'), ('last_name', 'Tester'), ('date_of_birth', '1998-04-12'), ('gender', 'Female'),
+        ('province', 'Morobe'), ('address', 'Section 12, Lot 4, Lae'), ('phone', '+675 7000 0000'),
+        ('email', f'{name}@load.example'), ('nationality', 'Papua New Guinean'),
+        ('highest_qualification', 'grade_12'), ('institution', 'Lae Secondary School'),
+        ('year_completed', '2016'), ('grade_result', 'Credit'), ('years_experience', '3'),
+        ('work_history', 'Security officer, community volunteer.'),
+        ('reference1_name', 'Rev. Thomas Maino'), ('reference1_position', 'Community Leader'),
+        ('reference1_phone', '+675 325 1234'), ('cover_letter', 'I wish to serve with PNGCS. ' * 10),
+    ] + [('doc_types', 'cv') for _ in uploads]
+    user.request('POST apply', apply_url, fields, files=uploads, expect=(302,))
+    user.request('GET dashboard', reverse('recruitment:dashboard'))
+
+
+def hr(user, context):
+    """An HR officer screens new applications, shortlists a few and occasionally messages applicants."""
+    if not user.csrf_token:
+        login_url = reverse('accounts:login')
+        user.request('GET login', login_url)
+        user.request('POST login', login_url, {
+            'username': context['hr_username'], 'password': context['hr_password'],
+        }, expect=(302,))
+    user.request('GET hr dashboard', reverse('hr_admin:dashboard'))
+    user.think()
+    list_url = reverse('hr_admin:application_list')
+    page = user.request('GET application_list', f'{list_url}?status=submitted')
+    ids = APPLICATION_ID_RE.findall(page)
+    if not ids:
+        return
+    user.think()
+    user.request('GET application_detail', reverse('hr_admin:application_detail', args=[user.rng.choice(ids)]))
+    user.think()
+    user.request('POST application_bulk_status', reverse('hr_admin:application_bulk_status'), [
+        ('status', 'under_review'), *[('selected_ids', pk) for pk in user.rng.sample(ids, min(5, len(ids)))],
+    ], expect=(302,))
+    if user.rng.random() < context['bulk_message_ratio']:
+        user.think()
+        message_url = reverse('hr_admin:bulk_message')
+        user.request('GET bulk_message', message_url)
+        user.request('POST bulk_message', message_url, {
+            'recipient_status': 'shortlisted', 'subject': 'Interview preparation',
+            'message': 'Please bring your original certificates to the interview.',
+        }, expect=(302,))
+
+
+FLOW_FUNCTIONS = {'browse': browse, 'apply': apply, 'hr': hr}
+
+
+# ---------- Runner ----------
+
+def parse_mix(text):
+    """'browse=70,apply=25,hr=5' -> {'browse': 70, 'apply': 25, 'hr': 5}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in FLOWS:
+            raise ValueError(f"Unknown flow '{name}' (choose from {', '.join(FLOWS)}).")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError('The flow mix needs at least one positive weight.')
+    return mix
+
+
+class LoadTest:
+    """
+    Runs flows against `base_url` for `duration` seconds on up to
+    `concurrency` virtual users. With `rate` > 0, flows arrive as a Poisson
+    process at that many per second and queue for a free user, with the
+    queueing counted (see the module docstring); otherwise each worker starts
+    a new flow as soon as its last one finishes. `ramp_up` spreads worker
+    start times.
+    """
+
+    def __init__(self, base_url, context, mix=None, concurrency=20, rate=0.0, duration=60, ramp_up=0,
+                 think_time=1.0, timeout=30, seed=None, progress=None):
+        self.base_url = base_url
+        self.context = context
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.progress = progress
+        self.stats = Stats()
+        self.stop_at = None
+        self.local = threading.local()
+
+    def next_flow(self):
+        with self.rng_lock:
+            return self.rng.choices(list(self.mix), list(self.mix.values()))[0]
+
+    def user(self, flow):
+        """Applicants are new visitors every time; HR staff stay logged in on their worker."""
+        with self.rng_lock:
+            rng = random.Random(self.rng.random())
+        if flow != 'hr':
+            return VirtualUser(self.base_url, self.stats, rng, self.think_time, self.timeout)
+        if getattr(self.local, 'hr_user', None) is None:
+            self.local.hr_user = VirtualUser(self.base_url, self.stats, rng, self.think_time, self.timeout)
+        return self.local.hr_user
+
+    def run_flow(self, flow, arrived=None):
+        """Run one flow; `arrived` is the open model's arrival time, which the flow is timed from."""
+        now = time.monotonic()
+        waited = now - arrived if arrived is not None else 0.0
+        if now >= self.stop_at or waited > self.timeout:
+            if arrived is not None:
+                # The server never got to this visitor: a failure, not a gap in the numbers
+                self.stats.record(NOT_STARTED, waited, 'dropped' if now >= self.stop_at else 'late', False)
+                self.stats.flow_finished(flow, False)
+            return
+        user = self.user(flow)
+        user.waited = waited
+        try:
+            FLOW_FUNCTIONS[flow](user, self.context)
+        except FlowError:
+            self.stats.flow_finished(flow, False)
+            if flow == 'hr':
+                self.local.hr_user = None
+        else:
+            self.stats.flow_finished(flow, True)
+
+    def closed_worker(self, index):
+        if self.ramp_up:
+            time.sleep(self.ramp_up * index / self.concurrency)
+        while time.monotonic() < self.stop_at:
+            self.run_flow(self.next_flow())
+
+    def run(self):
+        self.stats = Stats()
+        self.stop_at = time.monotonic() + self.duration
+        reporter = threading.Thread(target=self._report_progress, daemon=True)
+        reporter.start()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='load-user') as pool:
+            if self.rate > 0:
+                # Open model: arrivals do not wait for earlier flows to finish.
+                # Arrival times follow the schedule even when submitting lags.
+                arrival = time.monotonic()
+                while True:
+                    with self.rng_lock:
+                        arrival += self.rng.expovariate(self.rate)
+                    if arrival >= self.stop_at:
+                        break
+                    time.sleep(max(0.0, arrival - time.monotonic()))
+                    pool.submit(self.run_flow, self.next_flow(), arrival)
+            else:
+                for index in range(self.concurrency):
+                    pool.submit(self.closed_worker, index)
+        self.stats.finished = time.monotonic()
+        return self.stats.report()
+
+    def _report_progress(self):
+        while self.progress and time.monotonic() < self.stop_at:
+            time.sleep(min(10, self.duration))
+            report = self.stats.report()
+            self.progress(report)
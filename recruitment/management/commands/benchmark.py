@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from recruitment.benchmarks import build_context, compare, default_benchmarks, run_all
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = ('Time score calculation, summaries, OCR routing and the busiest pages against a seeded '
+            'dataset; save the results as JSON and compare them with a stored baseline.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=2000,
+                            help='Size of the seeded dataset (see generate_load_data).')
+        parser.add_argument('--current-db', action='store_true',
+                            help='Benchmark the configured database as it is instead of a seeded test '
+                                 'database. compute_score rewrites scores of the application it times.')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed calls per benchmark.')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed calls before timing.')
+        parser.add_argument('--only', action='append', default=[],
+                            help='Run benchmarks whose name contains this text (repeatable).')
+        parser.add_argument('--output', '-o', help='Write the results as JSON to this file.')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                            help=f'Baseline results to compare with (default {DEFAULT_BASELINE}).')
+        parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed slowdown of the median before a benchmark counts as regressed.')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit non-zero on any regression.')
+
+    def handle(self, *args, **options):
+        benchmarks = [
+            b for b in default_benchmarks()
+            if not options['only'] or any(text in b.name for text in options['only'])
+        ]
+        if not benchmarks:
+            raise CommandError('No benchmark matches --only.')
+
+        fixtures = tempfile.mkdtemp(prefix='benchmark-')
+        old_config = None
+        try:
+            if not options['current_db']:
+                setup_test_environment()
+                old_config = setup_databases(verbosity=0, interactive=False)
+                self.stderr.write(f"Seeding {options['applicants']} applicants...")
+                call_command('generate_load_data', applicants=options['applicants'],
+                             vacancies=max(options['applicants'] // 100, 5), files=0, stdout=open(os.devnull, 'w'))
+            # Background jobs run inline so their cost lands in the request that caused it
+            with override_settings(RECRUITMENT_JOBS_EAGER=True):
+                context = build_context(fixtures)
+                results = run_all(benchmarks, context, options['repeat'], options['warmup'], self.progress)
+        except LookupError as e:
+            raise CommandError(e)
+        finally:
+            shutil.rmtree(fixtures, ignore_errors=True)
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        results['dataset'] = 'current database' if options['current_db'] else f"{options['applicants']} applicants"
+        if options['output']:
+            self.write_json(options['output'], results)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        regressions = self.report_comparison(results, options['baseline'], options['tolerance'])
+        if options['save_baseline']:
+            self.write_json(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{regressions} benchmark(s) regressed against {options['baseline']}.")
+
+    def progress(self, name, result):
+        self.stdout.write(
+            f"{name:34} {result['ops_per_sec']:>10.1f}/s  p50 {result['p50_ms']:>9.2f}ms  "
+            f"p95 {result['p95_ms']:>9.2f}ms  p99 {result['p99_ms']:>9.2f}ms  {result['queries']:>6g} queries"
+        )
+
+    def write_json(self, path, results):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    def report_comparison(self, results, path, tolerance):
+        if not os.path.exists(path):
+            self.stdout.write(f'No baseline at {path}; run with --save-baseline to store one.')
+            return 0
+        with open(path) as f:
+            baseline = json.load(f)
+        if baseline.get('dataset') != results['dataset']:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was measured on {baseline.get('dataset')}, this run on {results['dataset']}."
+            ))
+
+        self.stdout.write(f'\nCompared with {path} (measured {baseline["environment"]["measured_at"]}):')
+        regressions = 0
+        for name, current, previous, change, regressed in compare(results, baseline, tolerance):
+            if previous is None:
+                self.stdout.write(f'{name:34} new')
+                continue
+            line = (f"{name:34} p50 {previous['p50_ms']:>9.2f} -> {current['p50_ms']:>9.2f}ms ({change:+.0%})  "
+                    f"queries {previous['queries']:g} -> {current['queries']:g}")
+            if regressed:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f'{line}  REGRESSED'))
+            elif change < -tolerance:
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                self.stdout.write(line)
+        return regressions
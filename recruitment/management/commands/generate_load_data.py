@@ -0,0 +1,404 @@
+import io
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import PROVINCES, ROLE_APPLICANT, ROLE_HR_ADMIN, ROLE_PANEL, UserProfile
+from recruitment.models import (
+    CATEGORIES, DOC_TYPES, NOTIFICATION_TYPES, Application, ApplicationStatusChange,
+    Document, Interview, InterviewScore, Notification, Vacancy,
+)
+from recruitment.storage import document_storage
+from recruitment.transitions import FUNNEL_STAGES
+from recruitment.vacancy_cache import bump_vacancy_version
+
+USERNAME_PREFIX = 'load-'
+REFERENCE_PREFIX = 'LOAD-'
+PASSWORD = 'load1234'
+
+# Rough shares of the applicant pool, so province reports look lopsided the way real ones do
+PROVINCE_WEIGHTS = {
+    'NCD (Port Moresby)': 14, 'Morobe': 12, 'Eastern Highlands': 8, 'Western Highlands': 7, 'Madang': 6,
+    'East Sepik': 6, 'Southern Highlands': 5, 'Enga': 5, 'Chimbu': 4, 'Central': 4, 'East New Britain': 4,
+}
+QUALIFICATION_WEIGHTS = {
+    'grade_10': 10, 'grade_12': 45, 'certificate': 20, 'diploma': 15, 'degree': 9, 'postgraduate': 1,
+}
+GRADES = ['Distinction', 'Credit', 'Merit - B average', 'Pass', 'GPA 3.5/4.0', 'GPA 2.5/4.0', 'C average']
+# Where applications end up; the history walks the funnel up to this point
+FINAL_STATUS_WEIGHTS = {
+    'submitted': 35, 'under_review': 25, 'shortlisted': 12, 'interview_scheduled': 6,
+    'interviewed': 5, 'selected': 2, 'rejected': 13, 'withdrawn': 2,
+}
+# Applications per applicant: most apply once, a few apply everywhere
+APPLICATIONS_PER_APPLICANT_WEIGHTS = {1: 50, 2: 25, 3: 13, 4: 8, 5: 4}
+FIRST_NAMES = ['John', 'Mary', 'Peter', 'Grace', 'Paul', 'Ruth', 'David', 'Anna', 'James', 'Esther',
+               'Michael', 'Sarah', 'Joseph', 'Martha', 'Samuel', 'Lucy', 'Thomas', 'Rose', 'Daniel', 'Joyce']
+LAST_NAMES = ['Kila', 'Toua', 'Eto', 'Buri', 'Ume', 'Kapi', 'Opa', 'Tura', 'Kone', 'Maino',
+              'Konga', 'Wari', 'Pato', 'Namah', 'Somare', 'Kaupa', 'Yanda', 'Aisi', 'Moses', 'Gumo']
+
+
+def weighted(rng, weights, k=None):
+    population, counts = list(weights), list(weights.values())
+    if k is None:
+        return rng.choices(population, counts)[0]
+    return rng.choices(population, counts, k=k)
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep the timestamps we set instead of auto_now/auto_now_add overwriting them."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def synthetic_pdf(label, size):
+    """A valid one-page PDF showing `label`, padded with a comment block to roughly `size` bytes."""
+    text = f'BT /F1 18 Tf 72 720 Td ({label}) Tj ET'.encode()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(text), text),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    padding = max(size - out.tell() - 200, 0)
+    for _ in range(padding // 64):
+        out.write(b'%' + b'x' * 62 + b'\n')
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def synthetic_image(rng, label, size):
+    """A noisy JPEG scan of roughly `size` bytes."""
+    from PIL import Image, ImageDraw
+    side = max(int((size / 0.6) ** 0.5), 64)
+    image = Image.effect_noise((side, int(side * 1.3)), rng.randint(20, 80)).convert('RGB')
+    ImageDraw.Draw(image).text((10, 10), label, fill='black')
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=60)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = ('Bulk-create synthetic users, vacancies, applications, documents, interviews, scores and '
+            'notifications for load and scale testing. Generated rows are prefixed so --clear can remove them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=10000)
+        parser.add_argument('--vacancies', type=int, default=50)
+        parser.add_argument('--panel-members', type=int, default=20)
+        parser.add_argument('--documents', type=float, default=3,
+                            help='Average documents per application.')
+        parser.add_argument('--notifications', type=float, default=4,
+                            help='Average notifications per applicant.')
+        parser.add_argument('--files', type=int, default=200,
+                            help='Distinct synthetic PDF/JPEG files to write; documents share them (0 = no files).')
+        parser.add_argument('--file-size-kb', type=int, default=200, help='Average synthetic file size.')
+        parser.add_argument('--days', type=int, default=365, help='Spread submissions over this many past days.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data first.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.days = options['days']
+
+        if options['clear']:
+            self.clear()
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError('Generated data already exists; run with --clear to replace it.')
+
+        started = time.monotonic()
+        with manual_timestamps(Application, Document, Notification, Interview, InterviewScore, Vacancy):
+            panel = self.step('panel members', self.create_users, options['panel_members'], ROLE_PANEL, 'panel')
+            self.step('HR admin', self.create_users, 1, ROLE_HR_ADMIN, 'hr')
+            applicants = self.step('applicants', self.create_users, options['applicants'], ROLE_APPLICANT, 'applicant')
+            vacancies = self.step('vacancies', self.create_vacancies, options['vacancies'])
+            applications = self.step('applications', self.create_applications, applicants, vacancies)
+            self.step('status history', self.create_history, applications)
+            self.step('interviews and scores', self.create_interviews, applications, panel)
+            files = self.step('synthetic files', self.create_files, options['files'], options['file_size_kb'])
+            self.step('documents', self.create_documents, applications, files, options['documents'])
+            self.step('notifications', self.create_notifications, applicants, options['notifications'])
+        bump_vacancy_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Load data generated in {time.monotonic() - started:.1f}s. '
+            f'Users are {USERNAME_PREFIX}applicant-<n>, {USERNAME_PREFIX}panel-<n>, {USERNAME_PREFIX}hr-1 '
+            f'(password {PASSWORD}).'
+        ))
+
+    def step(self, label, func, *args):
+        started = time.monotonic()
+        with transaction.atomic():
+            result = func(*args)
+        count = len(result) if isinstance(result, (list, dict)) else result
+        self.stdout.write(f'{label}: {count} in {time.monotonic() - started:.1f}s')
+        return result
+
+    def clear(self):
+        with transaction.atomic():
+            # Cascades remove applications, documents, interviews, scores and notifications
+            Vacancy.objects.filter(reference_number__startswith=REFERENCE_PREFIX).delete()
+            deleted, _ = User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        bump_vacancy_version()
+        self.stdout.write(f'Cleared previously generated data ({deleted} rows).')
+
+    def moment(self, days_ago_max=None, after=None):
+        """A random past moment, optionally no earlier than `after`."""
+        if after is not None:
+            span = max((self.now - after).total_seconds(), 1)
+            return after + timedelta(seconds=self.rng.uniform(0, span))
+        return self.now - timedelta(seconds=self.rng.uniform(0, (days_ago_max or self.days) * 86400))
+
+    # ---------- Users ----------
+
+    def create_users(self, count, role, kind):
+        password = make_password(PASSWORD)
+        provinces = list(PROVINCE_WEIGHTS) + [name for name, _ in PROVINCES if name not in PROVINCE_WEIGHTS]
+        weights = [PROVINCE_WEIGHTS.get(name, 2) for name in provinces]
+        users = []
+        for n in range(1, count + 1):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            users.append(User(
+                username=f'{USERNAME_PREFIX}{kind}-{n}', email=f'{kind}{n}@load.example',
+                first_name=first, last_name=last, password=password,
+                is_staff=role == ROLE_HR_ADMIN, date_joined=self.moment(),
+            ))
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        users = list(User.objects.filter(username__startswith=f'{USERNAME_PREFIX}{kind}-').order_by('pk'))
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                user=user, role=role, province=self.rng.choices(provinces, weights)[0],
+                gender=self.rng.choices(['Male', 'Female', 'Other'], [55, 44, 1])[0],
+                phone=f'+675 7{self.rng.randint(0, 9999999):07d}',
+                date_of_birth=(self.now - timedelta(days=self.rng.randint(18 * 365, 45 * 365))).date(),
+            )
+            for user in users
+        ], batch_size=self.batch_size)
+        return list(UserProfile.objects.filter(user__in=users).select_related('user'))
+
+    # ---------- Vacancies ----------
+
+    def create_vacancies(self, count):
+        today = timezone.localdate()
+        vacancies = []
+        for n in range(1, count + 1):
+            opened = today - timedelta(days=self.rng.randint(0, self.days))
+            closes = opened + timedelta(days=self.rng.randint(14, 60))
+            vacancies.append(Vacancy(
+                title=f'{self.rng.choice(["Correctional", "Senior Correctional", "Health", "Finance", "Admin"])} '
+                      f'Officer {n}',
+                reference_number=f'{REFERENCE_PREFIX}{n:05d}',
+                department=self.rng.choice(['Corrections Operations', 'Health Services', 'Finance & Administration']),
+                category=self.rng.choice(CATEGORIES)[0],
+                province=self.rng.choice(['All', 'All', 'All', *PROVINCE_WEIGHTS]),
+                qualification_level=weighted(self.rng, QUALIFICATION_WEIGHTS),
+                positions_available=self.rng.choice([1, 2, 5, 10, 20, 50, 150]),
+                description='Synthetic vacancy for load testing. ' * 20,
+                requirements='- Grade 12 certificate\n- PNG citizen\n- Clean record',
+                open_date=opened, close_date=closes,
+                status='open' if closes >= today else 'closed',
+                created_at=datetime.combine(opened, datetime.min.time(), tzinfo=self.now.tzinfo),
+                updated_at=self.now,
+            ))
+        Vacancy.objects.bulk_create(vacancies, batch_size=self.batch_size)
+        return list(Vacancy.objects.filter(reference_number__startswith=REFERENCE_PREFIX).order_by('pk'))
+
+    # ---------- Applications ----------
+
+    def create_applications(self, applicants, vacancies):
+        # Popularity follows a power law: a few vacancies draw most of the applications
+        popularity = [1 / rank for rank in range(1, len(vacancies) + 1)]
+        self.rng.shuffle(popularity)
+        applications = []
+        for profile in applicants:
+            wanted = min(weighted(self.rng, APPLICATIONS_PER_APPLICANT_WEIGHTS), len(vacancies))
+            chosen = set()
+            while len(chosen) < wanted:
+                chosen.add(self.rng.choices(range(len(vacancies)), popularity)[0])
+            user = profile.user
+            for index in chosen:
+                vacancy = vacancies[index]
+                experience = min(int(self.rng.expovariate(1 / 4)), 30)
+                submitted = self.moment()
+                application = Application(
+                    vacancy=vacancy, applicant=user,
+                    first_name=user.first_name, last_name=user.last_name,
+                    date_of_birth=profile.date_of_birth, gender=profile.gender, province=profile.province,
+                    address=f'Section {self.rng.randint(1, 400)}, Lot {self.rng.randint(1, 90)}, {profile.province}',
+                    phone=profile.phone, email=user.email,
+                    highest_qualification=weighted(self.rng, QUALIFICATION_WEIGHTS),
+                    institution=self.rng.choice(['UPNG', 'UNITECH', 'Divine Word University', 'PAU', 'Secondary School']),
+                    year_completed=self.rng.randint(1995, self.now.year),
+                    grade_result=self.rng.choice(GRADES),
+                    years_experience=experience,
+                    current_employer='Previous Organization' if experience else '',
+                    work_history='Worked in community and security roles. ' * self.rng.randint(0, 5),
+                    reference1_name='Rev. Thomas Maino', reference1_position='Community Leader',
+                    reference1_phone='+675 325 1234',
+                    reference2_name=self.rng.choice(['', 'Mrs. Patricia Konga']),
+                    reference2_phone=self.rng.choice(['', '+675 542 5678']),
+                    cover_letter='I am applying for this position. ' * self.rng.randint(0, 12),
+                    status=weighted(self.rng, FINAL_STATUS_WEIGHTS),
+                    submitted_at=submitted, status_changed_at=submitted, updated_at=submitted,
+                )
+                application.total_score = application.calculate_score()
+                applications.append(application)
+        Application.objects.bulk_create(applications, batch_size=self.batch_size)
+        return list(
+            Application.objects.filter(vacancy__reference_number__startswith=REFERENCE_PREFIX)
+            .only('pk', 'status', 'submitted_at', 'applicant_id').order_by('pk')
+        )
+
+    def create_history(self, applications):
+        """Walk each application through the funnel to its final status, and date that status accordingly."""
+        changes, final_moments = [], []
+        for application in applications:
+            target = application.status
+            if target in FUNNEL_STAGES:
+                path = FUNNEL_STAGES[:FUNNEL_STAGES.index(target) + 1]
+            else:
+                # Rejections and withdrawals leave from somewhere along the funnel
+                path = FUNNEL_STAGES[:self.rng.randint(1, 4)] + [target]
+            previous_at, changed_at = None, application.submitted_at
+            from_status = ''
+            for status in path:
+                changes.append(ApplicationStatusChange(
+                    application_id=application.pk, from_status=from_status, to_status=status,
+                    changed_at=changed_at, previous_changed_at=previous_at,
+                ))
+                from_status, previous_at = status, changed_at
+                changed_at = changed_at + timedelta(days=self.rng.expovariate(1 / 6))
+            application.status_changed_at = min(previous_at, self.now)
+            final_moments.append(application)
+        ApplicationStatusChange.objects.bulk_create(changes, batch_size=self.batch_size)
+        Application.objects.bulk_update(final_moments, ['status_changed_at'], batch_size=self.batch_size)
+        return len(changes)
+
+    # ---------- Interviews ----------
+
+    def create_interviews(self, applications, panel):
+        interviewed = [a for a in applications if a.status in ('interview_scheduled', 'interviewed', 'selected')]
+        if not interviewed or not panel:
+            return 0
+        interviews = [
+            Interview(
+                application_id=application.pk,
+                scheduled_date=(
+                    self.now + timedelta(days=self.rng.uniform(1, 21)) if application.status == 'interview_scheduled'
+                    else self.moment(after=application.submitted_at)
+                ),
+                venue=self.rng.choice(['Bomana HQ', 'Buimo', 'Bihute', 'Kerevat']),
+                status='scheduled' if application.status == 'interview_scheduled' else 'completed',
+                created_at=application.submitted_at,
+            )
+            for application in interviewed
+        ]
+        Interview.objects.bulk_create(interviews, batch_size=self.batch_size)
+        interviews = list(
+            Interview.objects.filter(application__vacancy__reference_number__startswith=REFERENCE_PREFIX)
+            .only('pk', 'status', 'scheduled_date')
+        )
+
+        members = [profile.user for profile in panel]
+        memberships, scores = [], []
+        Membership = Interview.panel_members.through
+        for interview in interviews:
+            for member in self.rng.sample(members, min(3, len(members))):
+                memberships.append(Membership(interview_id=interview.pk, user_id=member.pk))
+                if interview.status == 'completed':
+                    parts = {
+                        'communication_score': self.rng.uniform(8, 20),
+                        'knowledge_score': self.rng.uniform(10, 30),
+                        'attitude_score': self.rng.uniform(10, 25),
+                        'experience_score': self.rng.uniform(5, 25),
+                    }
+                    scores.append(InterviewScore(
+                        interview_id=interview.pk, panel_member_id=member.pk,
+                        score=round(sum(parts.values()), 1), **{k: round(v, 1) for k, v in parts.items()},
+                        recommendation=self.rng.choice(['recommend', 'conditional', 'not_recommend']),
+                        submitted_at=interview.scheduled_date,
+                    ))
+        Membership.objects.bulk_create(memberships, batch_size=self.batch_size)
+        InterviewScore.objects.bulk_create(scores, batch_size=self.batch_size)
+        return len(interviews)
+
+    # ---------- Documents ----------
+
+    def create_files(self, count, size_kb):
+        """Write `count` distinct synthetic files into document storage and return their stored names."""
+        names = []
+        for n in range(count):
+            size = int(self.rng.lognormvariate(0, 0.6) * size_kb * 1024)
+            label = f'Synthetic document {n}'
+            if self.rng.random() < 0.6:
+                name = document_storage.save('documents/synthetic.pdf', ContentFile(synthetic_pdf(label, size)))
+            else:
+                name = document_storage.save('documents/synthetic.jpg', ContentFile(synthetic_image(self.rng, label, size)))
+            names.append(name)
+        return names
+
+    def create_documents(self, applications, files, average):
+        doc_types = [code for code, _ in DOC_TYPES]
+        documents = []
+        for application in applications:
+            for _ in range(min(int(self.rng.expovariate(1 / average)) + 1, len(doc_types))):
+                name = self.rng.choice(files) if files else ''
+                words = self.rng.randint(0, 800)
+                documents.append(Document(
+                    application_id=application.pk, doc_type=self.rng.choice(doc_types),
+                    file=name, filename=f'scan_{self.rng.randint(1000, 9999)}{name[-4:] if name else ".pdf"}',
+                    uploaded_at=application.submitted_at,
+                    ocr_word_count=words, ocr_char_count=words * 6,
+                    verified=self.rng.random() < 0.3,
+                ))
+        Document.objects.bulk_create(documents, batch_size=self.batch_size)
+        return len(documents)
+
+    # ---------- Notifications ----------
+
+    def create_notifications(self, applicants, average):
+        types = [code for code, _ in NOTIFICATION_TYPES]
+        notifications = []
+        for profile in applicants:
+            for _ in range(int(self.rng.expovariate(1 / average)) if average else 0):
+                created = self.moment()
+                notifications.append(Notification(
+                    user_id=profile.user_id, title='Application update',
+                    message='Your application status has been updated. ' * self.rng.randint(1, 4),
+                    notification_type=self.rng.choice(types),
+                    read=self.rng.random() < 0.6, created_at=created,
+                ))
+        Notification.objects.bulk_create(notifications, batch_size=self.batch_size)
+        return len(notifications)
@@ -0,0 +1,97 @@
+import json
+import os
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recruitment.loadtest import LoadTest, parse_mix
+from recruitment.management.commands.generate_load_data import PASSWORD, USERNAME_PREFIX, synthetic_pdf
+
+
+class Command(BaseCommand):
+    help = ('Drive a running server with intake-day traffic (browsing, registering and applying with '
+            'uploads, HR screening and messaging) and report latency percentiles, error rates and '
+            'throughput per endpoint.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to test.')
+        parser.add_argument('--concurrency', '-c', type=int, default=20, help='Virtual users running at once.')
+        parser.add_argument('--rate', type=float, default=0,
+                            help='New flows per second (open model). 0 = each user starts a new flow '
+                                 'as soon as the last one ends.')
+        parser.add_argument('--duration', type=int, default=60, help='Seconds to run.')
+        parser.add_argument('--ramp-up', type=int, default=0, help='Seconds over which users start (closed model).')
+        parser.add_argument('--mix', default='browse=70,apply=25,hr=5',
+                            help='Relative weights of the browse, apply and hr flows.')
+        parser.add_argument('--think-time', type=float, default=1.0, help='Mean pause between pages, seconds.')
+        parser.add_argument('--uploads', type=int, default=2, help='Documents uploaded per application.')
+        parser.add_argument('--upload-kb', type=int, default=300, help='Size of each uploaded document.')
+        parser.add_argument('--bulk-message-ratio', type=float, default=0.1,
+                            help='Share of HR flows that also send a bulk message.')
+        parser.add_argument('--hr-username', default=f'{USERNAME_PREFIX}hr-1')
+        parser.add_argument('--hr-password', default=PASSWORD)
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout, seconds.')
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--output', '-o', help='Write the full report as JSON to this file.')
+        parser.add_argument('--max-error-rate', type=float,
+                            help='Exit non-zero if the overall error rate is above this (e.g. 0.01).')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        context = {
+            'run_id': uuid.uuid4().hex[:6],
+            'upload': synthetic_pdf('Load test upload', options['upload_kb'] * 1024),
+            'uploads_per_application': options['uploads'],
+            'hr_username': options['hr_username'],
+            'hr_password': options['hr_password'],
+            'bulk_message_ratio': options['bulk_message_ratio'],
+        }
+        model = f"{options['rate']:g} flows/s" if options['rate'] else 'closed loop'
+        self.stdout.write(
+            f"Load testing {options['base_url']} for {options['duration']}s: {options['concurrency']} users, "
+            f"{model}, mix {options['mix']}"
+        )
+        test = LoadTest(
+            options['base_url'], context, mix=mix, concurrency=options['concurrency'], rate=options['rate'],
+            duration=options['duration'], ramp_up=options['ramp_up'], think_time=options['think_time'],
+            timeout=options['timeout'], seed=options['seed'], progress=self.progress,
+        )
+        report = test.run()
+        self.print_report(report)
+
+        if options['output']:
+            directory = os.path.dirname(options['output'])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(options['output'], 'w') as f:
+                json.dump({'options': {k: options[k] for k in (
+                    'base_url', 'concurrency', 'rate', 'duration', 'mix', 'think_time', 'uploads', 'upload_kb',
+                )}, **report}, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
+        if options['max_error_rate'] is not None and report['error_rate'] > options['max_error_rate']:
+            raise CommandError(f"Error rate {report['error_rate']:.2%} is above {options['max_error_rate']:.2%}.")
+
+    def progress(self, report):
+        self.stderr.write(
+            f"  {report['duration_s']:>6.0f}s  {report['requests']} requests, {report['throughput']:.1f}/s, "
+            f"{report['errors']} errors"
+        )
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"\n{'Endpoint':28} {'Requests':>8} {'Errors':>7} {'Req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'Max ms':>8}"
+        )
+        for name, e in report['endpoints'].items():
+            line = (f"{name:28} {e['requests']:>8} {e['error_rate']:>7.1%} {e['throughput']:>7.2f} "
+                    f"{e['p50_ms']:>8.0f} {e['p95_ms']:>8.0f} {e['p99_ms']:>8.0f} {e['max_ms']:>8.0f}")
+            self.stdout.write(self.style.ERROR(line) if e['errors'] else line)
+        flows = ', '.join(f"{name} {f['completed']} ok / {f['failed']} failed" for name, f in report['flows'].items())
+        self.stdout.write(
+            f"\n{report['requests']} requests in {report['duration_s']}s ({report['throughput']:.1f}/s), "
+            f"error rate {report['error_rate']:.2%}. Flows: {flows or 'none'}."
+        )
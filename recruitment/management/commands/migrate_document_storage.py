@@ -0,0 +1,53 @@
+import os
+import re
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recruitment.models import Document
+from recruitment.storage import document_storage
+
+HASHED_NAME_RE = re.compile(r'/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}[^/]*$')
+
+
+class Command(BaseCommand):
+    help = ('Move documents and previews stored under the old dated layout into content-addressed '
+            'storage, merging duplicate files. Safe to re-run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would move without changing anything.')
+
+    def handle(self, *args, **options):
+        for field in ('file', 'preview'):
+            upload_to = Document._meta.get_field(field).upload_to
+            old_names = sorted(
+                name for name in
+                Document.objects.exclude(**{field: ''}).values_list(field, flat=True).distinct()
+                if not HASHED_NAME_RE.search(name)
+            )
+            moved = merged = freed = missing = 0
+            for old_name in old_names:
+                if not document_storage.exists(old_name):
+                    missing += 1
+                    continue
+                size = document_storage.size(old_name)
+                if options['dry_run']:
+                    moved += 1
+                    continue
+                with document_storage.open(old_name, 'rb') as content:
+                    new_name = document_storage.save(upload_to + os.path.basename(old_name), content)
+                with transaction.atomic():
+                    already_stored = Document.objects.filter(**{field: new_name}).exists()
+                    Document.objects.filter(**{field: old_name}).update(**{field: new_name})
+                document_storage.delete(old_name)
+                moved += 1
+                if already_stored:
+                    merged += 1
+                    freed += size
+
+            verb = 'would move' if options['dry_run'] else 'moved'
+            self.stdout.write(
+                f"{field}: {verb} {moved} file(s), {merged} merged into an existing copy "
+                f"({freed // 1024} KiB freed), {missing} missing on disk."
+            )
+        self.stdout.write(self.style.SUCCESS('Document storage migration finished.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.bulk_messaging import deliver_bulk_message
+from recruitment.models import BulkMessage
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued bulk messages (and optionally resume ones interrupted mid-send).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resume', action='store_true',
+                            help="Also continue messages stuck in 'sending', e.g. after a restart.")
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Re-queue failed messages before processing.')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            requeued = BulkMessage.objects.filter(status='failed').update(status='queued', error='')
+            self.stdout.write(f'Re-queued {requeued} failed message(s).')
+
+        statuses = ['queued', 'sending'] if options['resume'] else ['queued']
+        pending = list(BulkMessage.objects.filter(status__in=statuses).order_by('sent_at').values_list('pk', flat=True))
+        for pk in pending:
+            try:
+                delivered = deliver_bulk_message(pk, resume=options['resume'])
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f'Bulk message #{pk} failed: {e}'))
+                continue
+            self.stdout.write(f'Bulk message #{pk}: delivered to {delivered} applicant(s).')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(pending)} bulk message(s).'))
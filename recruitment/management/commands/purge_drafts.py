@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from recruitment.drafts import purge_drafts
+
+
+class Command(BaseCommand):
+    help = 'Delete application drafts, and their partial uploads, untouched for a number of days (cron, daily).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Age in days (default RECRUITMENT_DRAFT_MAX_AGE_DAYS, 30).')
+
+    def handle(self, *args, **options):
+        deleted = purge_drafts(options['days'])
+        self.stdout.write(f'Deleted {deleted} draft(s).')
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recruitment.reporting import refresh_snapshot, reporting_enabled
+
+
+class Command(BaseCommand):
+    help = 'Refresh the read-only reporting snapshot from the live database (cron or --loop).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep refreshing every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=300)
+
+    def handle(self, *args, **options):
+        if not reporting_enabled():
+            raise CommandError("No 'reporting' database is configured.")
+        while True:
+            started = time.monotonic()
+            path = refresh_snapshot()
+            if path:
+                self.stdout.write(f'Snapshot written to {path} in {time.monotonic() - started:.2f}s.')
+            else:
+                self.stdout.write('Snapshot not refreshed (another refresh is running, or the live database is in memory).')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from recruitment.reminders import REMINDER_BATCH_SIZE, send_due_reminders
+
+
+class Command(BaseCommand):
+    help = 'Send reminders for scheduled interviews starting within the next window (cron or --loop).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-hours', type=float, default=24,
+                            help='Remind interviews starting within this many hours.')
+        parser.add_argument('--batch-size', type=int, default=REMINDER_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Keep running, re-scanning every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=300)
+
+    def handle(self, *args, **options):
+        window = timedelta(hours=options['window_hours'])
+        while True:
+            sent = send_due_reminders(window, options['batch_size'])
+            self.stdout.write(f'Reminded {sent} interview(s).')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
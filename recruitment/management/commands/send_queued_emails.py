@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recruitment.email_delivery import RateLimiter, deliver_batch, release_stale_claims
+
+
+class Command(BaseCommand):
+    help = 'Send queued notification emails in rate-limited batches over pooled connections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=getattr(settings, 'RECRUITMENT_EMAIL_BATCH_SIZE', 100))
+        parser.add_argument('--rate', type=float,
+                            default=getattr(settings, 'RECRUITMENT_EMAIL_RATE_LIMIT', 5),
+                            help='Maximum messages per second (0 = unlimited).')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling for new emails.')
+        parser.add_argument('--interval', type=float, default=10, help='Seconds to sleep when the queue is empty.')
+
+    def handle(self, *args, **options):
+        released = release_stale_claims()
+        if released:
+            self.stdout.write(f'Released {released} stale claim(s).')
+
+        limiter = RateLimiter(options['rate'])
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_batch(options['batch_size'], rate_limiter=limiter)
+            total_sent += sent
+            total_failed += failed
+            if sent:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Sent {total_sent} email(s), {total_failed} failed or deferred.'))
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = ('Routine SQLite upkeep (run nightly from cron): refresh planner statistics, '
+            'return free pages to the filesystem and truncate the WAL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--full-analyze', action='store_true',
+                            help='Run a full ANALYZE instead of the cheaper PRAGMA optimize.')
+        parser.add_argument('--vacuum-pages', type=int, default=0,
+                            help='Free pages to release per run with incremental vacuum (0 = all).')
+        parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                            help='One-off: switch the database to auto_vacuum=INCREMENTAL. Rewrites the '
+                                 'whole file with VACUUM and locks it while running; use a quiet period.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"Database '{options['database']}' is not SQLite.")
+
+        with connection.cursor() as cursor:
+            def pragma(statement):
+                cursor.execute(f'PRAGMA {statement}')
+                row = cursor.fetchone()
+                return row[0] if row else None
+
+            page_size = pragma('page_size')
+            free_before = pragma('freelist_count')
+            self.stdout.write(f"{pragma('page_count')} pages of {page_size} bytes, {free_before} free.")
+
+            if options['enable_incremental_vacuum'] and pragma('auto_vacuum') != 2:
+                self.stdout.write('Switching to incremental auto-vacuum (VACUUM)...')
+                pragma('auto_vacuum=INCREMENTAL')
+                cursor.execute('VACUUM')
+                free_before = pragma('freelist_count')
+
+            if options['full_analyze']:
+                cursor.execute('ANALYZE')
+                self.stdout.write('ANALYZE complete.')
+            else:
+                cursor.execute('PRAGMA optimize')
+                self.stdout.write('PRAGMA optimize complete.')
+
+            if pragma('auto_vacuum') == 2:
+                pages = options['vacuum_pages']
+                cursor.execute(f'PRAGMA incremental_vacuum({pages})' if pages else 'PRAGMA incremental_vacuum')
+                cursor.fetchall()
+                freed = free_before - pragma('freelist_count')
+                self.stdout.write(f'Incremental vacuum released {freed} page(s) ({freed * page_size // 1024} KiB).')
+            elif free_before:
+                self.stdout.write(self.style.WARNING(
+                    'auto_vacuum is not INCREMENTAL, so free pages stay in the file. '
+                    'Run once with --enable-incremental-vacuum to turn it on.'
+                ))
+
+            cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            busy, _, checkpointed = cursor.fetchone()
+            if busy:
+                self.stdout.write(self.style.WARNING('WAL checkpoint could not finish; readers were active.'))
+            else:
+                self.stdout.write(f'WAL checkpointed ({checkpointed} page(s)) and truncated.')
+
+        self.stdout.write(self.style.SUCCESS('SQLite maintenance finished.'))
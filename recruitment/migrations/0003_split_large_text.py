@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:28
+
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+COMPRESS_MIN_BYTES = 256
+
+
+def _pack(text):
+    raw = text.encode('utf-8')
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return zlib.compress(raw), True
+    return raw, False
+
+
+def move_text_to_side_tables(apps, schema_editor):
+    Document = apps.get_model('recruitment', 'Document')
+    DocumentText = apps.get_model('recruitment', 'DocumentText')
+    Application = apps.get_model('recruitment', 'Application')
+    ApplicationSummary = apps.get_model('recruitment', 'ApplicationSummary')
+
+    for doc in Document.objects.exclude(ocr_text='').only('pk', 'ocr_text').iterator(chunk_size=500):
+        data, compressed = _pack(doc.ocr_text)
+        DocumentText.objects.create(document_id=doc.pk, data=data, compressed=compressed)
+        Document.objects.filter(pk=doc.pk).update(
+            ocr_word_count=len(doc.ocr_text.split()),
+            ocr_char_count=len(doc.ocr_text),
+        )
+
+    for app in Application.objects.exclude(ai_summary='').only('pk', 'ai_summary').iterator(chunk_size=500):
+        data, compressed = _pack(app.ai_summary)
+        ApplicationSummary.objects.create(application_id=app.pk, data=data, compressed=compressed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0002_notification_inbox_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationSummary',
+            fields=[
+                ('data', models.BinaryField(default=b'')),
+                ('compressed', models.BooleanField(default=False)),
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary_blob', serialize=False, to='recruitment.application')),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DocumentText',
+            fields=[
+                ('data', models.BinaryField(default=b'')),
+                ('compressed', models.BooleanField(default=False)),
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='text_blob', serialize=False, to='recruitment.document')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='ocr_char_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='ocr_word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(move_text_to_side_tables, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='application',
+            name='ai_summary',
+        ),
+        migrations.RemoveField(
+            model_name='document',
+            name='ocr_text',
+        ),
+    ]
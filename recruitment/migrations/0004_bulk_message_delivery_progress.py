@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:29
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_messages_sent(apps, schema_editor):
+    # Messages recorded before the fan-out job existed were delivered inline.
+    BulkMessage = apps.get_model('recruitment', 'BulkMessage')
+    BulkMessage.objects.update(status='sent', delivered_count=F('recipient_count'), completed_at=F('sent_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0003_split_large_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkmessage',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bulkmessage',
+            name='delivered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bulkmessage',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='bulkmessage',
+            name='last_recipient_id',
+            field=models.PositiveBigIntegerField(default=0, help_text='Resume point: highest applicant id delivered'),
+        ),
+        migrations.AddField(
+            model_name='bulkmessage',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bulkmessage',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='bulkmessage',
+            index=models.Index(fields=['status', 'sent_at'], name='bulkmsg_status_sent_idx'),
+        ),
+        migrations.RunPython(mark_existing_messages_sent, migrations.RunPython.noop),
+    ]
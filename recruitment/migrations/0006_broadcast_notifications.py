@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0005_outbound_email_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='body',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='subject',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('notification_type', models.CharField(choices=[('info', 'Information'), ('success', 'Success'), ('warning', 'Warning'), ('status_update', 'Status Update'), ('interview', 'Interview')], default='info', max_length=30)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bulk_message', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broadcast', to='recruitment.bulkmessage')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='broadcast',
+            field=models.ForeignKey(blank=True, help_text='Broadcast emails take subject and body from the broadcast', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='emails', to='recruitment.broadcast'),
+        ),
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(help_text='Copied from the broadcast so the inbox can sort on an index')),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='recruitment.broadcast')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'read', 'created_at'], name='receipt_user_read_created_idx'), models.Index(fields=['user', '-created_at', '-id'], name='receipt_user_inbox_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0006_broadcast_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='reminder_token',
+            field=models.CharField(blank=True, help_text='Identifies the reminder run that claimed this interview', max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['status', 'scheduled_date', 'reminder_sent'], name='interview_reminder_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_status_history(apps, schema_editor):
+    # Only the submission and the current status are known for existing rows;
+    # updated_at is the best available guess for when the current status began.
+    Application = apps.get_model('recruitment', 'Application')
+    ApplicationStatusChange = apps.get_model('recruitment', 'ApplicationStatusChange')
+    Application.objects.filter(status='submitted').update(status_changed_at=F('submitted_at'))
+    Application.objects.exclude(status='submitted').update(status_changed_at=F('updated_at'))
+
+    rows = []
+    for pk, status, submitted_at, updated_at in Application.objects.values_list(
+        'pk', 'status', 'submitted_at', 'updated_at'
+    ).iterator(chunk_size=1000):
+        rows.append(ApplicationStatusChange(application_id=pk, to_status='submitted', changed_at=submitted_at))
+        if status != 'submitted':
+            rows.append(ApplicationStatusChange(
+                application_id=pk, from_status='submitted', to_status=status,
+                changed_at=updated_at, previous_changed_at=submitted_at,
+            ))
+        if len(rows) >= 1000:
+            ApplicationStatusChange.objects.bulk_create(rows)
+            rows = []
+    ApplicationStatusChange.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0007_interview_reminder_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='status_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='ApplicationStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('submitted', 'Submitted'), ('under_review', 'Under Review'), ('shortlisted', 'Shortlisted'), ('interview_scheduled', 'Interview Scheduled'), ('interviewed', 'Interviewed'), ('selected', 'Selected'), ('rejected', 'Rejected'), ('withdrawn', 'Withdrawn')], max_length=30)),
+                ('to_status', models.CharField(choices=[('submitted', 'Submitted'), ('under_review', 'Under Review'), ('shortlisted', 'Shortlisted'), ('interview_scheduled', 'Interview Scheduled'), ('interviewed', 'Interviewed'), ('selected', 'Selected'), ('rejected', 'Rejected'), ('withdrawn', 'Withdrawn')], max_length=30)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('previous_changed_at', models.DateTimeField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='recruitment.application')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_changes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['changed_at', 'pk'],
+                'indexes': [models.Index(fields=['application', 'changed_at'], name='status_hist_app_idx'), models.Index(fields=['to_status', 'changed_at'], name='status_hist_to_idx'), models.Index(fields=['from_status', 'changed_at'], name='status_hist_from_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_status_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0008_application_status_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='preview',
+            field=models.ImageField(blank=True, help_text='Small first-page image shown in document lists', upload_to='previews/%Y/%m/'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:55
+
+import recruitment.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0009_document_preview'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=models.FileField(db_index=True, storage=recruitment.storage.ContentAddressedStorage(), upload_to='documents/'),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='preview',
+            field=models.ImageField(blank=True, db_index=True, help_text='Small first-page image shown in document lists', storage=recruitment.storage.ContentAddressedStorage(), upload_to='previews/'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:17
+
+import django.db.models.deletion
+import recruitment.models
+import recruitment.storage
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0010_content_addressed_document_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationDraft',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=recruitment.models.new_token, max_length=32, unique=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_drafts', to=settings.AUTH_USER_MODEL)),
+                ('application', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='draft', to='recruitment.application')),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drafts', to='recruitment.vacancy')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DraftUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upload_id', models.CharField(default=recruitment.models.new_token, max_length=32, unique=True)),
+                ('doc_type', models.CharField(choices=[('cv', 'Curriculum Vitae (CV)'), ('cover_letter', 'Cover Letter'), ('national_id', 'National ID / Passport'), ('birth_certificate', 'Birth Certificate'), ('academic_transcript', 'Academic Transcript / Results'), ('qualification', 'Qualification / Certificate'), ('reference_letter', 'Reference Letter'), ('other', 'Other')], max_length=30)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveIntegerField()),
+                ('received', models.PositiveIntegerField(default=0)),
+                ('file', models.FileField(blank=True, db_index=True, storage=recruitment.storage.ContentAddressedStorage(), upload_to='documents/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='recruitment.applicationdraft')),
+            ],
+            options={
+                'ordering': ['created_at', 'pk'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='applicationdraft',
+            index=models.Index(fields=['updated_at'], name='draft_updated_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='applicationdraft',
+            unique_together={('applicant', 'vacancy')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0011_application_drafts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='preview_failed_at',
+            field=models.DateTimeField(blank=True, help_text='Last failed preview render; not retried for a while', null=True),
+        ),
+    ]
@@ -1,7 +1,13 @@
-from django.db import models
+import uuid
+import zlib
+
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.functional import cached_property
 from accounts.models import PROVINCES
+from .storage import document_storage
 
 QUALIFICATION_LEVELS = [
     ('grade_10', 'Grade 10'),
@@ -121,8 +127,8 @@ class Application(models.Model):
 
     # Status & Score
     status = models.CharField(max_length=30, choices=APPLICATION_STATUS, default='submitted')
+    status_changed_at = models.DateTimeField(default=timezone.now)
     total_score = models.FloatField(null=True, blank=True)
-    ai_summary = models.TextField(blank=True, help_text='AI-generated summary of application')
 
     # Metadata
     submitted_at = models.DateTimeField(auto_now_add=True)
@@ -145,7 +151,36 @@ class Application(models.Model):
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+    @cached_property
+    def ai_summary(self):
+        """AI-generated summary, loaded lazily from ApplicationSummary and decompressed once."""
+        try:
+            return self.summary_blob.text
+        except ApplicationSummary.DoesNotExist:
+            return ''
+
+    def set_summary(self, text):
+        blob = ApplicationSummary(application=self)
+        blob.text = text
+        blob.save()
+        self.summary_blob = blob
+        self.__dict__.pop('ai_summary', None)
+
     def compute_score(self):
+        """Score the application, save it and refresh the summary. Returns the score."""
+        self.total_score = self.calculate_score()
+        self.save(update_fields=['total_score'])
+
+        # Regenerate the full OCR-enhanced summary
+        try:
+            from recruitment.ocr_service import generate_application_summary
+            self.set_summary(generate_application_summary(self))
+        except Exception:
+            pass
+
+        return self.total_score
+
+    def calculate_score(self):
         """Automated scoring: Education 30%, Grade 25%, Experience 20%, Province 10%, Completeness 15%"""
         score = 0.0
 
@@ -190,18 +225,7 @@ class Application(models.Model):
         completeness_score = (filled / len(fields)) * 100
         score += (completeness_score / 100) * 15
 
-        self.total_score = round(score, 2)
-        self.save(update_fields=['total_score'])
-
-        # Regenerate the full OCR-enhanced summary
-        try:
-            from recruitment.ocr_service import generate_application_summary
-            self.ai_summary = generate_application_summary(self)
-            self.save(update_fields=['ai_summary'])
-        except Exception:
-            pass
-
-        return self.total_score
+        return round(score, 2)
 
 
 DOC_TYPES = [
@@ -219,10 +243,14 @@ DOC_TYPES = [
 class Document(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='documents')
     doc_type = models.CharField(max_length=30, choices=DOC_TYPES)
-    file = models.FileField(upload_to='documents/%Y/%m/')
+    # Stored by content hash (see storage.py); the uploaded name is kept in filename
+    file = models.FileField(upload_to='documents/', storage=document_storage, db_index=True)
     filename = models.CharField(max_length=255)
+    preview = models.ImageField(upload_to='previews/', storage=document_storage, blank=True, db_index=True, help_text='Small first-page image shown in document lists')
+    preview_failed_at = models.DateTimeField(null=True, blank=True, help_text='Last failed preview render; not retried for a while')
     uploaded_at = models.DateTimeField(auto_now_add=True)
-    ocr_text = models.TextField(blank=True, help_text='Extracted text from document (OCR)')
+    ocr_word_count = models.PositiveIntegerField(default=0)
+    ocr_char_count = models.PositiveIntegerField(default=0)
     verified = models.BooleanField(default=False)
     verified_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='verified_docs')
     verified_at = models.DateTimeField(null=True, blank=True)
@@ -230,6 +258,26 @@ class Document(models.Model):
     def __str__(self):
         return f"{self.get_doc_type_display()} - {self.application.full_name()}"
 
+    @cached_property
+    def ocr_text(self):
+        """Extracted text from document (OCR), loaded lazily from DocumentText and decompressed once."""
+        try:
+            return self.text_blob.text
+        except DocumentText.DoesNotExist:
+            return ''
+
+    def set_ocr_text(self, text):
+        """Store OCR text in the side table and refresh the counts kept on this row."""
+        blob = DocumentText(document=self)
+        blob.text = text
+        self.ocr_word_count = len(text.split()) if text else 0
+        self.ocr_char_count = len(text)
+        with transaction.atomic():
+            blob.save()
+            self.save(update_fields=['ocr_word_count', 'ocr_char_count'])
+        self.text_blob = blob
+        self.__dict__.pop('ocr_text', None)
+
 
 class Interview(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='interviews')
@@ -244,8 +292,14 @@ class Interview(models.Model):
     ], default='scheduled')
     notes = models.TextField(blank=True)
     reminder_sent = models.BooleanField(default=False)
+    reminder_token = models.CharField(max_length=32, blank=True, help_text='Identifies the reminder run that claimed this interview')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'scheduled_date', 'reminder_sent'], name='interview_reminder_idx'),
+        ]
+
     def __str__(self):
         return f"Interview: {self.application.full_name()} on {self.scheduled_date.date()}"
 
@@ -280,27 +334,44 @@ class InterviewScore(models.Model):
         super().save(*args, **kwargs)
 
 
+NOTIFICATION_TYPES = [
+    ('info', 'Information'),
+    ('success', 'Success'),
+    ('warning', 'Warning'),
+    ('status_update', 'Status Update'),
+    ('interview', 'Interview'),
+]
+
+
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     title = models.CharField(max_length=200)
     message = models.TextField()
-    notification_type = models.CharField(max_length=30, choices=[
-        ('info', 'Information'),
-        ('success', 'Success'),
-        ('warning', 'Warning'),
-        ('status_update', 'Status Update'),
-        ('interview', 'Interview'),
-    ], default='info')
+    notification_type = models.CharField(max_length=30, choices=NOTIFICATION_TYPES, default='info')
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'read', 'created_at'], name='notif_user_read_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_inbox_idx'),
+        ]
+
+    is_broadcast = False
 
     def __str__(self):
         return f"{self.title} -> {self.user.username}"
 
 
+BULK_MESSAGE_STATUS = [
+    ('queued', 'Queued'),
+    ('sending', 'Sending'),
+    ('sent', 'Sent'),
+    ('failed', 'Failed'),
+]
+
+
 class BulkMessage(models.Model):
     vacancy = models.ForeignKey(Vacancy, on_delete=models.SET_NULL, null=True, blank=True)
     subject = models.CharField(max_length=200)
@@ -310,5 +381,232 @@ class BulkMessage(models.Model):
     sent_at = models.DateTimeField(auto_now_add=True)
     recipient_count = models.PositiveIntegerField(default=0)
 
+    # Delivery progress (fan-out runs as a background job)
+    status = models.CharField(max_length=20, choices=BULK_MESSAGE_STATUS, default='queued')
+    delivered_count = models.PositiveIntegerField(default=0)
+    last_recipient_id = models.PositiveBigIntegerField(default=0, help_text='Resume point: highest applicant id delivered')
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'sent_at'], name='bulkmsg_status_sent_idx')]
+
     def __str__(self):
         return f"{self.subject} ({self.sent_at.date()})"
+
+    def recipient_status_display(self):
+        return dict(APPLICATION_STATUS).get(self.recipient_status, 'All applicants')
+
+    def progress_percent(self):
+        if not self.recipient_count:
+            return 100 if self.status == 'sent' else 0
+        return min(100, round(self.delivered_count * 100 / self.recipient_count))
+
+
+# ---------- Large Text Side Tables ----------
+# OCR text and generated summaries can run to hundreds of KB per row; keeping
+# them off recruitment_document / recruitment_application keeps list pages,
+# exports and select_related joins from dragging them along.
+
+COMPRESS_MIN_BYTES = 256
+
+
+class StoredText(models.Model):
+    data = models.BinaryField(default=b'')
+    compressed = models.BooleanField(default=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def text(self):
+        data = bytes(self.data)
+        if self.compressed:
+            data = zlib.decompress(data)
+        return data.decode('utf-8')
+
+    @text.setter
+    def text(self, value):
+        raw = (value or '').encode('utf-8')
+        if getattr(settings, 'RECRUITMENT_COMPRESS_TEXT', True) and len(raw) >= COMPRESS_MIN_BYTES:
+            self.data, self.compressed = zlib.compress(raw), True
+        else:
+            self.data, self.compressed = raw, False
+
+
+class DocumentText(StoredText):
+    document = models.OneToOneField(Document, on_delete=models.CASCADE, primary_key=True, related_name='text_blob')
+
+    def __str__(self):
+        return f"OCR text for document #{self.document_id}"
+
+
+class ApplicationSummary(StoredText):
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, primary_key=True, related_name='summary_blob')
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary for application #{self.application_id}"
+
+
+# ---------- Broadcast Notifications ----------
+# Mass messages store their title and body once in Broadcast; each recipient
+# only gets a slim BroadcastReceipt row (ids, read flag, timestamp).
+
+class Broadcast(models.Model):
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=30, choices=NOTIFICATION_TYPES, default='info')
+    bulk_message = models.OneToOneField(BulkMessage, on_delete=models.SET_NULL, null=True, blank=True, related_name='broadcast')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.title} ({self.created_at.date()})"
+
+
+class BroadcastReceipt(models.Model):
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcast_receipts')
+    read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(help_text='Copied from the broadcast so the inbox can sort on an index')
+
+    is_broadcast = True
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'read', 'created_at'], name='receipt_user_read_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='receipt_user_inbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.broadcast.title} -> user #{self.user_id}"
+
+    # Notification-compatible accessors for the inbox templates
+    @property
+    def title(self):
+        return self.broadcast.title
+
+    @property
+    def message(self):
+        return self.broadcast.message
+
+    @property
+    def notification_type(self):
+        return self.broadcast.notification_type
+
+
+# ---------- Outbound Email Queue ----------
+
+OUTBOUND_EMAIL_STATUS = [
+    ('pending', 'Pending'),
+    ('sending', 'Sending'),
+    ('sent', 'Sent'),
+    ('failed', 'Failed'),
+]
+
+
+class OutboundEmail(models.Model):
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, null=True, blank=True, related_name='emails')
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, null=True, blank=True, related_name='emails',
+                                  help_text='Broadcast emails take subject and body from the broadcast')
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=200, blank=True)
+    body = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=OUTBOUND_EMAIL_STATUS, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'], name='outbound_status_due_idx')]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+# ---------- Status History ----------
+
+class ApplicationStatusChange(models.Model):
+    """
+    Append-only log of application status transitions, written by
+    recruitment.transitions. `previous_changed_at` is when the application
+    entered `from_status`, so time spent in a stage is a single subtraction.
+    """
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='status_history')
+    from_status = models.CharField(max_length=30, choices=APPLICATION_STATUS, blank=True)
+    to_status = models.CharField(max_length=30, choices=APPLICATION_STATUS)
+    changed_at = models.DateTimeField(default=timezone.now)
+    previous_changed_at = models.DateTimeField(null=True, blank=True)
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='status_changes')
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['changed_at', 'pk']
+        indexes = [
+            models.Index(fields=['application', 'changed_at'], name='status_hist_app_idx'),
+            models.Index(fields=['to_status', 'changed_at'], name='status_hist_to_idx'),
+            models.Index(fields=['from_status', 'changed_at'], name='status_hist_from_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.application_id}: {self.from_status or '-'} -> {self.to_status}"
+
+
+# ---------- Application Drafts ----------
+
+def new_token():
+    return uuid.uuid4().hex
+
+
+class ApplicationDraft(models.Model):
+    """
+    An application form in progress, autosaved field by field (see
+    recruitment.drafts). `token` is sent with the final submission: once the
+    draft has an application, a retried submission returns that application
+    instead of creating another or uploading the documents again.
+    """
+    applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='application_drafts')
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name='drafts')
+    token = models.CharField(max_length=32, unique=True, default=new_token)
+    data = models.JSONField(default=dict, blank=True)
+    version = models.PositiveIntegerField(default=0)
+    application = models.OneToOneField(Application, on_delete=models.SET_NULL, null=True, blank=True, related_name='draft')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['applicant', 'vacancy']
+        indexes = [models.Index(fields=['updated_at'], name='draft_updated_idx')]
+
+    def __str__(self):
+        return f"Draft {self.applicant} - {self.vacancy.reference_number}"
+
+
+class DraftUpload(models.Model):
+    """
+    A document uploaded in chunks for a draft. Chunks are appended to a
+    partial file until `received` reaches `size`; the finished file then
+    moves into document storage and becomes a Document on submission.
+    """
+    draft = models.ForeignKey(ApplicationDraft, on_delete=models.CASCADE, related_name='uploads')
+    upload_id = models.CharField(max_length=32, unique=True, default=new_token)
+    doc_type = models.CharField(max_length=30, choices=DOC_TYPES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveIntegerField()
+    received = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to='documents/', storage=document_storage, blank=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'pk']
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+    @property
+    def complete(self):
+        return bool(self.file)
@@ -0,0 +1,215 @@
+"""
+Notification Inbox Service
+Keeps a per-user unread counter in the cache and serves the applicant inbox
+with cursor (keyset) pagination, so neither the navbar badge nor the inbox
+has to scan a user's whole notification history.
+
+The inbox merges two sources: personal Notification rows and
+BroadcastReceipt rows for mass messages, whose text is stored once on the
+Broadcast. Use create_broadcast() for anything sent to many applicants.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from . import events
+from .models import Broadcast, BroadcastReceipt, Notification
+
+UNREAD_CACHE_TIMEOUT = 60 * 60 * 24  # recomputed from the index at most once a day
+INBOX_PAGE_SIZE = 20
+BROADCAST_CHUNK_SIZE = 1000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Tie-break order between sources at the same timestamp (higher sorts first)
+_SOURCES = {'n': 1, 'b': 0}
+
+
+# ---------- Unread Counter ----------
+
+def _unread_key(user_id):
+    return f'notif:unread:{user_id}'
+
+
+def get_unread_count(user):
+    """Return the user's unread notification count, filling the cache on a miss."""
+    key = _unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = (
+            Notification.objects.filter(user=user, read=False).count()
+            + BroadcastReceipt.objects.filter(user=user, read=False).count()
+        )
+        cache.set(key, count, UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def incr_unread_count(user_id, delta=1):
+    """Bump a cached counter. A missing counter is left alone and recounted on next read."""
+    try:
+        cache.incr(_unread_key(user_id), delta)
+    except ValueError:
+        pass
+
+
+def decr_unread_count(user_id, delta=1):
+    key = _unread_key(user_id)
+    try:
+        if cache.decr(key, delta) < 0:
+            cache.delete(key)
+    except ValueError:
+        pass
+
+
+def invalidate_unread_counts(user_ids):
+    """Drop cached counters after writes that bypass signals (bulk_create, update)."""
+    cache.delete_many([_unread_key(uid) for uid in set(user_ids)])
+
+
+# ---------- Batched Creation ----------
+
+def create_notifications(notifications):
+    """
+    Insert many personal notifications in one statement, queueing their
+    emails and refreshing unread counters (bulk_create skips the signals
+    that normally do both) and pushing live events. Returns the saved
+    notifications.
+    """
+    from .email_delivery import queue_notification_emails
+
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(notifications, batch_size=BROADCAST_CHUNK_SIZE)
+        queue_notification_emails(created)
+        user_ids = [n.user_id for n in created]
+        transaction.on_commit(lambda: invalidate_unread_counts(user_ids))
+        for n in created:
+            events.publish(events.user_channel(n.user_id), 'notification', events.notification_data(n))
+    return created
+
+
+# ---------- Broadcasts ----------
+
+def add_broadcast_recipients(broadcast, user_ids):
+    """
+    Deliver a broadcast to a chunk of users: one slim receipt per user plus
+    a queued email. Returns the receipts created.
+    """
+    from .email_delivery import queue_broadcast_emails
+
+    with transaction.atomic():
+        receipts = BroadcastReceipt.objects.bulk_create([
+            BroadcastReceipt(broadcast=broadcast, user_id=uid, created_at=broadcast.created_at)
+            for uid in user_ids
+        ], batch_size=BROADCAST_CHUNK_SIZE)
+        queue_broadcast_emails(broadcast, user_ids)
+        transaction.on_commit(lambda: invalidate_unread_counts(user_ids))
+        events.publish_to_users(user_ids, 'notification', events.notification_data(broadcast))
+    return receipts
+
+
+def create_broadcast(title, message, user_ids, notification_type='info'):
+    """Send one message to many users, storing its text once. Returns the Broadcast."""
+    user_ids = list(dict.fromkeys(user_ids))
+    broadcast = Broadcast.objects.create(title=title, message=message, notification_type=notification_type)
+    for start in range(0, len(user_ids), BROADCAST_CHUNK_SIZE):
+        add_broadcast_recipients(broadcast, user_ids[start:start + BROADCAST_CHUNK_SIZE])
+    return broadcast
+
+
+# ---------- Read State ----------
+
+def mark_read(user, pk):
+    """Mark one personal notification read. Returns True if it was unread before."""
+    updated = Notification.objects.filter(pk=pk, user=user, read=False).update(read=True)
+    if updated:
+        decr_unread_count(user.pk, updated)
+    return bool(updated)
+
+
+def mark_broadcast_read(user, pk):
+    """Mark one broadcast receipt read. Returns True if it was unread before."""
+    updated = BroadcastReceipt.objects.filter(pk=pk, user=user, read=False).update(read=True)
+    if updated:
+        decr_unread_count(user.pk, updated)
+    return bool(updated)
+
+
+def mark_all_read(user):
+    """
+    Mark everything in the user's inbox read. The counter is dropped rather
+    than set to zero, so a notification created between the updates and the
+    cache write is still counted on the next read.
+    """
+    Notification.objects.filter(user=user, read=False).update(read=True)
+    BroadcastReceipt.objects.filter(user=user, read=False).update(read=True)
+    transaction.on_commit(lambda: invalidate_unread_counts([user.pk]))
+
+
+# ---------- Cursor Pagination ----------
+
+def _sort_key(item):
+    return item.created_at, _SOURCES['b' if item.is_broadcast else 'n'], item.pk
+
+
+def encode_cursor(item):
+    delta = item.created_at - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return f"{micros}-{'b' if item.is_broadcast else 'n'}-{item.pk}"
+
+
+def decode_cursor(cursor):
+    """Parse a cursor back into (created_at, source, pk). Returns None for malformed input."""
+    try:
+        micros, source, pk = cursor.split('-', 2)
+        if source not in _SOURCES:
+            return None
+        return _EPOCH + timedelta(microseconds=int(micros)), source, int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def _after_cursor(source, position):
+    """Keyset filter selecting rows of `source` that sort after the cursor position."""
+    created_at, cursor_source, pk = position
+    if _SOURCES[source] < _SOURCES[cursor_source]:
+        return Q(created_at__lte=created_at)
+    if _SOURCES[source] > _SOURCES[cursor_source]:
+        return Q(created_at__lt=created_at)
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+
+
+def get_inbox_page(user, cursor=None, unread_only=False, page_size=INBOX_PAGE_SIZE):
+    """
+    Return (items, next_cursor) for one page of the user's inbox, newest
+    first, merging personal notifications and broadcast receipts. Each
+    source seeks past the cursor on its (user, created_at, id) index instead
+    of using OFFSET, so deep pages cost the same as the first one.
+    """
+    personal = Notification.objects.filter(user=user)
+    broadcasts = BroadcastReceipt.objects.filter(user=user).select_related('broadcast')
+    if unread_only:
+        personal = personal.filter(read=False)
+        broadcasts = broadcasts.filter(read=False)
+
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        personal = personal.filter(_after_cursor('n', position))
+        broadcasts = broadcasts.filter(_after_cursor('b', position))
+
+    rows = list(personal.order_by('-created_at', '-pk')[:page_size + 1])
+    rows += list(broadcasts.order_by('-created_at', '-pk')[:page_size + 1])
+    rows.sort(key=_sort_key, reverse=True)
+
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def latest_notification_at(user):
+    """When the user's newest notification or broadcast arrived (None if none), from the inbox indexes."""
+    latest = [
+        Notification.objects.filter(user=user).order_by('-created_at').values_list('created_at', flat=True).first(),
+        BroadcastReceipt.objects.filter(user=user).order_by('-created_at').values_list('created_at', flat=True).first(),
+    ]
+    return max(filter(None, latest), default=None)
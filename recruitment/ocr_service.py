@@ -194,15 +194,14 @@ def generate_application_summary(application):
     lines.append("")
 
     # --- Documents + OCR Highlights ---
-    documents = application.documents.all()
-    if documents.exists():
+    documents = list(application.documents.select_related('text_blob'))
+    if documents:
         lines.append("UPLOADED DOCUMENTS & OCR ANALYSIS")
         for doc in documents:
             lines.append(f"  [{doc.get_doc_type_display()}] {doc.filename}")
-            if doc.ocr_text:
-                word_count = _count_words(doc.ocr_text)
+            if doc.ocr_char_count:
                 keywords = _extract_keywords(doc.ocr_text)
-                lines.append(f"    → {word_count} words extracted via OCR")
+                lines.append(f"    → {doc.ocr_word_count} words extracted via OCR")
                 if keywords:
                     lines.append(f"    → Key terms found: {', '.join(keywords[:10])}")
                 # Show first meaningful snippet
@@ -264,25 +263,47 @@ def run_ocr_on_document(document):
         return ""
 
     text, method = extract_text_from_document(file_path)
-    document.ocr_text = text
-    document.save(update_fields=['ocr_text'])
+    document.set_ocr_text(text)
     logger.info(f"OCR complete for doc #{document.pk} via {method}: {_count_words(text)} words")
+
+    from recruitment import events
+    events.publish(events.HR_CHANNEL, 'job', {
+        'kind': 'ocr', 'id': document.pk, 'status': 'done',
+        'message': f'OCR complete for {document.filename}: {document.ocr_word_count} words.',
+    })
     return text
 
 
+def ocr_uploaded_document(document_pk):
+    """
+    Background job for a newly uploaded document: OCR it, then refresh the
+    application summary to include the new text.
+    """
+    from recruitment.models import Document
+    try:
+        document = Document.objects.select_related('application').get(pk=document_pk)
+    except Document.DoesNotExist:
+        return
+    try:
+        run_ocr_on_document(document)
+        application = document.application
+        application.set_summary(generate_application_summary(application))
+    except Exception as e:
+        logger.error(f"OCR failed for uploaded document #{document_pk}: {e}")
+
+
 def run_ocr_on_application(application):
     """
     Run OCR on ALL documents for an application, then regenerate the full summary.
     Returns the updated summary string.
     """
     for doc in application.documents.all():
-        if not doc.ocr_text:  # skip already-processed docs
+        if not doc.ocr_char_count:  # skip already-processed docs
             run_ocr_on_document(doc)
 
     # Re-generate full summary (includes document OCR content)
     summary = generate_application_summary(application)
-    application.ai_summary = summary
-    application.save(update_fields=['ai_summary'])
+    application.set_summary(summary)
     return summary
 
 
@@ -295,6 +316,5 @@ def run_ocr_on_application_force(application):
         run_ocr_on_document(doc)
 
     summary = generate_application_summary(application)
-    application.ai_summary = summary
-    application.save(update_fields=['ai_summary'])
+    application.set_summary(summary)
     return summary
@@ -0,0 +1,163 @@
+"""
+Document Previews
+Renders the first page of an uploaded document (PDF, image or DOCX) to a
+small JPEG once and stores it in Document.preview, so reviewers can see what
+a document is from a few kilobytes instead of opening a multi-megabyte scan.
+
+Previews are made in the background after upload (see signals.py), and
+queued on first request for documents uploaded before previews existed;
+requests never render. A render that fails (corrupt or unsupported file, no
+poppler on the host) is recorded on Document.preview_failed_at and not tried
+again for PREVIEW_RETRY_AFTER. Previews are served by views.document_preview
+with the same access check as the original.
+"""
+import io
+import logging
+import os
+import textwrap
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_WIDTH = 320
+PREVIEW_MAX_HEIGHT = 480
+PREVIEW_QUALITY = 70
+PREVIEW_RETRY_AFTER = timedelta(days=7)
+PREVIEW_QUEUED_TIMEOUT = 10 * 60  # seconds; one queued render per document meanwhile
+
+
+def _render_pdf(path):
+    from pdf2image import convert_from_path
+    pages = convert_from_path(path, first_page=1, last_page=1, size=(PREVIEW_WIDTH, None))
+    return pages[0] if pages else None
+
+
+def _render_image(path):
+    from PIL import Image, ImageOps
+    image = Image.open(path)
+    # Let JPEG decoding downscale while reading instead of loading the full scan
+    image.draft('RGB', (PREVIEW_WIDTH, PREVIEW_MAX_HEIGHT))
+    return ImageOps.exif_transpose(image)
+
+
+def _render_docx(path):
+    """DOCX has no page layout to rasterise here; draw its opening text on an A4-shaped card."""
+    from docx import Document as DocxDocument
+    from PIL import Image, ImageDraw, ImageFont
+
+    height = round(PREVIEW_WIDTH * 1.414)
+    font_size, margin = 11, 16
+    lines = []
+    for paragraph in DocxDocument(path).paragraphs:
+        lines.extend(textwrap.wrap(paragraph.text, width=48) or [''])
+        if len(lines) * (font_size + 3) > height - 2 * margin:
+            break
+
+    image = Image.new('RGB', (PREVIEW_WIDTH, height), 'white')
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=font_size)
+    y = margin
+    for line in lines:
+        if y + font_size > height - margin:
+            break
+        draw.text((margin, y), line, fill='#333333', font=font)
+        y += font_size + 3
+    return image
+
+
+RENDERERS = {
+    '.pdf': _render_pdf,
+    '.jpg': _render_image,
+    '.jpeg': _render_image,
+    '.png': _render_image,
+    '.tif': _render_image,
+    '.tiff': _render_image,
+    '.bmp': _render_image,
+    '.gif': _render_image,
+    '.webp': _render_image,
+    '.docx': _render_docx,
+}
+
+
+def render_preview(file_path):
+    """JPEG bytes of the first page of a document, or None if it cannot be rendered."""
+    renderer = RENDERERS.get(Path(str(file_path)).suffix.lower())
+    if renderer is None:
+        return None
+    try:
+        image = renderer(str(file_path))
+        if image is None:
+            return None
+        image.thumbnail((PREVIEW_WIDTH, PREVIEW_MAX_HEIGHT))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=PREVIEW_QUALITY, optimize=True, progressive=True)
+        return buffer.getvalue()
+    except Exception as e:
+        logger.warning(f"Preview rendering failed for {file_path}: {e}")
+        return None
+
+
+def shared_preview(document):
+    """True if the document has a preview, adopting one from a document with the same file if needed."""
+    if document.preview:
+        return True
+    # Identical uploads share a file, so they can share its preview too
+    from recruitment.models import Document
+    shared = (
+        Document.objects.filter(file=document.file.name).exclude(preview='')
+        .values_list('preview', flat=True).first()
+    )
+    if shared:
+        document.preview.name = shared
+        document.save(update_fields=['preview'])
+        return True
+    return False
+
+
+def ensure_preview(document):
+    """Render and store the document's preview if it has none. Returns True if a preview exists."""
+    if shared_preview(document):
+        return True
+    try:
+        file_path = document.file.path
+    except Exception:
+        file_path = None
+    content = render_preview(file_path) if file_path and os.path.exists(file_path) else None
+    if content is None:
+        document.preview_failed_at = timezone.now()
+        document.save(update_fields=['preview_failed_at'])
+        return False
+    document.preview.save(f'{Path(file_path).stem}.jpg', ContentFile(content), save=False)
+    document.preview_failed_at = None
+    document.save(update_fields=['preview', 'preview_failed_at'])
+    return True
+
+
+def queue_preview(document):
+    """
+    Render the preview in the background unless a render failed within
+    PREVIEW_RETRY_AFTER or one is already queued. Returns True if queued.
+    """
+    if document.preview_failed_at and timezone.now() - document.preview_failed_at < PREVIEW_RETRY_AFTER:
+        return False
+    if not cache.add(f'preview-queued:{document.pk}', 1, PREVIEW_QUEUED_TIMEOUT):
+        return False
+    from recruitment import jobs
+    jobs.enqueue(preview_uploaded_document, document.pk)
+    return True
+
+
+def preview_uploaded_document(document_pk):
+    """Background job: make the preview for a newly uploaded document."""
+    from recruitment.models import Document
+    document = Document.objects.filter(pk=document_pk).first()
+    if document is not None:
+        ensure_preview(document)
+    cache.delete(f'preview-queued:{document_pk}')
@@ -0,0 +1,259 @@
+"""
+Request Profiling
+ProfilingMiddleware times every request and, for a sampled share of them,
+breaks the time down into SQL (query count and time), template rendering and
+the view. The breakdown is sent to the browser as a Server-Timing header, so
+it shows in the developer tools network panel next to the request. Only HR,
+staff and DEBUG runs see the breakdown; everyone else just gets `total`.
+
+Requests slower than RECRUITMENT_PROFILING_SLOW_MS are kept in a small ring
+buffer, shown to HR on the diagnostics page with their slowest queries.
+Unsampled requests only pay for two clock reads; sampled ones add a query
+wrapper and a template timer that do nothing outside a profiled request.
+The buffer and counters are per worker process.
+"""
+import heapq
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.deprecation import MiddlewareMixin
+
+SLOWEST_QUERIES = 5
+
+_current = ContextVar('request_profile', default=None)
+_samples = None
+_samples_lock = threading.Lock()
+_counters = {'requests': 0, 'profiled': 0, 'slow': 0, 'since': timezone.now()}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enabled():
+    return _setting('RECRUITMENT_PROFILING', True)
+
+
+def sample_rate():
+    """Share of requests given the full breakdown; every request when DEBUG is on."""
+    return 1.0 if settings.DEBUG else _setting('RECRUITMENT_PROFILING_SAMPLE_RATE', 0.05)
+
+
+def slow_ms():
+    return _setting('RECRUITMENT_PROFILING_SLOW_MS', 1000)
+
+
+class RequestProfile:
+    """SQL and template time collected for one sampled request."""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.view_started = None
+        self.view_time = None
+        self.slowest = []
+
+    def add_query(self, sql, elapsed, alias):
+        self.sql_count += 1
+        self.sql_time += elapsed
+        entry = (elapsed, self.sql_count, alias, sql)
+        if len(self.slowest) < SLOWEST_QUERIES:
+            heapq.heappush(self.slowest, entry)
+        elif elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def slowest_queries(self):
+        return [
+            {'ms': round(elapsed * 1000, 2), 'alias': alias, 'sql': sql[:500]}
+            for elapsed, _, alias, sql in sorted(self.slowest, reverse=True)
+        ]
+
+
+def current_profile():
+    """The profile of the request being handled, or None if it is not sampled."""
+    return _current.get()
+
+
+# ---------- Instrumentation ----------
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper, installed on every connection; times queries of profiled requests."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(sql, time.perf_counter() - started, context['connection'].alias)
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """connection_created receiver."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument_templates():
+    """Time top-level template renders (render(), render_to_string()) of profiled requests."""
+    from django.template.backends.django import Template
+
+    original = Template.render
+    if getattr(original, 'profiled', False):
+        return
+
+    def render(self, context=None, request=None):
+        profile = _current.get()
+        if profile is None:
+            return original(self, context, request)
+        # Templates rendered while rendering another are already being timed
+        profile.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_time += time.perf_counter() - started
+
+    render.profiled = True
+    Template.render = render
+
+
+def install():
+    """Called from RecruitmentConfig.ready()."""
+    if not enabled():
+        return
+    from django.db.backends.signals import connection_created
+    connection_created.connect(install_query_wrapper, dispatch_uid='recruitment.profiling')
+    instrument_templates()
+
+
+# ---------- Slow Request Buffer ----------
+
+def _buffer():
+    global _samples
+    if _samples is None:
+        _samples = deque(maxlen=_setting('RECRUITMENT_PROFILING_BUFFER_SIZE', 200))
+    return _samples
+
+
+def slow_requests():
+    """Buffered slow requests, newest first."""
+    with _samples_lock:
+        return list(reversed(_buffer()))
+
+
+def counters():
+    with _samples_lock:
+        return dict(_counters)
+
+
+def clear():
+    with _samples_lock:
+        _buffer().clear()
+        _counters.update(requests=0, profiled=0, slow=0, since=timezone.now())
+
+
+def _remember(request, response, total, profile):
+    user = getattr(request, 'user', None)
+    entry = {
+        'at': timezone.now(),
+        'method': request.method,
+        'path': request.get_full_path()[:300],
+        'view': getattr(getattr(request, 'resolver_match', None), 'view_name', '') or '',
+        'status': response.status_code,
+        'user': user.get_username() if user is not None and user.is_authenticated else '',
+        'total_ms': round(total * 1000, 1),
+        'profiled': profile is not None,
+    }
+    if profile is not None:
+        entry.update(
+            view_ms=round(profile.view_time * 1000, 1) if profile.view_time is not None else None,
+            sql_ms=round(profile.sql_time * 1000, 1),
+            sql_count=profile.sql_count,
+            template_ms=round(profile.template_time * 1000, 1),
+            queries=profile.slowest_queries(),
+        )
+    with _samples_lock:
+        _buffer().append(entry)
+        _counters['slow'] += 1
+
+
+# ---------- Middleware ----------
+
+def sees_breakdown(request):
+    """SQL, template and view timings are for HR and staff (or DEBUG), not the public."""
+    if settings.DEBUG:
+        return True
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return False
+    if user.is_staff or user.is_superuser:
+        return True
+    from accounts.models import ROLE_HR_ADMIN
+    from accounts.roles import get_role
+    return get_role(request) == ROLE_HR_ADMIN
+
+
+def server_timing(total, profile):
+    """The Server-Timing header value (durations in milliseconds)."""
+    metrics = []
+    if profile is not None:
+        metrics.append(f'sql;dur={profile.sql_time * 1000:.1f};desc="{profile.sql_count} queries"')
+        metrics.append(f'template;dur={profile.template_time * 1000:.1f}')
+        if profile.view_time is not None:
+            metrics.append(f'view;dur={profile.view_time * 1000:.1f}')
+    metrics.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(metrics)
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """
+    Place first in MIDDLEWARE so `total` covers the whole stack. Settings:
+    RECRUITMENT_PROFILING (on/off), RECRUITMENT_PROFILING_SAMPLE_RATE (share
+    of requests broken down, 0-1; every request when DEBUG is on),
+    RECRUITMENT_PROFILING_SLOW_MS, RECRUITMENT_PROFILING_BUFFER_SIZE and
+    RECRUITMENT_SERVER_TIMING (send the header; the breakdown only to HR,
+    staff or under DEBUG).
+    """
+
+    def process_request(self, request):
+        if not enabled():
+            return
+        request.profile_started = time.perf_counter()
+        profile = RequestProfile() if random.random() < sample_rate() else None
+        request.request_profile = profile
+        _current.set(profile)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, 'request_profile', None)
+        if profile is not None:
+            profile.view_started = time.perf_counter()
+
+    def process_response(self, request, response):
+        started = getattr(request, 'profile_started', None)
+        if started is None:
+            return response
+        now = time.perf_counter()
+        total = now - started
+        profile = request.request_profile
+        _current.set(None)
+        if profile is not None and profile.view_started is not None:
+            profile.view_time = now - profile.view_started
+
+        if _setting('RECRUITMENT_SERVER_TIMING', True):
+            response['Server-Timing'] = server_timing(total, profile if sees_breakdown(request) else None)
+        with _samples_lock:
+            _counters['requests'] += 1
+            _counters['profiled'] += profile is not None
+        if total * 1000 >= slow_ms():
+            _remember(request, response, total, profile)
+        return response
@@ -0,0 +1,224 @@
+"""
+Repeated Query Detection
+Catches N+1 queries and duplicate lookups while developing and testing.
+Every query a request runs is reduced to a fingerprint (its SQL with literals
+and IN lists collapsed) and attributed to the line that caused it: the
+nearest frame in this project's code and the template tag being rendered. At the
+end of the request, fingerprints run at least RECRUITMENT_QUERY_REPEAT_THRESHOLD
+times (the same query shape, e.g. `app.vacancy` inside a loop) and identical
+queries run at least RECRUITMENT_QUERY_DUPLICATE_THRESHOLD times (the same
+shape and parameters, e.g. repeated `user.profile` lookups) are reported.
+
+RECRUITMENT_QUERY_INSPECTOR selects what happens then: 'log' writes a warning,
+'raise' raises RepeatedQueries (set by pngcs.test_runner for `manage.py
+test`), None leaves the middleware out of the stack entirely. Views that
+repeat queries by design are marked with @allow_repeated_queries; other code
+can be checked with `with inspect_queries(): ...`. A request made inside such
+a block (e.g. through the test client) is checked by the block, not the
+middleware.
+"""
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('query_inspection', default=None)
+
+_IN_LIST_RE = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)', re.IGNORECASE)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACE_RE = re.compile(r'\s+')
+
+_PROJECT_DIR = str(settings.BASE_DIR) + os.sep
+_SKIP_DIRS = ('site-packages', 'dist-packages', os.sep + 'lib' + os.sep + 'python')
+# Other execute wrappers sit between the query and the code that caused it
+_SKIP_FILES = {__file__, os.path.join(os.path.dirname(__file__), 'profiling.py')}
+
+
+class RepeatedQueries(AssertionError):
+    """Raised in 'raise' mode when a request repeats queries past the thresholds."""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def mode():
+    return _setting('RECRUITMENT_QUERY_INSPECTOR', None)
+
+
+def fingerprint(sql):
+    """The query's shape: literals become ?, IN lists become IN (...)."""
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def _origin():
+    """Where the current query comes from: 'app/models.py:85 in method from template.html:12'."""
+    template = code = None
+    frame = sys._getframe(2)
+    while frame is not None and (code is None or template is None):
+        filename = frame.f_code.co_filename
+        if template is None and frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                template = f'{origin.template_name or origin.name}:{token.lineno}'
+        if (code is None and filename.startswith(_PROJECT_DIR) and filename not in _SKIP_FILES
+                and not any(part in filename for part in _SKIP_DIRS)):
+            code = f'{os.path.relpath(filename, _PROJECT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    if template and code:
+        return f'{code} from {template}'
+    return code or template or 'unknown'
+
+
+class QueryInspection:
+    """Queries seen during one request (or one inspect_queries() block), grouped by fingerprint."""
+
+    def __init__(self, repeat_threshold=None, duplicate_threshold=None):
+        self.repeat_threshold = repeat_threshold or _setting('RECRUITMENT_QUERY_REPEAT_THRESHOLD', 5)
+        self.duplicate_threshold = duplicate_threshold or _setting('RECRUITMENT_QUERY_DUPLICATE_THRESHOLD', 3)
+        self.total = 0
+        self.shapes = {}
+
+    def add(self, sql, params):
+        self.total += 1
+        key = fingerprint(sql)
+        shape = self.shapes.get(key)
+        if shape is None:
+            shape = self.shapes[key] = {'count': 0, 'params': Counter(), 'origins': Counter()}
+        shape['count'] += 1
+        try:
+            shape['params'][repr(params)] += 1
+        except Exception:
+            pass
+        shape['origins'][_origin()] += 1
+
+    def findings(self):
+        """Shapes past a threshold, worst first, as dicts for logging or display."""
+        found = []
+        for key, shape in self.shapes.items():
+            duplicates = max(shape['params'].values(), default=0)
+            if shape['count'] < self.repeat_threshold and duplicates < self.duplicate_threshold:
+                continue
+            origin, _ = shape['origins'].most_common(1)[0]
+            found.append({
+                'kind': 'repeated' if shape['count'] >= self.repeat_threshold else 'duplicate',
+                'count': shape['count'],
+                'identical': duplicates,
+                'origin': origin,
+                'fingerprint': key,
+            })
+        return sorted(found, key=lambda f: -f['count'])
+
+    def report(self, label):
+        lines = [f'{label}: {self.total} queries, repeated query shapes:']
+        for f in self.findings():
+            lines.append(
+                f"  {f['count']}x ({f['identical']} identical) from {f['origin']}\n      {f['fingerprint'][:300]}"
+            )
+        return '\n'.join(lines)
+
+    def check(self, label='Queries', action='raise'):
+        """Log or raise if anything was found."""
+        if not self.findings():
+            return
+        message = self.report(label)
+        if action == 'raise':
+            raise RepeatedQueries(message)
+        logger.warning(message)
+
+
+# ---------- Wiring ----------
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper, installed on every connection; records queries of inspected blocks."""
+    inspection = _current.get()
+    if inspection is not None:
+        inspection.add(sql, params)
+    return execute(sql, params, many, context)
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """connection_created receiver."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install():
+    """Called from RecruitmentConfig.ready()."""
+    from django.db.backends.signals import connection_created
+    connection_created.connect(install_query_wrapper, dispatch_uid='recruitment.query_inspector')
+
+
+def allow_repeated_queries(view):
+    """Exempt a view that repeats queries on purpose, e.g. scoring every application in turn."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return view(request, *args, **kwargs)
+    wrapper.allow_repeated_queries = True
+    return wrapper
+
+
+def is_exempt(view_func):
+    """Whether @allow_repeated_queries is on the view, wherever it sits in its decorator stack."""
+    while view_func is not None:
+        if getattr(view_func, 'allow_repeated_queries', False):
+            return True
+        view_func = getattr(view_func, '__wrapped__', None)
+    return False
+
+
+@contextmanager
+def inspect_queries(action='raise', repeat_threshold=None, duplicate_threshold=None, label='Queries'):
+    """Check the queries run inside the block, e.g. in a test or a management command."""
+    inspection = QueryInspection(repeat_threshold, duplicate_threshold)
+    token = _current.set(inspection)
+    try:
+        yield inspection
+    finally:
+        _current.reset(token)
+    inspection.check(label, action)
+
+
+class QueryInspectorMiddleware(MiddlewareMixin):
+    """Inspects each request's queries; removed from the stack unless RECRUITMENT_QUERY_INSPECTOR is set."""
+
+    def __init__(self, get_response):
+        if not mode():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        # Inside inspect_queries() the enclosing block does the checking
+        request.outer_inspection = _current.get()
+        request.query_inspection = None
+        if request.outer_inspection is None:
+            request.query_inspection = QueryInspection()
+            _current.set(request.query_inspection)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_exempt(view_func):
+            request.query_inspection = None
+            _current.set(None)
+
+    def process_response(self, request, response):
+        _current.set(getattr(request, 'outer_inspection', None))
+        inspection = getattr(request, 'query_inspection', None)
+        if inspection is not None:
+            inspection.check(f'{request.method} {request.path}', mode())
+        return response
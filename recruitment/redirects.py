@@ -0,0 +1,18 @@
+"""
+Safe Redirects
+`next` values arrive in query strings and form posts, so they are only
+followed when they point back at this site: same host, and https when the
+request itself was https. Anything else (other hosts, `//host`, `/\\host`,
+javascript: URLs) falls back to a named default page.
+"""
+from django.shortcuts import resolve_url
+from django.utils.http import url_has_allowed_host_and_scheme
+
+
+def safe_next_url(request, next_url, default):
+    """`next_url` when it stays on this site, otherwise the URL for `default`."""
+    if next_url and url_has_allowed_host_and_scheme(
+        next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure(),
+    ):
+        return next_url
+    return resolve_url(default)
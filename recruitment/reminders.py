@@ -0,0 +1,98 @@
+"""
+Interview Reminders
+Finds scheduled interviews inside an upcoming window and reminds the
+applicant and every assigned panel member. Each batch costs a fixed number
+of queries regardless of its size, and interviews are claimed with one
+conditional UPDATE on reminder_sent, so overlapping runs (cron plus a
+long-lived loop, or two hosts) can never send the same reminder twice.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Interview, Notification
+from .notifications import create_notifications
+
+logger = logging.getLogger(__name__)
+
+REMINDER_WINDOW = timedelta(hours=24)
+REMINDER_BATCH_SIZE = 200
+
+
+def due_interviews(window=REMINDER_WINDOW, now=None):
+    """Scheduled interviews starting within `window` that haven't been reminded (uses interview_reminder_idx)."""
+    now = now or timezone.now()
+    return Interview.objects.filter(
+        status='scheduled',
+        scheduled_date__gte=now,
+        scheduled_date__lte=now + window,
+        reminder_sent=False,
+    )
+
+
+def _when(interview):
+    return timezone.localtime(interview.scheduled_date).strftime("%A, %d %B %Y at %I:%M %p")
+
+
+def build_reminders(interview):
+    """Return unsaved Notification objects for the applicant and each panel member."""
+    application = interview.application
+    vacancy = application.vacancy
+    reminders = [Notification(
+        user_id=application.applicant_id,
+        title='Interview Reminder',
+        message=f'This is a reminder that your interview for {vacancy.title} is on {_when(interview)} '
+                f'at {interview.venue}. Please arrive 15 minutes early and bring your original documents.',
+        notification_type='interview',
+    )]
+    for member in interview.panel_members.all():
+        reminders.append(Notification(
+            user_id=member.pk,
+            title='Panel Interview Reminder',
+            message=f'You are on the interview panel for {application.full_name()} ({vacancy.title}) '
+                    f'on {_when(interview)} at {interview.venue}.',
+            notification_type='interview',
+        ))
+    return reminders
+
+
+def send_reminder_batch(window=REMINDER_WINDOW, batch_size=REMINDER_BATCH_SIZE):
+    """
+    Claim and remind one batch of due interviews. Everything happens in one
+    transaction, so a failure leaves the batch unclaimed for the next run.
+    Returns the number of interviews reminded.
+    """
+    due_ids = list(due_interviews(window).order_by('scheduled_date').values_list('pk', flat=True)[:batch_size])
+    if not due_ids:
+        return 0
+
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        claimed = Interview.objects.filter(pk__in=due_ids, reminder_sent=False).update(
+            reminder_sent=True, reminder_token=token,
+        )
+        if not claimed:
+            return 0
+        interviews = (
+            Interview.objects.filter(reminder_token=token)
+            .select_related('application__vacancy')
+            .prefetch_related('panel_members')
+        )
+        reminders = [n for interview in interviews for n in build_reminders(interview)]
+        create_notifications(reminders)
+
+    logger.info(f"Interview reminders sent for {claimed} interview(s), {len(reminders)} notification(s)")
+    return claimed
+
+
+def send_due_reminders(window=REMINDER_WINDOW, batch_size=REMINDER_BATCH_SIZE):
+    """Drain all due interviews batch by batch. Returns the total reminded."""
+    total = 0
+    while True:
+        sent = send_reminder_batch(window, batch_size)
+        if not sent:
+            return total
+        total += sent
@@ -0,0 +1,167 @@
+"""
+Reporting Snapshot
+Heavy read-only HR pages (dashboard, reports, exports) read from a copy of the
+database instead of the live file applicants write to. The copy is taken with
+SQLite's online backup API and swapped into place atomically.
+
+Views opt in with @reporting_view. While such a view runs, ReportingRouter
+sends reads to the 'reporting' database, as long as the snapshot is younger
+than RECRUITMENT_REPORTING_MAX_AGE seconds. A stale or missing snapshot means
+reads go to the live database and a refresh is queued. Writes always go to
+'default'. Refresh on a schedule with `manage.py refresh_reporting_snapshot`.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from . import jobs
+
+logger = logging.getLogger(__name__)
+
+REPORTING_DB = 'reporting'
+
+_read_alias = ContextVar('reporting_read_alias', default=None)
+_refresh_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def reporting_enabled():
+    return REPORTING_DB in settings.DATABASES
+
+
+def snapshot_path():
+    return str(settings.DATABASES[REPORTING_DB]['NAME'])
+
+
+def snapshot_taken_at():
+    """When the current snapshot finished, or None if there is none."""
+    try:
+        mtime = os.path.getmtime(snapshot_path())
+    except OSError:
+        return None
+    return datetime.fromtimestamp(mtime, tz=dt_timezone.utc)
+
+
+def snapshot_age():
+    taken_at = snapshot_taken_at()
+    return (timezone.now() - taken_at).total_seconds() if taken_at else None
+
+
+def snapshot_is_fresh():
+    age = snapshot_age()
+    return age is not None and age <= _setting('RECRUITMENT_REPORTING_MAX_AGE', 900)
+
+
+# ---------- Refresh ----------
+
+def refresh_snapshot():
+    """
+    Copy the live database into the reporting snapshot with the online backup
+    API. Under WAL the copy runs in a single read transaction, so writers carry
+    on undisturbed and the copy never restarts. Returns the snapshot path, or
+    None if another refresh in this process is already running.
+    """
+    live = connections['default']
+    if live.vendor != 'sqlite' or live.is_in_memory_db():
+        return None
+    if not _refresh_lock.acquire(blocking=False):
+        return None
+    try:
+        target = snapshot_path()
+        partial = f'{target}.partial'
+        source = sqlite3.connect(str(live.settings_dict['NAME']))
+        destination = sqlite3.connect(partial)
+        try:
+            source.execute('PRAGMA busy_timeout=20000')
+            source.backup(destination)
+            destination.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            destination.close()
+            source.close()
+        # Readers holding the old file keep it until their connection closes
+        os.replace(partial, target)
+        logger.info(f"Reporting snapshot refreshed ({os.path.getsize(target) // 1024} KiB)")
+        return target
+    finally:
+        _refresh_lock.release()
+
+
+def queue_refresh():
+    jobs.enqueue(refresh_snapshot)
+
+
+# ---------- Routing ----------
+
+class ReportingRouter:
+    """Routes reads inside @reporting_view to the snapshot; everything else is untouched."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The snapshot is a byte copy of 'default'; it is never migrated itself
+        return db != REPORTING_DB
+
+
+def keep_source(iterable):
+    """
+    Wrap a lazily consumed iterable, such as the body of a
+    StreamingHttpResponse, so it reads from the same database as the
+    @reporting_view that created it, even after the view has returned.
+    """
+    alias = _read_alias.get()
+
+    def generator():
+        token = _read_alias.set(alias)
+        try:
+            yield from iterable
+        finally:
+            _read_alias.reset(token)
+            if alias:
+                connections[alias].close()
+    return generator()
+
+
+def reporting_view(view):
+    """
+    Serve a read-only view from the reporting snapshot when it is fresh
+    enough. Sets request.report_source ({'snapshot': bool, 'as_of': datetime})
+    for the page to show how current its figures are.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = None
+        if reporting_enabled():
+            if snapshot_is_fresh():
+                alias = REPORTING_DB
+            else:
+                queue_refresh()
+        request.report_source = {
+            'snapshot': alias is not None,
+            'as_of': snapshot_taken_at() if alias else timezone.now(),
+        }
+        token = _read_alias.set(alias)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+            if alias:
+                connections[alias].close()
+    return wrapper
@@ -1,12 +1,13 @@
 """
 Django signals for the recruitment app.
-Automatically runs OCR when a new document is uploaded.
+Automatically runs OCR and renders a preview when a new document is
+uploaded, releases its stored files (and those of draft uploads) when it is
+deleted, keeps unread counters, email copies and live events in step with
+new notifications, and invalidates the public vacancy cache when vacancies
+change.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-import logging
-
-logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender='recruitment.Document')
@@ -15,15 +16,67 @@ def ocr_document_on_upload(sender, instance, created, **kwargs):
     After a Document is created, run OCR on it in the background
     and update the parent application summary.
     Only runs for newly created documents that don't yet have OCR text.
+    The job starts after commit, so no write lock is held while OCR runs.
     """
-    if created and not instance.ocr_text:
-        try:
-            from recruitment.ocr_service import run_ocr_on_document, generate_application_summary
-            run_ocr_on_document(instance)
-            # Refresh application summary to include new document
-            app = instance.application
-            summary = generate_application_summary(app)
-            app.ai_summary = summary
-            app.save(update_fields=['ai_summary'])
-        except Exception as e:
-            logger.error(f"OCR signal failed for document #{instance.pk}: {e}")
+    if created and not instance.ocr_char_count:
+        from recruitment import jobs
+        from recruitment.ocr_service import ocr_uploaded_document
+        jobs.enqueue(ocr_uploaded_document, instance.pk)
+
+
+@receiver(post_save, sender='recruitment.Document')
+def preview_document_on_upload(sender, instance, created, **kwargs):
+    """Render the first-page preview of a new document in the background."""
+    if created and not instance.preview:
+        from recruitment import jobs
+        from recruitment.previews import preview_uploaded_document
+        jobs.enqueue(preview_uploaded_document, instance.pk)
+
+
+@receiver(post_delete, sender='recruitment.Document')
+def release_document_files(sender, instance, **kwargs):
+    """Remove the document's stored file and preview unless another document shares them."""
+    for field_file in (instance.file, instance.preview):
+        if field_file:
+            field_file.storage.release(field_file.name)
+
+
+@receiver(post_delete, sender='recruitment.DraftUpload')
+def release_draft_upload_files(sender, instance, **kwargs):
+    """Remove a draft upload's partial file, and its stored file unless a document now uses it."""
+    from recruitment.drafts import remove_partial
+    remove_partial(instance)
+    if instance.file:
+        instance.file.storage.release(instance.file.name)
+
+
+@receiver(post_save, sender='recruitment.Notification')
+def count_unread_notification(sender, instance, created, **kwargs):
+    """Keep the cached unread counter in step with newly created notifications."""
+    if created and not instance.read:
+        from recruitment.notifications import incr_unread_count
+        incr_unread_count(instance.user_id)
+
+
+@receiver(post_save, sender='recruitment.Notification')
+def queue_notification_email(sender, instance, created, **kwargs):
+    """Queue an email copy of each new notification; the delivery worker sends it."""
+    if created:
+        from recruitment.email_delivery import queue_notification_email
+        queue_notification_email(instance)
+
+
+@receiver(post_save, sender='recruitment.Notification')
+def push_notification_event(sender, instance, created, **kwargs):
+    """Push new notifications to the recipient's open pages."""
+    if created:
+        from recruitment import events
+        events.publish(events.user_channel(instance.user_id), 'notification', events.notification_data(instance))
+
+
+@receiver(post_save, sender='recruitment.Vacancy')
+@receiver(post_delete, sender='recruitment.Vacancy')
+def invalidate_vacancy_cache(sender, **kwargs):
+    """Any vacancy change starts a new public cache generation."""
+    from recruitment.vacancy_cache import bump_vacancy_version
+    bump_vacancy_version()
@@ -0,0 +1,80 @@
+"""
+Content-Addressed Document Storage
+Uploaded documents and their previews are stored under the SHA-256 of their
+content instead of the uploaded name:
+
+    documents/3f/a2/3fa2...c1.pdf
+
+The two shard levels keep every directory small however large the archive
+grows, and uploading the same certificate again (the same applicant
+reapplying, or a shared form) reuses the file already on disk. The original
+filename stays on Document.filename.
+
+Because one file can back several Document rows (and finished draft
+uploads), files are only removed once no row refers to them any more (see
+signals.release_document_files). Older documents stored under
+documents/%Y/%m/ keep working and can be moved across with
+`manage.py migrate_document_storage`.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 1024 * 1024
+SAFE_EXTENSION_RE = re.compile(r'^\.[a-z0-9]{1,10}$')
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files by content hash under the directory
+    the field's upload_to gives. Saving content that is already stored
+    returns the existing name without writing anything.
+    """
+
+    def hashed_name(self, name, content):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        if not SAFE_EXTENSION_RE.match(extension):
+            extension = ''
+        digest = content_hash(content)
+        return os.path.join(directory, digest[:2], digest[2:4], digest + extension).replace(os.sep, '/')
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        # If a concurrent upload of the same content gets there first, the
+        # parent falls back to a suffixed name: a spare copy, never a clash
+        return super()._save(name, content)
+
+    def is_referenced(self, name):
+        from recruitment.models import Document, DraftUpload
+        return (
+            Document.objects.filter(file=name).exists()
+            or Document.objects.filter(preview=name).exists()
+            or DraftUpload.objects.filter(file=name).exists()
+        )
+
+    def release(self, name):
+        """Delete a stored file once the current transaction commits, unless a document or draft upload still uses it."""
+        def delete_if_unreferenced():
+            if name and not self.is_referenced(name):
+                self.delete(name)
+        transaction.on_commit(delete_if_unreferenced)
+
+
+document_storage = ContentAddressedStorage()
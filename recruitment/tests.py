@@ -1,3 +1,674 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db.models.query import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import ROLE_APPLICANT, ROLE_HR_ADMIN, UserProfile
+from . import bandwidth, drafts, loadtest, notifications, previews, query_inspector
+from .models import (
+    Application, ApplicationDraft, Broadcast, BroadcastReceipt, Document, DraftUpload, Notification, Vacancy,
+)
+
+
+def make_user(username, role=ROLE_APPLICANT):
+    user = User.objects.create_user(username, f'{username}@example.com', 'pw-123456', first_name=username.title())
+    UserProfile.objects.create(user=user, role=role, province='Morobe')
+    return user
+
+
+def make_vacancy(reference='PNGCS-001', **fields):
+    today = date.today()
+    values = dict(
+        title='Correctional Officer', reference_number=reference, department='Operations', category='security',
+        province='Morobe', qualification_level='grade_12', description='Duties', requirements='Grade 12',
+        open_date=today - timedelta(days=1), close_date=today + timedelta(days=14), status='open',
+    )
+    values.update(fields)
+    return Vacancy.objects.create(**values)
+
+
+def make_application(vacancy, applicant, **fields):
+    values = dict(
+        vacancy=vacancy, applicant=applicant, first_name='Kila', last_name='Ano', date_of_birth=date(1995, 1, 1),
+        gender='Male', province='Morobe', address='Lae', phone='70000000', email=applicant.email,
+        highest_qualification='degree', institution='UPNG', year_completed=2016, grade_result='Credit',
+        years_experience=3, reference1_name='Ref', reference1_position='Supervisor', reference1_phone='70000001',
+    )
+    values.update(fields)
+    return Application.objects.create(**values)
+
+
+def make_document(application, content, filename='certificate.pdf', doc_type='certificate'):
+    return Document.objects.create(
+        application=application, doc_type=doc_type, file=ContentFile(content, name=filename), filename=filename,
+    )
+
+
+def png_bytes(colour='navy'):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 60), colour).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class MediaTestCase(TestCase):
+    """Keeps uploads in a throwaway MEDIA_ROOT and starts each test with an empty cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp(prefix='pngcs-test-media-')
+        cls._media_settings = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            RECRUITMENT_PARTIAL_UPLOAD_DIR=f'{cls.media_root}/partial-uploads',
+        )
+        cls._media_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._media_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+
+# ---------- Notification Inbox ----------
+
+class UnreadCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('applicant')
+        Notification.objects.create(user=self.user, title='Shortlisted', message='You have been shortlisted.')
+        broadcast = Broadcast.objects.create(title='Closing soon', message='Apply before Friday.')
+        BroadcastReceipt.objects.create(broadcast=broadcast, user=self.user, created_at=broadcast.created_at)
+
+    def test_mark_all_read_clears_the_counter(self):
+        self.assertEqual(notifications.get_unread_count(self.user), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications.mark_all_read(self.user)
+
+        self.assertEqual(notifications.get_unread_count(self.user), 0)
+
+    def test_notification_created_during_mark_all_read_is_counted(self):
+        self.assertEqual(notifications.get_unread_count(self.user), 2)
+        update = QuerySet.update
+
+        def update_then_notify(queryset, **values):
+            updated = update(queryset, **values)
+            if queryset.model is BroadcastReceipt:
+                Notification.objects.create(user=self.user, title='Interview', message='Interview on Monday.')
+            return updated
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=update_then_notify):
+            with self.captureOnCommitCallbacks(execute=True):
+                notifications.mark_all_read(self.user)
+
+        self.assertEqual(notifications.get_unread_count(self.user), 1)
+
+
+# ---------- Document Previews ----------
+
+@override_settings(RECRUITMENT_JOBS_EAGER=True)
+class PreviewTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.application = make_application(make_vacancy(), make_user('applicant'))
+        self.client.force_login(make_user('hr', ROLE_HR_ADMIN))
+
+    def test_preview_is_queued_then_served(self):
+        document = make_document(self.application, png_bytes(), 'photo.png', 'photo')
+        url = reverse('recruitment:document_preview', args=[document.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+    def test_failed_render_is_recorded_and_not_retried(self):
+        document = make_document(self.application, b'%PDF-1.4 truncated', 'cv.pdf', 'cv')
+        url = reverse('recruitment:document_preview', args=[document.pk])
+
+        with mock.patch('recruitment.previews.render_preview', wraps=previews.render_preview) as render:
+            with self.assertLogs('recruitment.previews', 'WARNING'), self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.client.get(url).status_code, 404)
+            document.refresh_from_db()
+            self.assertIsNotNone(document.preview_failed_at)
+
+            with self.captureOnCommitCallbacks(execute=True) as queued:
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.assertEqual(queued, [])
+        self.assertEqual(render.call_count, 1)
+
+
+# ---------- Content-Addressed Storage ----------
+
+class SharedStorageTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        vacancy = make_vacancy()
+        self.first = make_application(vacancy, make_user('first'))
+        self.second = make_application(vacancy, make_user('second'))
+
+    def delete(self, document):
+        with self.captureOnCommitCallbacks(execute=True):
+            document.delete()
+
+    def test_identical_uploads_share_one_file(self):
+        a = make_document(self.first, b'grade 12 certificate', 'mine.pdf')
+        b = make_document(self.second, b'grade 12 certificate', 'theirs.pdf')
+
+        self.assertEqual(a.file.name, b.file.name)
+        self.assertRegex(a.file.name, r'^documents/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual((a.filename, b.filename), ('mine.pdf', 'theirs.pdf'))
+
+    def test_file_is_kept_until_the_last_document_goes(self):
+        a = make_document(self.first, b'grade 12 certificate')
+        b = make_document(self.second, b'grade 12 certificate')
+        storage, name = a.file.storage, a.file.name
+
+        self.delete(a)
+        self.assertTrue(storage.exists(name))
+
+        self.delete(b)
+        self.assertFalse(storage.exists(name))
+
+    def test_file_is_removed_only_on_commit(self):
+        document = make_document(self.first, b'police clearance')
+        storage, name = document.file.storage, document.file.name
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            document.delete()
+            self.assertTrue(storage.exists(name))
+        self.assertTrue(storage.exists(name))
+
+        for callback in callbacks:
+            callback()
+        self.assertFalse(storage.exists(name))
+
+    def test_shared_preview_stays_while_one_document_uses_it(self):
+        a = make_document(self.first, png_bytes(), 'photo.png', 'photo')
+        b = make_document(self.second, png_bytes(), 'photo.png', 'photo')
+        self.assertTrue(previews.ensure_preview(a))
+        self.assertTrue(previews.shared_preview(b))
+        storage, preview = a.preview.storage, a.preview.name
+        self.assertEqual(b.preview.name, preview)
+
+        self.delete(a)
+        self.assertTrue(storage.exists(preview))
+
+        self.delete(b)
+        self.assertFalse(storage.exists(preview))
+
+
+# ---------- Load Testing ----------
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(0.1)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+def _slow_page(user, context):
+    user.request('slow page', '/')
+
+
+class OpenModelLoadTestTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_overload_counts_queueing_and_unstarted_arrivals(self):
+        # One user taking 0.1s per flow cannot keep up with 30 arrivals a second
+        test = loadtest.LoadTest(
+            f'http://127.0.0.1:{self.server.server_port}', {}, mix={'browse': 1}, concurrency=1, rate=30,
+            duration=1.5, think_time=0, timeout=5, seed=1,
+        )
+        with mock.patch.dict(loadtest.FLOW_FUNCTIONS, {'browse': _slow_page}):
+            report = test.run()
+
+        served = report['endpoints']['slow page']
+        self.assertGreater(served['max_ms'], 500)
+        self.assertGreater(served['p95_ms'], served['p50_ms'])
+        not_started = report['endpoints'][loadtest.NOT_STARTED]
+        self.assertEqual(not_started['errors'], not_started['requests'])
+        self.assertGreater(not_started['requests'], 0)
+        self.assertGreater(report['error_rate'], 0)
+        flows = report['flows']['browse']
+        self.assertEqual(flows['completed'] + flows['failed'], served['requests'] + not_started['requests'])
+
+
+# ---------- Request Profiling ----------
+
+@override_settings(RECRUITMENT_PROFILING_SAMPLE_RATE=1)
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_vacancy()
+
+    def metrics(self, response):
+        return [part.split(';')[0].strip() for part in response['Server-Timing'].split(',')]
+
+    def test_public_and_applicants_only_see_the_total(self):
+        self.assertEqual(self.metrics(self.client.get(reverse('recruitment:job_list'))), ['total'])
+        self.client.force_login(make_user('applicant'))
+        self.assertEqual(self.metrics(self.client.get(reverse('recruitment:dashboard'))), ['total'])
+
+    def test_hr_and_staff_see_the_breakdown(self):
+        self.client.force_login(make_user('hr', ROLE_HR_ADMIN))
+        self.assertEqual(self.metrics(self.client.get(reverse('hr_admin:dashboard'))),
+                         ['sql', 'template', 'view', 'total'])
+
+        staff = make_user('staff')
+        User.objects.filter(pk=staff.pk).update(is_staff=True)
+        self.client.force_login(staff)
+        self.assertIn('sql', self.metrics(self.client.get(reverse('recruitment:job_list'))))
+
+
+# ---------- Repeated Query Detection ----------
+
+class QueryInspectorTests(TestCase):
+    def test_fingerprint_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            query_inspector.fingerprint(
+                "SELECT *  FROM t WHERE id = 42 AND name = 'O''Neil'\n AND score > 7.5 AND pk IN (%s, %s, %s)"
+            ),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND score > ? AND pk IN (...)',
+        )
+        self.assertEqual(
+            query_inspector.fingerprint('SELECT * FROM t WHERE pk IN (%s)'),
+            query_inspector.fingerprint('SELECT * FROM t WHERE pk IN (%s, %s, %s, %s)'),
+        )
+
+    def test_repeated_shape_raises(self):
+        vacancies = [make_vacancy(f'PNGCS-{n:03}') for n in range(5)]
+        with self.assertRaisesRegex(query_inspector.RepeatedQueries, r'5x \(1 identical\) from recruitment/tests\.py'):
+            with query_inspector.inspect_queries():
+                for vacancy in vacancies:
+                    Vacancy.objects.get(pk=vacancy.pk)
+
+    def test_duplicate_query_raises(self):
+        vacancy = make_vacancy()
+        with self.assertRaisesRegex(query_inspector.RepeatedQueries, r'3x \(3 identical\)'):
+            with query_inspector.inspect_queries():
+                for _ in range(3):
+                    Vacancy.objects.get(pk=vacancy.pk)
+
+    def test_below_thresholds_passes(self):
+        vacancies = [make_vacancy(f'PNGCS-{n:03}') for n in range(3)]
+        with query_inspector.inspect_queries() as inspection:
+            for vacancy in vacancies:
+                Vacancy.objects.get(pk=vacancy.pk)
+            Vacancy.objects.get(pk=vacancies[0].pk)
+            Vacancy.objects.count()
+        self.assertEqual(inspection.total, 5)
+        self.assertEqual(inspection.findings(), [])
+
+    def test_log_mode_warns_instead(self):
+        vacancy = make_vacancy()
+        with self.assertLogs('recruitment.query_inspector', 'WARNING'):
+            with query_inspector.inspect_queries(action='log'):
+                for _ in range(3):
+                    Vacancy.objects.get(pk=vacancy.pk)
+
+    def test_middleware_checks_each_request_unless_the_view_is_exempt(self):
+        vacancies = [make_vacancy(f'PNGCS-{n:03}') for n in range(5)]
+
+        def view(request):
+            for vacancy in vacancies:
+                Vacancy.objects.get(pk=vacancy.pk)
+            return HttpResponse()
+
+        exempt = login_required(query_inspector.allow_repeated_queries(view))
+        request = RequestFactory().get('/')
+        request.user = make_user('hr', ROLE_HR_ADMIN)
+        with override_settings(RECRUITMENT_QUERY_INSPECTOR='raise'):
+            for view_func, raises in ((view, True), (exempt, False)):
+                middleware = query_inspector.QueryInspectorMiddleware(view_func)
+                middleware.process_request(request)
+                middleware.process_view(request, view_func, (), {})
+                response = view_func(request)
+                if raises:
+                    with self.assertRaises(query_inspector.RepeatedQueries):
+                        middleware.process_response(request, response)
+                else:
+                    middleware.process_response(request, response)
+
+    def test_exemption_survives_the_role_decorators(self):
+        from hr_admin import views as hr_views
+        for view in (hr_views.run_auto_screening, hr_views.bulk_ocr_vacancy):
+            self.assertTrue(query_inspector.is_exempt(view))
+        self.assertFalse(query_inspector.is_exempt(hr_views.application_list))
+
+    def test_exempt_view_runs_under_raise_mode(self):
+        vacancy = make_vacancy()
+        for n in range(6):
+            make_application(vacancy, make_user(f'applicant{n}'))
+        self.client.force_login(make_user('hr', ROLE_HR_ADMIN))
+        with override_settings(RECRUITMENT_QUERY_INSPECTOR='raise'):
+            response = self.client.post(reverse('hr_admin:run_screening', args=[vacancy.pk]))
+        self.assertRedirects(response, reverse('hr_admin:application_list'), fetch_redirect_response=False)
+        self.assertFalse(vacancy.applications.filter(total_score__isnull=True).exists())
+
+
+# ---------- Application Drafts ----------
+
+APPLICATION_FORM = {
+    'first_name': 'Kila', 'last_name': 'Ano', 'date_of_birth': '1995-01-01', 'gender': 'Male',
+    'province': 'Morobe', 'address': 'Lae', 'phone': '70000000', 'email': 'kila.ano@example.com',
+    'nationality': 'Papua New Guinean', 'highest_qualification': 'degree', 'institution': 'UPNG',
+    'year_completed': '2016', 'grade_result': 'Credit', 'years_experience': '3',
+    'reference1_name': 'Ref', 'reference1_position': 'Supervisor', 'reference1_phone': '70000001',
+}
+
+
+class DraftTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.vacancy = make_vacancy()
+        self.applicant = make_user('applicant')
+        self.client.force_login(self.applicant)
+
+    def start(self, content, filename='certificate.pdf'):
+        response = self.client.post(
+            reverse('recruitment:draft_upload_start', args=[self.vacancy.pk]),
+            {'filename': filename, 'size': len(content), 'doc_type': 'certificate'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['upload_id']
+
+    def send(self, upload_id, offset, chunk):
+        return self.client.post(
+            reverse('recruitment:draft_upload', args=[self.vacancy.pk, upload_id]), chunk,
+            content_type='application/octet-stream', headers={'Upload-Offset': str(offset)},
+        )
+
+    def upload(self, content, filename='certificate.pdf'):
+        upload_id = self.start(content, filename)
+        middle = len(content) // 2
+        self.assertEqual(self.send(upload_id, 0, content[:middle]).status_code, 200)
+        self.assertTrue(self.send(upload_id, middle, content[middle:]).json()['complete'])
+        return DraftUpload.objects.get(upload_id=upload_id)
+
+    def submit(self, token, **kwargs):
+        return self.client.post(reverse('recruitment:apply', args=[self.vacancy.pk]),
+                                dict(APPLICATION_FORM, draft_token=token), **kwargs)
+
+    def test_autosave_fills_the_form_again(self):
+        response = self.client.post(reverse('recruitment:draft_autosave', args=[self.vacancy.pk]),
+                                    {'fields': {'institution': 'Divine Word', 'not_a_field': 'x'}},
+                                    content_type='application/json')
+        self.assertEqual(response.json()['saved'], ['institution'])
+
+        response = self.client.get(reverse('recruitment:apply', args=[self.vacancy.pk]))
+        self.assertEqual(response.context['form'].initial['institution'], 'Divine Word')
+
+    def test_chunks_resume_and_finish_in_document_storage(self):
+        upload = self.upload(b'0123456789' * 100)
+        self.assertTrue(upload.complete)
+        self.assertEqual(upload.received, 1000)
+        self.assertEqual(upload.file.read(), b'0123456789' * 100)
+        self.assertFalse(os.path.exists(drafts.partial_path(upload)))
+
+    def test_offset_mismatch_returns_409_with_the_server_offset(self):
+        upload_id = self.start(b'x' * 100)
+        self.send(upload_id, 0, b'x' * 40)
+
+        for offset in (0, 60):
+            response = self.send(upload_id, offset, b'x' * 40)
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response.json()['received'], 40)
+        self.assertEqual(DraftUpload.objects.get(upload_id=upload_id).received, 40)
+
+    def test_lost_partial_file_restarts_the_upload(self):
+        upload_id = self.start(b'x' * 100)
+        self.send(upload_id, 0, b'x' * 40)
+        drafts.remove_partial(DraftUpload.objects.get(upload_id=upload_id))
+
+        response = self.send(upload_id, 40, b'x' * 40)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['received'], 0)
+        self.assertEqual(self.send(upload_id, 0, b'x' * 100).status_code, 200)
+
+    def test_resending_the_final_chunk_of_a_finished_upload_changes_nothing(self):
+        upload = self.upload(b'abcdefghij')
+        response = self.send(upload.upload_id, 5, b'fghij')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['received'], 10)
+        self.assertTrue(response.json()['complete'])
+        upload.refresh_from_db()
+        self.assertEqual(upload.file.read(), b'abcdefghij')
+        self.assertEqual(self.send(upload.upload_id, 0, b'abcde').status_code, 409)
+
+    def test_retried_submission_returns_the_same_application(self):
+        upload = self.upload(b'%PDF-1.4 grade 12 certificate')
+        token = ApplicationDraft.objects.get(applicant=self.applicant).token
+
+        first = self.submit(token, follow=True)
+        second = self.submit(token, follow=True)
+
+        application = Application.objects.get(applicant=self.applicant)
+        for response in (first, second):
+            self.assertRedirects(response, reverse('recruitment:dashboard'))
+            self.assertEqual([str(m) for m in response.context['messages']],
+                             [f'Application submitted successfully! Reference: #{application.pk}'])
+        document = application.documents.get()
+        self.assertEqual((document.file.name, document.filename), (upload.file.name, 'certificate.pdf'))
+        self.assertFalse(DraftUpload.objects.exists())
+        self.assertEqual(ApplicationDraft.objects.get(token=token).application, application)
+
+    def test_purge_removes_old_drafts_with_their_partial_and_unused_files(self):
+        partial = DraftUpload.objects.get(upload_id=self.start(b'x' * 100))
+        self.send(partial.upload_id, 0, b'x' * 40)
+        finished = self.upload(b'unsubmitted certificate')
+        path = drafts.partial_path(partial)
+        self.assertTrue(os.path.exists(path))
+        ApplicationDraft.objects.update(updated_at=timezone.now() - timedelta(days=31))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('purge_drafts', stdout=io.StringIO())
+
+        self.assertFalse(ApplicationDraft.objects.exists())
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(finished.file.storage.exists(finished.file.name))
+
+    def test_purge_keeps_recent_drafts_and_files_documents_use(self):
+        upload = self.upload(b'shared certificate')
+        make_document(make_application(self.vacancy, make_user('other')), b'shared certificate')
+        ApplicationDraft.objects.update(updated_at=timezone.now() - timedelta(days=31))
+        recent = drafts.get_draft(make_user('recent'), self.vacancy)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(drafts.purge_drafts(), 1)
+
+        self.assertEqual(list(ApplicationDraft.objects.all()), [recent])
+        self.assertTrue(upload.file.storage.exists(upload.file.name))
+
+
+# ---------- Low-Bandwidth Pages ----------
+
+FULL_STYLESHEET = 'materialize.min.css'
+
+
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.vacancy = make_vacancy()
+        self.applicant = make_user('applicant')
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_repeat_visit_is_answered_304_without_rendering(self):
+        url = reverse('recruitment:job_list')
+        first = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+
+        with mock.patch('recruitment.views.render') as render:
+            second = self.client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': first['ETag']})
+
+        render.assert_not_called()
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertTrue(second['ETag'].startswith('W/'))
+        self.assertEqual(second['Vary'], first['Vary'])
+        self.assertIn('Accept-Encoding', second['Vary'])
+
+    def test_saving_a_vacancy_changes_the_list_etag(self):
+        url = reverse('recruitment:job_list')
+        before = self.etag(url)
+        self.vacancy.title = 'Senior Correctional Officer'
+        self.vacancy.save()
+        self.assertNotEqual(self.etag(url), before)
+
+    def test_new_notification_changes_the_dashboard_etag(self):
+        self.client.force_login(self.applicant)
+        url = reverse('recruitment:dashboard')
+        before = self.etag(url)
+        Notification.objects.create(user=self.applicant, title='Shortlisted', message='You have been shortlisted.')
+        self.assertNotEqual(self.etag(url), before)
+
+    def test_change_to_the_viewers_application_changes_the_vacancy_etag(self):
+        application = make_application(self.vacancy, self.applicant)
+        self.client.force_login(self.applicant)
+        url = reverse('recruitment:job_detail', args=[self.vacancy.pk])
+        before = self.etag(url)
+
+        application.phone = '70000002'
+        application.save()
+        self.assertNotEqual(self.etag(url), before)
+
+    def test_pending_flash_message_skips_the_check(self):
+        from django.contrib.messages import constants
+        from django.contrib.messages.storage.base import Message
+        from django.contrib.messages.storage.cookie import CookieStorage
+
+        self.client.force_login(self.applicant)
+        url = reverse('recruitment:dashboard')
+        etag = self.etag(url)
+        stored = HttpResponse()
+        CookieStorage(RequestFactory().get('/'))._store([Message(constants.SUCCESS, 'Application submitted.')], stored)
+        self.client.cookies['messages'] = stored.cookies['messages'].value
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertContains(response, 'Application submitted.')
+
+
+class LowBandwidthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_vacancy()
+        self.url = reverse('recruitment:job_list')
+
+    def test_lite_parameter_sets_and_clears_the_cookie(self):
+        response = self.client.get(self.url, {'lite': '1'})
+        self.assertTemplateUsed(response, 'lite/job_list.html')
+        self.assertNotContains(response, FULL_STYLESHEET)
+        self.assertEqual(response.cookies['lite'].value, '1')
+
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(response, 'lite/job_list.html')
+
+        response = self.client.get(self.url, {'lite': '0'})
+        self.assertTemplateUsed(response, 'recruitment/job_list.html')
+        self.assertEqual(response.cookies['lite'].value, '')
+        self.assertContains(self.client.get(self.url), FULL_STYLESHEET)
+
+    def test_save_data_header_serves_the_lite_variant(self):
+        self.assertTemplateUsed(self.client.get(self.url, headers={'Save-Data': 'on'}), 'lite/job_list.html')
+
+    def test_public_page_cache_keeps_lite_and_full_apart(self):
+        with mock.patch('recruitment.views.render', wraps=render) as rendered:
+            for _ in range(2):
+                self.client.cookies['lite'] = '1'
+                lite = self.client.get(self.url)
+                del self.client.cookies['lite']
+                full = self.client.get(self.url)
+                self.assertNotContains(lite, FULL_STYLESHEET)
+                self.assertContains(full, FULL_STYLESHEET)
+
+        self.assertEqual(rendered.call_count, 2)
+
+
+@override_settings(RECRUITMENT_JOBS_EAGER=True)
+class CompressionTests(MediaTestCase):
+    def test_event_stream_is_not_compressed(self):
+        def view(request):
+            return StreamingHttpResponse(iter(['data: {}\n\n'] * 50), content_type='text/event-stream')
+
+        response = bandwidth.CompressionMiddleware(view)(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip'))
+
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), b'data: {}\n\n' * 50)
+
+    def test_csv_export_is_not_compressed(self):
+        vacancy = make_vacancy()
+        for n in range(5):
+            make_application(vacancy, make_user(f'applicant{n}'))
+        self.client.force_login(make_user('hr', ROLE_HR_ADMIN))
+
+        response = self.client.get(reverse('hr_admin:export_applications'), {'format': 'csv'},
+                                   headers={'Accept-Encoding': 'gzip'})
+
+        self.assertTrue(response.streaming)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn(b'applicant0@example.com', b''.join(response.streaming_content))
+
+    def test_document_downloads_are_not_compressed(self):
+        applicant = make_user('applicant')
+        document = make_document(make_application(make_vacancy(), applicant), b'reference letter\n' * 40,
+                                 'reference.txt', 'reference')
+        self.client.force_login(applicant)
+        url = reverse('recruitment:document_download', args=[document.pk])
+
+        whole = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        part = self.client.get(url, headers={'Accept-Encoding': 'gzip', 'Range': 'bytes=0-99'})
+
+        self.assertEqual((whole.status_code, part.status_code), (200, 206))
+        for response in (whole, part):
+            self.assertTrue(response.streaming)
+            self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(whole.streaming_content), b'reference letter\n' * 40)
+        self.assertEqual(b''.join(part.streaming_content), (b'reference letter\n' * 40)[:100])
+
+    def test_html_is_compressed(self):
+        make_vacancy()
+        response = self.client.get(reverse('recruitment:job_list'), headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
@@ -0,0 +1,186 @@
+"""
+Application Status Transitions
+Every status change goes through this module: the transition is validated
+against ALLOWED_TRANSITIONS, the Application row is written with
+update_fields (or one UPDATE for bulk changes), and an entry is appended to
+ApplicationStatusChange. Funnel and time-in-stage reports are aggregate
+queries over that history.
+"""
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, Q
+from django.utils import timezone
+
+from .models import APPLICATION_STATUS, Application, ApplicationStatusChange
+
+STATUS_LABELS = dict(APPLICATION_STATUS)
+
+ALLOWED_TRANSITIONS = {
+    'submitted': {'under_review', 'shortlisted', 'interview_scheduled', 'rejected', 'withdrawn'},
+    'under_review': {'shortlisted', 'interview_scheduled', 'rejected', 'withdrawn'},
+    'shortlisted': {'under_review', 'interview_scheduled', 'rejected', 'withdrawn'},
+    'interview_scheduled': {'shortlisted', 'interviewed', 'rejected', 'withdrawn'},
+    'interviewed': {'interview_scheduled', 'selected', 'rejected', 'withdrawn'},
+    'selected': {'rejected', 'withdrawn'},
+    'rejected': {'under_review', 'shortlisted'},
+    'withdrawn': set(),
+}
+
+# Stages in funnel order; rejected/withdrawn are exits, not stages
+FUNNEL_STAGES = ['submitted', 'under_review', 'shortlisted', 'interview_scheduled', 'interviewed', 'selected']
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def can_transition(from_status, to_status):
+    return to_status in ALLOWED_TRANSITIONS.get(from_status, ())
+
+
+def sources_for(to_status):
+    """Statuses an application may move to `to_status` from."""
+    return [status for status, targets in ALLOWED_TRANSITIONS.items() if to_status in targets]
+
+
+# ---------- Single Transitions ----------
+
+def record_submission(application, by=None):
+    """Start the history of a newly saved application."""
+    return ApplicationStatusChange.objects.create(
+        application=application, to_status=application.status,
+        changed_at=application.status_changed_at, changed_by=by,
+    )
+
+
+def transition(application, to_status, by=None, note='', update_fields=()):
+    """
+    Move one application to `to_status`, saving only the status columns
+    (plus any `update_fields` the caller also changed) and logging the change.
+    Returns False when the application is already in that status; raises
+    InvalidTransition when the move is not allowed.
+    """
+    from_status = application.status
+    if to_status == from_status:
+        if update_fields:
+            application.save(update_fields=[*update_fields, 'updated_at'])
+        return False
+    if to_status not in STATUS_LABELS or not can_transition(from_status, to_status):
+        raise InvalidTransition(
+            f"Cannot move an application from {STATUS_LABELS.get(from_status, from_status)} "
+            f"to {STATUS_LABELS.get(to_status, to_status)}."
+        )
+
+    now = timezone.now()
+    previous_changed_at = application.status_changed_at
+    application.status = to_status
+    application.status_changed_at = now
+    with transaction.atomic():
+        application.save(update_fields=['status', 'status_changed_at', 'updated_at', *update_fields])
+        ApplicationStatusChange.objects.create(
+            application=application, from_status=from_status, to_status=to_status,
+            changed_at=now, previous_changed_at=previous_changed_at, changed_by=by, note=note[:255],
+        )
+    return True
+
+
+# ---------- Bulk Transitions ----------
+
+def bulk_transition(applications, to_status, by=None, note=''):
+    """
+    Move every application in the queryset that may legally reach
+    `to_status` with one UPDATE and one batched history insert. Applications
+    already in that status, or that cannot make the move, are left alone.
+    Returns the ids of the applications that changed.
+    """
+    if to_status not in STATUS_LABELS:
+        raise InvalidTransition(f"Unknown status: {to_status}")
+    sources = sources_for(to_status)
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            applications.filter(status__in=sources).order_by().values_list('pk', 'status', 'status_changed_at')
+        )
+        if not rows:
+            return []
+        ids = [pk for pk, _, _ in rows]
+        Application.objects.filter(pk__in=ids, status__in=sources).update(
+            status=to_status, status_changed_at=now, updated_at=now,
+        )
+        ApplicationStatusChange.objects.bulk_create([
+            ApplicationStatusChange(
+                application_id=pk, from_status=from_status, to_status=to_status,
+                changed_at=now, previous_changed_at=previous_changed_at, changed_by=by, note=note[:255],
+            )
+            for pk, from_status, previous_changed_at in rows
+        ], batch_size=500)
+    return ids
+
+
+# ---------- Analytics ----------
+
+def _history(vacancy_id=None, since=None):
+    history = ApplicationStatusChange.objects.all()
+    if vacancy_id:
+        history = history.filter(application__vacancy_id=vacancy_id)
+    if since:
+        history = history.filter(changed_at__gte=since)
+    return history
+
+
+def funnel(vacancy_id=None, since=None):
+    """
+    Applications that reached each stage (or a later one, since stages can be
+    skipped), in funnel order, with the conversion rate from the previous
+    stage and from submission. One aggregate query over the history.
+    Returns a list of dicts: status, label, count, step_rate, overall_rate.
+    """
+    reached = _history(vacancy_id, since).aggregate(**{
+        status: Count('application', distinct=True, filter=Q(to_status__in=FUNNEL_STAGES[i:]))
+        for i, status in enumerate(FUNNEL_STAGES)
+    })
+    stages = []
+    first = previous = None
+    for status in FUNNEL_STAGES:
+        count = reached[status]
+        if first is None:
+            first = count
+        stages.append({
+            'status': status,
+            'label': STATUS_LABELS[status],
+            'count': count,
+            'step_rate': round(count / previous * 100, 1) if previous else None,
+            'overall_rate': round(count / first * 100, 1) if first else None,
+        })
+        previous = count
+    return stages
+
+
+def time_in_stage(vacancy_id=None, since=None):
+    """
+    How long applications stayed in each status before moving on, from the
+    completed stays recorded in the history. Returns a list of dicts:
+    status, label, exits, and average_days/shortest_days/longest_days.
+    """
+    duration = ExpressionWrapper(F('changed_at') - F('previous_changed_at'), output_field=DurationField())
+    rows = (
+        _history(vacancy_id, since).exclude(from_status='').filter(previous_changed_at__isnull=False)
+        .annotate(duration=duration).values('from_status')
+        .annotate(exits=Count('pk'), average=Avg('duration'), shortest=Min('duration'), longest=Max('duration'))
+        .order_by()
+    )
+    by_status = {row['from_status']: row for row in rows}
+    stages = []
+    for status, label in APPLICATION_STATUS:
+        row = by_status.get(status)
+        if row:
+            stages.append({
+                'status': status,
+                'label': label,
+                'exits': row['exits'],
+                **{f'{key}_days': _days(row[key]) for key in ('average', 'shortest', 'longest')},
+            })
+    return stages
+
+
+def _days(duration):
+    return round(duration.total_seconds() / 86400, 1) if duration is not None else None
@@ -7,8 +7,16 @@ urlpatterns = [
     path('', views.job_list, name='job_list'),
     path('jobs/<int:pk>/', views.job_detail, name='job_detail'),
     path('jobs/<int:pk>/apply/', views.apply, name='apply'),
+    path('jobs/<int:pk>/apply/draft/', views.draft_autosave, name='draft_autosave'),
+    path('jobs/<int:pk>/apply/uploads/', views.draft_upload_start, name='draft_upload_start'),
+    path('jobs/<int:pk>/apply/uploads/<str:upload_id>/', views.draft_upload, name='draft_upload'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('applications/<int:pk>/', views.application_detail, name='application_detail'),
+    path('documents/<int:pk>/', views.document_download, name='document_download'),
+    path('documents/<int:pk>/preview/', views.document_preview, name='document_preview'),
+    path('notifications/', views.notification_inbox, name='notifications'),
     path('notifications/<int:pk>/read/', views.mark_notification_read, name='mark_read'),
+    path('notifications/broadcast/<int:pk>/read/', views.mark_broadcast_read, name='mark_broadcast_read'),
     path('notifications/read-all/', views.mark_all_read, name='mark_all_read'),
+    path('events/', views.event_stream, name='events'),
 ]
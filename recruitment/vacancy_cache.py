@@ -0,0 +1,125 @@
+"""
+Public Vacancy Cache
+Caches the public vacancy pages (job_list, job_detail) and the data behind
+them under a global vacancy version. Saving or deleting any Vacancy bumps the
+version, and the local date is part of every key so vacancies that open or
+close overnight drop out on their own. Nothing is invalidated key by key;
+entries from older versions simply stop being read and age out.
+
+Anonymous GET requests get the whole rendered page from the cache; signed-in
+users share the cached vacancy data and template fragments but get their own
+navbar and applied/not-applied state. Use a shared CACHES backend when running
+several worker processes so they agree on the version. The validators behind
+the pages' ETags (see bandwidth.conditional_page) are cached the same way, so
+they always describe the data the page is built from.
+"""
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .bandwidth import low_bandwidth
+from .models import Vacancy
+
+VERSION_KEY = 'vacancy:version'
+PUBLIC_CACHE_TIMEOUT = 60 * 60
+
+
+def vacancy_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_vacancy_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def version_token():
+    """The current cache generation: vacancy version plus today's local date."""
+    return f'{vacancy_version()}.{timezone.localdate().isoformat()}'
+
+
+def cache_key(*parts):
+    digest = hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()
+    return f'vacancy:{version_token()}:{digest}'
+
+
+# ---------- Data ----------
+
+def open_vacancies(province='', category='', qualification='', search=''):
+    """Open vacancies currently within their application window, matching the public filters."""
+    def load():
+        today = timezone.localdate()
+        vacancies = Vacancy.objects.filter(status='open', open_date__lte=today, close_date__gte=today)
+        if province:
+            vacancies = vacancies.filter(province__in=[province, 'All'])
+        if category:
+            vacancies = vacancies.filter(category=category)
+        if qualification:
+            vacancies = vacancies.filter(qualification_level=qualification)
+        if search:
+            vacancies = vacancies.filter(
+                Q(title__icontains=search) | Q(description__icontains=search) | Q(department__icontains=search)
+            )
+        return list(vacancies)
+    return cache.get_or_set(cache_key('list', province, category, qualification, search), load, PUBLIC_CACHE_TIMEOUT)
+
+
+def open_vacancy(pk):
+    """An open vacancy by pk, or None. Misses are cached too."""
+    return cache.get_or_set(
+        cache_key('detail', pk), lambda: Vacancy.objects.filter(pk=pk, status='open').first(), PUBLIC_CACHE_TIMEOUT,
+    )
+
+
+def open_vacancies_changed():
+    """(count, latest updated_at) of the vacancies open today: what the list page's ETag is built from."""
+    def load():
+        today = timezone.localdate()
+        stats = Vacancy.objects.filter(status='open', open_date__lte=today, close_date__gte=today).aggregate(
+            count=Count('pk'), latest=Max('updated_at'),
+        )
+        return stats['count'], stats['latest']
+    return cache.get_or_set(cache_key('changed'), load, PUBLIC_CACHE_TIMEOUT)
+
+
+# ---------- Pages ----------
+
+def _cacheable_request(request):
+    # A pending flash message cookie means this response is one-off
+    return request.method == 'GET' and not request.user.is_authenticated and 'messages' not in request.COOKIES
+
+
+def cache_public_page(view):
+    """
+    Serve anonymous GETs from a cached copy of the rendered page. Responses
+    that set cookies or carry a CSRF token are never stored.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _cacheable_request(request):
+            return view(request, *args, **kwargs)
+        key = cache_key('page', low_bandwidth(request), request.get_full_path())
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        response = view(request, *args, **kwargs)
+        if (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        ):
+            cache.set(key, (response.content, response['Content-Type']), PUBLIC_CACHE_TIMEOUT)
+        return response
+    return wrapper
@@ -1,36 +1,76 @@
+import asyncio
+import json
+import os
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-from .models import Vacancy, Application, Document, Notification, CATEGORIES, QUALIFICATION_LEVELS
+from django.views.decorators.http import require_http_methods, require_POST
+from .models import Vacancy, Application, Document, DraftUpload, Notification, BroadcastReceipt, CATEGORIES, QUALIFICATION_LEVELS
 from .forms import ApplicationForm, DocumentUploadForm
-from accounts.models import PROVINCES
+from . import downloads
+from .bandwidth import conditional_page, page_template
+from . import drafts
+from . import events
+from . import notifications as inbox
+from . import previews
+from . import vacancy_cache
+from .redirects import safe_next_url
+from .transitions import record_submission
+from .vacancy_cache import cache_public_page
+from accounts.models import PROVINCES, ROLE_HR_ADMIN
+from accounts.roles import get_role, user_role
+
+
+# ---------- Page Validators ----------
+# What each applicant-facing page shows, for its ETag and Last-Modified (see bandwidth.conditional_page)
+
+def _job_list_changed(request):
+    count, latest = vacancy_cache.open_vacancies_changed()
+    return [request.get_full_path(), count, latest], latest
+
+
+def _job_detail_changed(request, pk):
+    vacancy = vacancy_cache.open_vacancy(pk)
+    if vacancy is None:
+        return None
+    parts, latest = [pk, vacancy.updated_at], vacancy.updated_at
+    if request.user.is_authenticated:
+        applied_at = (Application.objects.filter(vacancy=vacancy, applicant=request.user)
+                      .values_list('updated_at', flat=True).first())
+        parts.append(applied_at)
+        latest = max(latest, applied_at or latest)
+    return parts, latest
+
+
+def _dashboard_changed(request):
+    stats = Application.objects.filter(applicant=request.user).aggregate(
+        count=Count('pk'), latest=Max('updated_at'), vacancy_latest=Max('vacancy__updated_at'),
+    )
+    notified_at = inbox.latest_notification_at(request.user)
+    changes = [stats['latest'], stats['vacancy_latest'], notified_at]
+    return [stats['count']] + changes, max(filter(None, changes), default=None)
 
 
+@conditional_page(_job_list_changed)
+@cache_public_page
 def job_list(request):
-    vacancies = Vacancy.objects.filter(status='open')
     province_filter = request.GET.get('province', '')
     category_filter = request.GET.get('category', '')
     qual_filter = request.GET.get('qualification', '')
     search = request.GET.get('search', '')
 
-    if province_filter:
-        vacancies = vacancies.filter(province__in=[province_filter, 'All'])
-    if category_filter:
-        vacancies = vacancies.filter(category=category_filter)
-    if qual_filter:
-        vacancies = vacancies.filter(qualification_level=qual_filter)
-    if search:
-        vacancies = vacancies.filter(
-            Q(title__icontains=search) | Q(description__icontains=search) | Q(department__icontains=search)
-        )
-
-    today = timezone.now().date()
-    vacancies = [v for v in vacancies if v.open_date <= today <= v.close_date]
+    vacancies = vacancy_cache.open_vacancies(province_filter, category_filter, qual_filter, search)
 
     context = {
         'vacancies': vacancies,
+        'vacancy_cache_key': vacancy_cache.cache_key('cards', province_filter, category_filter, qual_filter, search),
         'provinces': PROVINCES,
         'categories': CATEGORIES,
         'qualifications': QUALIFICATION_LEVELS,
@@ -39,22 +79,38 @@ def job_list(request):
         'qual_filter': qual_filter,
         'search': search,
     }
-    return render(request, 'recruitment/job_list.html', context)
+    return render(request, page_template(request, 'recruitment/job_list.html'), context)
 
 
+@conditional_page(_job_detail_changed)
+@cache_public_page
 def job_detail(request, pk):
-    vacancy = get_object_or_404(Vacancy, pk=pk, status='open')
+    vacancy = vacancy_cache.open_vacancy(pk)
+    if vacancy is None:
+        raise Http404('No open vacancy matches the given query.')
     already_applied = False
     if request.user.is_authenticated:
         already_applied = Application.objects.filter(vacancy=vacancy, applicant=request.user).exists()
-    return render(request, 'recruitment/job_detail.html', {
+    return render(request, page_template(request, 'recruitment/job_detail.html'), {
         'vacancy': vacancy,
         'already_applied': already_applied,
     })
 
 
+def _application_submitted(request, application):
+    messages.success(request, f'Application submitted successfully! Reference: #{application.pk}')
+    return redirect('recruitment:dashboard')
+
+
 @login_required
 def apply(request, pk):
+    if request.method == 'POST':
+        # A retried submission (lost response, double tap) gets the application it already created
+        draft = drafts.submitted_draft(request.user, request.POST.get('draft_token', ''))
+        if draft is not None and draft.vacancy_id == pk:
+            drafts.attach_uploads(draft, draft.application)
+            return _application_submitted(request, draft.application)
+
     vacancy = get_object_or_404(Vacancy, pk=pk, status='open')
     today = timezone.now().date()
     if not (vacancy.open_date <= today <= vacancy.close_date):
@@ -66,6 +122,7 @@ def apply(request, pk):
         return redirect('recruitment:dashboard')
 
     profile = request.user.profile
+    draft = drafts.get_draft(request.user, vacancy)
     if request.method == 'POST':
         form = ApplicationForm(request.POST)
         if form.is_valid():
@@ -73,10 +130,27 @@ def apply(request, pk):
             application.vacancy = vacancy
             application.applicant = request.user
             application.status = 'submitted'
-            application.save()
-
-            application.compute_score()
+            # One short write transaction for the rows; uploads are stored after it
+            try:
+                with transaction.atomic():
+                    application.save()
+                    drafts.submit(draft, application)
+                    record_submission(application, by=request.user)
+                    application.compute_score()
+                    Notification.objects.create(
+                        user=request.user,
+                        title='Application Submitted Successfully',
+                        message=f'Your application for {vacancy.title} (Ref: {vacancy.reference_number}) has been received. '
+                                f'Your application reference is #{application.pk}. We will keep you updated on progress.',
+                        notification_type='success',
+                    )
+            except IntegrityError:
+                # A concurrent copy of this submission got there first
+                messages.warning(request, 'You have already applied for this position.')
+                return redirect('recruitment:dashboard')
 
+            drafts.attach_uploads(draft, application)
+            # Without JavaScript the documents come with the form instead
             files = request.FILES.getlist('documents')
             doc_types = request.POST.getlist('doc_types')
             for i, f in enumerate(files):
@@ -88,16 +162,7 @@ def apply(request, pk):
                     filename=f.name,
                 )
 
-            Notification.objects.create(
-                user=request.user,
-                title='Application Submitted Successfully',
-                message=f'Your application for {vacancy.title} (Ref: {vacancy.reference_number}) has been received. '
-                        f'Your application reference is #{application.pk}. We will keep you updated on progress.',
-                notification_type='success',
-            )
-
-            messages.success(request, f'Application submitted successfully! Reference: #{application.pk}')
-            return redirect('recruitment:dashboard')
+            return _application_submitted(request, application)
     else:
         initial = {
             'first_name': request.user.first_name,
@@ -108,23 +173,109 @@ def apply(request, pk):
             'gender': profile.gender,
             'date_of_birth': profile.date_of_birth,
         }
+        initial.update(drafts.form_initial(draft))
         form = ApplicationForm(initial=initial)
 
+    uploads = list(draft.uploads.all())
     return render(request, 'recruitment/apply.html', {
         'form': form,
         'vacancy': vacancy,
+        'draft': draft,
+        'uploads': uploads,
+        'upload_states': [drafts.upload_state(u) for u in uploads],
+        'chunk_size': drafts.CHUNK_SIZE,
+        'max_upload_size': drafts.MAX_UPLOAD_SIZE,
     })
 
 
+# ---------- Application Drafts ----------
+
+def _draft_for(request, pk):
+    """The signed-in applicant's draft for an open vacancy, or None once it has been submitted."""
+    vacancy = get_object_or_404(Vacancy, pk=pk, status='open')
+    draft = drafts.get_draft(request.user, vacancy)
+    return None if draft.application_id else draft
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@login_required
+@require_POST
+def draft_autosave(request, pk):
+    """Merge the changed fields posted as {"fields": {...}} into the applicant's draft."""
+    draft = _draft_for(request, pk)
+    if draft is None:
+        return JsonResponse({'error': 'This application has already been submitted.'}, status=409)
+    data = _json_body(request)
+    if data is None or not isinstance(data.get('fields'), dict):
+        return JsonResponse({'error': 'Expected {"fields": {...}}.'}, status=400)
+    changed = drafts.autosave(draft, data['fields'])
+    return JsonResponse({'version': draft.version, 'saved': changed, 'updated_at': draft.updated_at})
+
+
+@login_required
+@require_POST
+def draft_upload_start(request, pk):
+    """Register a document to be uploaded in chunks: {"filename", "size", "doc_type"}."""
+    draft = _draft_for(request, pk)
+    if draft is None:
+        return JsonResponse({'error': 'This application has already been submitted.'}, status=409)
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'error': 'Expected a JSON object.'}, status=400)
+    try:
+        upload = drafts.start_upload(draft, data.get('filename'), data.get('size'), data.get('doc_type'))
+    except drafts.InvalidUpload as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(drafts.upload_state(upload), status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'POST', 'DELETE'])
+def draft_upload(request, pk, upload_id):
+    """
+    GET reports how much of the upload the server has, POST appends the
+    request body at the Upload-Offset header, DELETE removes the upload.
+    """
+    upload = get_object_or_404(
+        DraftUpload.objects.select_related('draft'),
+        upload_id=upload_id, draft__vacancy_id=pk, draft__applicant=request.user,
+    )
+    if request.method == 'DELETE':
+        upload.delete()
+        return HttpResponse(status=204)
+    if request.method == 'POST':
+        if upload.draft.application_id:
+            return JsonResponse({'error': 'This application has already been submitted.'}, status=409)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return JsonResponse({'error': 'The Upload-Offset header is missing.'}, status=400)
+        try:
+            drafts.append_chunk(upload, offset, request.body)
+        except drafts.OffsetMismatch as e:
+            return JsonResponse(dict(drafts.upload_state(upload), received=e.received, error=str(e)), status=409)
+        except drafts.InvalidUpload as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(drafts.upload_state(upload))
+
+
 @login_required
+@conditional_page(_dashboard_changed)
 def dashboard(request):
     applications = Application.objects.filter(applicant=request.user).select_related('vacancy')
-    notifications = Notification.objects.filter(user=request.user)
-    unread_count = notifications.filter(read=False).count()
-    return render(request, 'recruitment/dashboard.html', {
+    notifications, next_cursor = inbox.get_inbox_page(request.user, page_size=10)
+    return render(request, page_template(request, 'recruitment/dashboard.html'), {
         'applications': applications,
-        'notifications': notifications[:10],
-        'unread_count': unread_count,
+        'notifications': notifications,
+        'has_more_notifications': next_cursor is not None,
+        'unread_count': inbox.get_unread_count(request.user),
     })
 
 
@@ -155,15 +306,122 @@ def application_detail(request, pk):
     })
 
 
+def _viewable_document(request, pk):
+    document = get_object_or_404(Document.objects.select_related('application'), pk=pk)
+    if not document.file or not downloads.can_view_document(request.user, get_role(request), document):
+        raise Http404
+    return document
+
+
+@login_required
+def document_download(request, pk):
+    """Serve an uploaded document to someone allowed to see it (see downloads.py)."""
+    document = _viewable_document(request, pk)
+    try:
+        return downloads.serve_file(request, document.file.path, document.filename, attachment='download' in request.GET)
+    except FileNotFoundError:
+        raise Http404
+
+
+PREVIEW_MAX_AGE = 7 * 24 * 60 * 60
+
+
+@login_required
+def document_preview(request, pk):
+    """The document's first-page preview image; 404 (the page shows an icon) while it is queued or if it failed."""
+    document = _viewable_document(request, pk)
+    if not previews.shared_preview(document):
+        previews.queue_preview(document)
+        raise Http404
+    name = f'{os.path.splitext(document.filename)[0]}.jpg'
+    try:
+        return downloads.serve_file(request, document.preview.path, name, max_age=PREVIEW_MAX_AGE)
+    except FileNotFoundError:
+        raise Http404
+
+
+@login_required
+def notification_inbox(request):
+    """Full notification history, cursor-paginated newest first."""
+    unread_only = request.GET.get('unread') == '1'
+    cursor = request.GET.get('cursor', '')
+    notifications, next_cursor = inbox.get_inbox_page(request.user, cursor=cursor, unread_only=unread_only)
+    return render(request, 'recruitment/notifications.html', {
+        'notifications': notifications,
+        'next_cursor': next_cursor,
+        'cursor': cursor,
+        'unread_only': unread_only,
+        'unread_count': inbox.get_unread_count(request.user),
+    })
+
+
+def _redirect_back(request):
+    return redirect(safe_next_url(request, request.GET.get('next'), 'recruitment:dashboard'))
+
+
 @login_required
 def mark_notification_read(request, pk):
-    notif = get_object_or_404(Notification, pk=pk, user=request.user)
-    notif.read = True
-    notif.save()
-    return redirect('recruitment:dashboard')
+    get_object_or_404(Notification, pk=pk, user=request.user)
+    inbox.mark_read(request.user, pk)
+    return _redirect_back(request)
+
+
+@login_required
+def mark_broadcast_read(request, pk):
+    get_object_or_404(BroadcastReceipt, pk=pk, user=request.user)
+    inbox.mark_broadcast_read(request.user, pk)
+    return _redirect_back(request)
 
 
 @login_required
 def mark_all_read(request):
-    Notification.objects.filter(user=request.user, read=False).update(read=True)
-    return redirect('recruitment:dashboard')
+    inbox.mark_all_read(request.user)
+    return _redirect_back(request)
+
+
+# ---------- Live Events ----------
+
+EVENT_STREAM_HEARTBEAT = 20  # seconds between keep-alive comments
+EVENT_STREAM_LIFETIME = 300  # EventSource reconnects transparently after this
+
+
+def _event_channels(user):
+    channels = [events.user_channel(user.pk)]
+    if user.is_superuser or user_role(user) == ROLE_HR_ADMIN:
+        channels.append(events.HR_CHANNEL)
+    return channels
+
+
+async def _event_stream(user):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + EVENT_STREAM_LIFETIME
+    subscription = events.get_broker().subscribe(await sync_to_async(_event_channels)(user))
+    try:
+        # Subscribed first, so nothing published from here on is missed
+        unread = await sync_to_async(inbox.get_unread_count)(user)
+        yield 'retry: 3000\n\n'
+        yield events.format_sse(events.make_event('unread', {'count': unread}))
+        while loop.time() < deadline:
+            try:
+                event = await subscription.get(EVENT_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield events.format_sse(event)
+    finally:
+        subscription.close()
+
+
+async def event_stream(request):
+    """
+    Server-sent events for the signed-in user: new notifications, plus
+    background job results for HR. Needs the ASGI server (pngcs/asgi.py);
+    elsewhere it answers 204, which tells EventSource not to reconnect.
+    """
+    user = await request.auser()
+    if not isinstance(request, ASGIRequest) or not user.is_authenticated:
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(_event_stream(user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response